@@ -1,24 +1,12 @@
 import sys
-import sqlite3
-import os
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla
+from seguridad import hashear_contrasena
+from permisos import invalidar_permisos
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel,
     QLineEdit, QPushButton, QMessageBox, QFormLayout
 )
-import subprocess
-import bcrypt
-
-def obtener_db_path():
-    """Retorna la ruta de la base de datos 'pruebas.db'."""
-    if getattr(sys, 'frozen', False):
-        exe_dir = os.path.dirname(sys.executable)
-        db_path = os.path.join(exe_dir, "pruebas.db")
-        if os.path.exists(db_path):
-            return db_path
-        base_path = sys._MEIPASS
-        return os.path.join(base_path, "pruebas.db")
-    else:
-        return os.path.abspath(os.path.join(os.path.dirname(__file__), "pruebas.db"))
 
 db_path = obtener_db_path()
 
@@ -106,14 +94,13 @@ class ModificarEmpleadoWindow(QMainWindow):
 
     def cargar_datos(self):
         try:
-            conn = sqlite3.connect(db_path)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT nombre, apellidos, CI, celular, rol
                 FROM empleado WHERE id_empleado = ?
             """, (self.empleado_id,))
             empleado = cursor.fetchone()
-            conn.close()
 
             if empleado:
                 self.inputs["nombre"].setText(str(empleado[0]) if empleado[0] else "")
@@ -136,12 +123,12 @@ class ModificarEmpleadoWindow(QMainWindow):
                 QMessageBox.warning(self, "Advertencia", "Las contraseñas no coinciden. Por favor, verifique.")
                 return
 
+        conn = obtener_conexion()
         try:
-            conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
 
             if datos["contrasena"]:
-                nueva_contrasena_hash = bcrypt.hashpw(datos["contrasena"].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+                nueva_contrasena_hash = hashear_contrasena(datos["contrasena"])
                 cursor.execute("""
                     UPDATE empleado SET
                         nombre = ?, apellidos = ?, CI = ?, celular = ?, rol = ?, contrasena_hash = ?
@@ -161,10 +148,12 @@ class ModificarEmpleadoWindow(QMainWindow):
                 ))
 
             conn.commit()
-            conn.close()
+            # Puede haber cambiado el rol: sus permisos se vuelven a resolver
+            invalidar_permisos(self.empleado_id)
             QMessageBox.information(self, "Éxito", "Empleado modificado correctamente.")
             self.volver_a_lista_empleados()
         except Exception as e:
+            conn.rollback()
             QMessageBox.critical(self, "Error", f"No se pudo modificar el empleado: {e}")
 
     def volver_a_lista_empleados(self):
@@ -172,11 +161,7 @@ class ModificarEmpleadoWindow(QMainWindow):
         self.close()
 
 def abrir_aplicacion(nombre_py):
-    try:
-        script_path = os.path.join(os.path.dirname(__file__), nombre_py)
-        subprocess.Popen([sys.executable, script_path])
-    except Exception as e:
-        QMessageBox.critical(None, "Error", f"No se pudo abrir el archivo {nombre_py}: {e}")
+    abrir_pantalla(nombre_py)
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
@@ -2,9 +2,14 @@
 import sys
 import os
 import sqlite3
-import shutil
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_en_aplicacion, abrir_con_lanzador
 import subprocess
-import cv2  # Asegúrate de tener instalado opencv-python
+from ingesta_imagenes import ingresar_archivo, ingresar_foto
+from importacion_diferida import importar_diferido
+
+# opencv-python; solo se importa al tomar una foto
+cv2 = importar_diferido("cv2")
 from datetime import datetime
 
 # Módulos de PyQt5
@@ -14,29 +19,13 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import QDate
 
-# Constantes
-DB_NAME = "pruebas.db"
-
 # Funciones de utilidad
-def obtener_db_path():
-    """
-    Determina la ruta de la base de datos 'pruebas.db'
-    buscando en la carpeta del ejecutable o en el directorio de trabajo.
-    """
-    if getattr(sys, 'frozen', False):
-        exe_dir = os.path.dirname(sys.executable)
-        db_path = os.path.join(exe_dir, DB_NAME)
-        if os.path.exists(db_path):
-            return db_path
-        base_path = sys._MEIPASS
-        return os.path.join(base_path, DB_NAME)
-    else:
-        return os.path.abspath(os.path.join(os.path.dirname(__file__), DB_NAME))
-
 def abrir_aplicacion(nombre_py, argumentos=None):
     """
     Abre el archivo .exe si existe, si no, ejecuta el .py en un nuevo proceso.
     """
+    if abrir_en_aplicacion(nombre_py, argumentos) or abrir_con_lanzador(nombre_py, argumentos):
+        return
     base_paths = [os.getcwd()]
     if hasattr(sys, '_MEIPASS'):
         base_paths.append(sys._MEIPASS)
@@ -177,11 +166,10 @@ class ModificarProductoWindow(QMainWindow):
 
     def _cargar_empleados(self):
         """Carga todos los empleados en el combo."""
-        conn = sqlite3.connect(db_path)
+        conn = obtener_conexion()
         cursor = conn.cursor()
         cursor.execute("SELECT id_empleado, nombre FROM empleado")
         empleados = cursor.fetchall()
-        conn.close()
         self.combo_empleado.clear()
         for id_emp, nombre in empleados:
             self.combo_empleado.addItem(f"{nombre} (ID:{id_emp})", id_emp)
@@ -189,7 +177,7 @@ class ModificarProductoWindow(QMainWindow):
     def cargar_datos(self):
         """Carga los datos del producto seleccionado en los campos del formulario."""
         try:
-            conn = sqlite3.connect(db_path)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT p.id_producto, p.codigo, p.imagen, p.nombre, p.precio, p.stock, p.fecha_venc, p.id_empleado, IFNULL(e.nombre, 'Sin asignar')
@@ -198,7 +186,6 @@ class ModificarProductoWindow(QMainWindow):
                 WHERE p.id_producto = ?
             """, (self.producto_id,))
             producto = cursor.fetchone()
-            conn.close()
 
             if producto:
                 (id_producto, codigo, imagen, nombre, precio, stock, fecha_venc, id_empleado, nombre_empleado) = producto
@@ -246,8 +233,8 @@ class ModificarProductoWindow(QMainWindow):
             else:
                 datos[key] = widget.text().strip()
 
+        conn = obtener_conexion()
         try:
-            conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
             
             if not datos["nombre"] or not datos["codigo"]:
@@ -294,9 +281,9 @@ class ModificarProductoWindow(QMainWindow):
             else:
                 QMessageBox.information(self, "Éxito", "Producto modificado correctamente\nModificado por: (desconocido)")
 
-            conn.close()
             self.close()
         except Exception as e:
+            conn.rollback()
             QMessageBox.critical(self, "Error", f"No se pudo modificar el producto: {e}")
 
     def _edit_product(self, product_id):
@@ -306,20 +293,13 @@ class ModificarProductoWindow(QMainWindow):
     def cargar_imagen(self):
         ruta, _ = QFileDialog.getOpenFileName(self, "Seleccionar imagen", "", "Imágenes (*.png *.jpg *.jpeg *.bmp)")
         if ruta:
-            carpeta_destino = os.path.join(os.path.dirname(__file__), "imagenes_productos")
-            os.makedirs(carpeta_destino, exist_ok=True)
-            nombre_archivo = os.path.basename(ruta)
-            destino = os.path.join(carpeta_destino, nombre_archivo)
-            shutil.copy(ruta, destino)
-            # Guarda la ruta relativa en el campo
-            self.inputs["imagen"].setText(os.path.relpath(destino, os.path.dirname(__file__)))
+            # Se guarda reducida y recomprimida en imagenes_productos/
+            try:
+                self.inputs["imagen"].setText(ingresar_archivo(ruta))
+            except (ValueError, OSError) as e:
+                QMessageBox.warning(self, "Imagen", f"No se pudo cargar la imagen: {e}")
 
     def tomar_foto(self):
-        carpeta_destino = os.path.join(os.path.dirname(__file__), "imagenes_productos")
-        os.makedirs(carpeta_destino, exist_ok=True)
-        nombre_archivo = f"foto_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-        destino = os.path.join(carpeta_destino, nombre_archivo)
-
         cap = cv2.VideoCapture(0)
         if not cap.isOpened():
             QMessageBox.warning(self, "Error", "No se pudo acceder a la cámara.")
@@ -332,8 +312,10 @@ class ModificarProductoWindow(QMainWindow):
             cv2.imshow("Tomar Foto (presiona 's' para guardar, 'q' para cancelar)", frame)
             key = cv2.waitKey(1)
             if key == ord('s'):
-                cv2.imwrite(destino, frame)
-                self.inputs["imagen"].setText(os.path.relpath(destino, os.path.dirname(__file__)))
+                try:
+                    self.inputs["imagen"].setText(ingresar_foto(frame))
+                except (ValueError, OSError) as e:
+                    QMessageBox.warning(self, "Imagen", f"No se pudo guardar la foto: {e}")
                 break
             elif key == ord('q'):
                 break
@@ -0,0 +1,127 @@
+"""
+Agregados de las estadísticas de ventas.
+
+Los gráficos y reportes de estadistica.py agrupaban los datos cada uno por
+su cuenta (por día, por producto, por semana...). Ahora las agrupaciones se
+hacen una vez por carga: las consultas de consultas_estadisticas.py traen
+los grupos ya hechos en SQL y armar_agregados deriva de los días, en una
+sola pasada con numpy.bincount, los totales y las series por día de la
+semana, semana ISO y mes. El resultado es un AgregadosVentas que los
+gráficos solo leen.
+
+Las series del paquete no se modifican: sus arreglos son de solo lectura.
+"""
+from datetime import date
+from dataclasses import dataclass
+from importacion_diferida import importar_diferido
+
+np = importar_diferido("numpy")
+pd = importar_diferido("pandas")
+
+def _serie(valores, indice):
+    arreglo = np.array(valores, dtype='float64')
+    arreglo.setflags(write=False)
+    return pd.Series(arreglo, index=indice, copy=False)
+
+def _sumar_por(codigos, pesos, cantidad_grupos):
+    return np.bincount(codigos, weights=pesos, minlength=cantidad_grupos)
+
+@dataclass(frozen=True)
+class AgregadosVentas:
+    """Totales y series de un período; se arma con armar_agregados."""
+    total_movimientos: int
+    total_cantidad: float
+    total_valor: float
+    ventas_hoy: int
+    por_dia: object               # fecha -> cantidad, ordenada por fecha
+    valor_por_dia: object         # fecha -> valor
+    movimientos_por_dia: object   # fecha -> movimientos
+    por_hora: object              # hora (0-23) -> cantidad
+    por_dia_semana: object        # 0 (lunes) a 6 -> cantidad, siempre 7 valores
+    por_semana: object            # semana ISO -> cantidad
+    por_mes: object               # mes (1-12) -> cantidad, solo los meses con datos
+    por_tipo: object              # tipo de movimiento -> movimientos, de mayor a menor
+    mas_vendidos: object          # nombre -> cantidad, de mayor a menor
+    valor_mas_vendidos: object    # nombre -> valor, mismo orden que mas_vendidos
+    menos_vendidos: object        # nombre -> cantidad, de menor a mayor
+
+    @property
+    def vacio(self):
+        return self.total_movimientos == 0
+
+    @property
+    def valor_promedio(self):
+        return self.total_valor / self.total_movimientos if self.total_movimientos else 0
+
+    def top_productos(self, n=10):
+        return self.mas_vendidos.head(n)
+
+    def menos_populares(self, n=10):
+        """Los 'n' productos con menos ventas, sin contar los que no vendieron."""
+        return self.menos_vendidos.head(n)
+
+def armar_agregados(dias, por_hora, por_tipo, mas_vendidos, menos_vendidos, hoy=None):
+    """
+    AgregadosVentas a partir de los grupos leídos en SQL: 'dias' (índice de
+    fechas, columnas cantidad, valor y movimientos), la cantidad por hora,
+    los movimientos por tipo y las listas de productos (índice nombre,
+    columnas cantidad y valor).
+    """
+    hoy = np.datetime64(hoy or date.today(), 'D')
+    dias = dias.sort_index()
+    fechas = dias.index.to_numpy().astype('datetime64[D]')
+    cantidad_dia = dias['cantidad'].to_numpy(dtype='float64')
+    movimientos_dia = dias['movimientos'].to_numpy(dtype='float64')
+    indice_dias = pd.DatetimeIndex(fechas)
+
+    # Día de la semana, semana y mes salen de los días, no de los movimientos
+    por_dia_semana = _sumar_por(indice_dias.dayofweek.to_numpy(), cantidad_dia, 7)
+    semanas, codigo_semana = np.unique(indice_dias.isocalendar().week.to_numpy(dtype='int64'),
+                                       return_inverse=True)
+    meses, codigo_mes = np.unique(indice_dias.month.to_numpy(), return_inverse=True)
+
+    posicion_hoy = np.searchsorted(fechas, hoy)
+    ventas_hoy = (int(movimientos_dia[posicion_hoy])
+                  if posicion_hoy < len(fechas) and fechas[posicion_hoy] == hoy else 0)
+    por_tipo = por_tipo.sort_values(ascending=False, kind='stable')
+
+    return AgregadosVentas(
+        total_movimientos=int(movimientos_dia.sum()),
+        total_cantidad=float(cantidad_dia.sum()),
+        total_valor=float(dias['valor'].sum()),
+        ventas_hoy=ventas_hoy,
+        por_dia=_serie(cantidad_dia, indice_dias),
+        valor_por_dia=_serie(dias['valor'].to_numpy(), indice_dias),
+        movimientos_por_dia=_serie(movimientos_dia, indice_dias),
+        por_hora=_serie(por_hora.to_numpy(), por_hora.index),
+        por_dia_semana=_serie(por_dia_semana, pd.RangeIndex(7)),
+        por_semana=_serie(_sumar_por(codigo_semana, cantidad_dia, len(semanas)), pd.Index(semanas)),
+        por_mes=_serie(_sumar_por(codigo_mes, cantidad_dia, len(meses)), pd.Index(meses)),
+        por_tipo=_serie(por_tipo.to_numpy(), por_tipo.index),
+        mas_vendidos=_serie(mas_vendidos['cantidad'].to_numpy(), mas_vendidos.index),
+        valor_mas_vendidos=_serie(mas_vendidos['valor'].to_numpy(), mas_vendidos.index),
+        menos_vendidos=_serie(menos_vendidos['cantidad'].to_numpy(), menos_vendidos.index),
+    )
+
+def agregados_vacios():
+    vacio = pd.DataFrame(columns=['cantidad', 'valor', 'movimientos'], index=pd.DatetimeIndex([]), dtype='float64')
+    productos = pd.DataFrame(columns=['cantidad', 'valor'], dtype='float64')
+    serie = pd.Series(dtype='float64')
+    return armar_agregados(vacio, serie, serie, productos, productos)
+
+def sumar_agregados(agregados, dias, por_hora, por_tipo, mas_vendidos, menos_vendidos):
+    """
+    Nuevo AgregadosVentas con los grupos de los movimientos nuevos sumados a
+    'agregados'; las listas de productos se reemplazan.
+    """
+    anteriores = pd.DataFrame({
+        'cantidad': agregados.por_dia,
+        'valor': agregados.valor_por_dia,
+        'movimientos': agregados.movimientos_por_dia,
+    })
+    return armar_agregados(
+        anteriores.add(dias, fill_value=0),
+        agregados.por_hora.add(por_hora, fill_value=0).sort_index(),
+        agregados.por_tipo.add(por_tipo, fill_value=0),
+        mas_vendidos, menos_vendidos,
+    )
@@ -0,0 +1,179 @@
+"""
+Aplicación de un solo proceso.
+
+Antes cada pantalla era un intérprete de Python nuevo (subprocess.Popen),
+que volvía a importar PyQt5, pandas, etc. y a abrir la base de datos en cada
+cambio de pantalla. Aquí hay una sola QApplication y las pantallas son
+páginas de un QStackedWidget: se crean la primera vez que se abren y el id
+del empleado que inició sesión se les pasa como contexto, no por sys.argv.
+
+Las pantallas de PANTALLAS con método de refresco se conservan y se
+refrescan al volver a ellas; las demás (formularios, reportes) se crean de
+nuevo cada vez, como cuando eran procesos separados. Cerrar la pantalla
+visible (self.close()) vuelve a la anterior.
+
+Uso:
+    python aplicacion.py
+"""
+import sys
+import time
+import logging
+import importlib
+from PyQt5.QtWidgets import QApplication, QMainWindow, QStackedWidget, QMessageBox
+from PyQt5.QtCore import Qt, QEvent, QTimer
+import navegacion
+from permisos import puede_abrir, invalidar_permisos
+
+def _entero(valor):
+    return int(valor) if valor is not None and str(valor).isdigit() else None
+
+# script -> (módulo, clase, argumentos del constructor, método de refresco).
+# 'argumentos' recibe (id_empleado de la sesión, argumentos del script).
+# Con método de refresco None la pantalla no se conserva; con "" se conserva
+# sin refrescar.
+PANTALLAS = {
+    "login.py": ("login", "LoginApp", None, None),
+    "menu.py": ("menu", "MenuPrincipal", lambda emp, args: (emp,), ""),
+    "ventas.py": ("ventas", "VentasWindow", lambda emp, args: (emp,), "buscar_producto"),
+    "ventas_admin.py": ("ventas_admin", "VentasWindow", lambda emp, args: (emp,), "buscar_producto"),
+    "ver_productos.py": ("ver_productos", "ProductManagementWindow", lambda emp, args: (emp,), "_load_products"),
+    "estadistica.py": ("estadistica", "EstadisticasVentas", None, "cargar_estadisticas"),
+    "insertar_producto.py": ("insertar_producto", "InsertarProductoWindow", lambda emp, args: (emp,), None),
+    "Modificar_producto.py": (
+        "Modificar_producto", "ModificarProductoWindow",
+        lambda emp, args: (int(args[0]), emp if emp is not None else _entero(args[1] if len(args) > 1 else None)),
+        None,
+    ),
+    "productos_eliminados.py": ("productos_eliminados", "ProductosEliminadosWindow", None, None),
+    "buscar_empleado.py": ("buscar_empleado", "VerEmpleados", None, None),
+    "insertar_empleado.py": ("insertar_empleado", "InsertarEmpleadoWindow", None, None),
+    "Modificar_empleado.py": ("Modificar_empleado", "ModificarEmpleadoWindow", lambda emp, args: (int(args[0]),), None),
+    "emp_eliminados.py": ("emp_eliminados", "ReporteEmpleadosRetirados", None, None),
+    "reporte_emp.py": ("reporte_emp", "ReporteEmpleados", None, None),
+    "reporte_productos.py": ("reporte_productos", "ReporteProductos", None, None),
+    "historial_prod.py": ("historial_prod", "HistorialProducto", lambda emp, args: (args[0] if args else "P001",), None),
+    "venta_registro.py": ("venta_registro", "LibroDiarioVentas", None, None),
+    "ver_lotes.py": ("ver_lotes", "VerLotesWindow", None, None),
+    "insertar_lotes.py": ("insertar_lotes", "InsertarLoteWindow", None, None),
+    "ver_proveedor.py": ("ver_proveedor", "VerProveedoresWindow", None, None),
+    "insertar_proveedor.py": ("insertar_proveedor", "InsertarProveedorWindow", None, None),
+}
+
+class Aplicacion(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.id_empleado = None
+        self.paginas = QStackedWidget()
+        self.setCentralWidget(self.paginas)
+        # script -> página creada; solo las que se conservan entre visitas
+        self.conservadas = {}
+        # (script, argumentos) de las pantallas visitadas, para volver
+        self.historial = []
+        self._cerrando = False
+        self.paginas.currentChanged.connect(self._actualizar_titulo)
+        navegacion.registrar_aplicacion(self)
+
+    def _crear(self, script, argumentos):
+        modulo, clase, constructor, _ = PANTALLAS[script]
+        clase = getattr(importlib.import_module(modulo), clase)
+        parametros = constructor(self.id_empleado, list(argumentos or [])) if constructor else ()
+        pagina = clase(*parametros)
+        pagina.setWindowFlags(Qt.Widget)
+        pagina.installEventFilter(self)
+        pagina.windowTitleChanged.connect(lambda _: self._actualizar_titulo())
+        return pagina
+
+    def mostrar(self, script, argumentos=None):
+        """Muestra la pantalla 'script'. False si no es una pantalla conocida."""
+        if script not in PANTALLAS:
+            return False
+        if script == "login.py":
+            self.cerrar_sesion()
+        elif self.id_empleado is not None and not puede_abrir(self.id_empleado, script):
+            QMessageBox.warning(self, "Sin permiso", f"Su rol no tiene permiso para abrir {script}.")
+            return True
+        inicio = time.perf_counter()
+        refresco = PANTALLAS[script][3]
+        anterior = self.paginas.currentWidget()
+        try:
+            pagina = self.conservadas.get(script)
+            if pagina is None:
+                pagina = self._crear(script, argumentos)
+                self.paginas.addWidget(pagina)
+                if refresco is not None:
+                    self.conservadas[script] = pagina
+            elif refresco:
+                getattr(pagina, refresco)()
+        except Exception as e:
+            logging.error(f"No se pudo abrir {script}: {e}")
+            QMessageBox.critical(self, "Error", f"No se pudo abrir {script}:\n{e}")
+            return True
+
+        self.paginas.setCurrentWidget(pagina)
+        if anterior is not None and anterior is not pagina and anterior not in self.conservadas.values():
+            self._descartar(anterior)
+        self.historial.append((script, argumentos))
+        del self.historial[:-20]
+        logging.info(f"{script} en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        return True
+
+    def _descartar(self, pagina):
+        self.paginas.removeWidget(pagina)
+        pagina.removeEventFilter(self)
+        pagina.close()
+        pagina.deleteLater()
+
+    def volver(self):
+        """Vuelve a la pantalla anterior (al menú si no hay)."""
+        if self.historial:
+            self.historial.pop()
+        script, argumentos = self.historial.pop() if self.historial else ("menu.py", None)
+        self.mostrar(script, argumentos)
+
+    def iniciar_sesion(self, id_empleado, script):
+        self.cerrar_sesion()
+        self.id_empleado = id_empleado
+        return self.mostrar(script)
+
+    def cerrar_sesion(self):
+        """Olvida el empleado y las pantallas abiertas (guardan su id y su estado)."""
+        if self.id_empleado is not None:
+            invalidar_permisos(self.id_empleado)
+        self.id_empleado = None
+        self.historial.clear()
+        actual = self.paginas.currentWidget()
+        conservadas, self.conservadas = self.conservadas, {}
+        for pagina in conservadas.values():
+            # La visible se descarta al mostrar la siguiente
+            if pagina is not actual:
+                self._descartar(pagina)
+
+    def _actualizar_titulo(self, *_):
+        pagina = self.paginas.currentWidget()
+        if pagina is not None:
+            self.setWindowTitle(pagina.windowTitle())
+
+    def eventFilter(self, objeto, evento):
+        # Una pantalla que se cierra a sí misma estando visible vuelve a la anterior
+        if (evento.type() == QEvent.Close and not self._cerrando
+                and objeto is self.paginas.currentWidget()):
+            QTimer.singleShot(0, self.volver)
+        return super().eventFilter(objeto, evento)
+
+    def closeEvent(self, event):
+        # Cada pantalla recibe su closeEvent (por ejemplo, para cancelar cargas)
+        self._cerrando = True
+        for indice in range(self.paginas.count()):
+            self.paginas.widget(indice).close()
+        event.accept()
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    app = QApplication(sys.argv)
+    ventana = Aplicacion()
+    ventana.mostrar("login.py")
+    ventana.showMaximized()
+    sys.exit(app.exec_())
+
+if __name__ == "__main__":
+    main()
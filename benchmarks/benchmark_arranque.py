@@ -0,0 +1,218 @@
+"""
+Mide cuánto tarda en abrir cada pantalla, cada una en un proceso nuevo con
+la plataforma offscreen de Qt y una base de datos sembrada:
+
+  proceso       desde que se lanza el intérprete hasta la tabla llena
+  importar      importar PyQt5 y el módulo de la pantalla (con lo que importe)
+  constructor   crear la ventana
+  primera_tabla desde que se muestra hasta que alguna tabla tiene filas, o
+                hasta que termina su carga en segundo plano (estadistica.py);
+                null si la pantalla no llena ninguna tabla
+
+Los resultados (mediana de --repeticiones corridas) se guardan en JSON con
+el commit y la fecha, para comparar versiones con --comparar.
+
+Uso:
+    python benchmarks/benchmark_arranque.py
+    python benchmarks/benchmark_arranque.py --db /tmp/farmacia_grande.db --pantallas ventas.py estadistica.py
+    python benchmarks/benchmark_arranque.py --comparar benchmarks/resultados/arranque-anterior.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.dirname(__file__))
+
+CARPETA_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+# Segundos máximos que se espera a que una pantalla llene su primera tabla
+ESPERA_TABLA = 20
+# Segundos máximos por proceso (una pantalla que abre un QMessageBox modal se queda esperando)
+ESPERA_PROCESO = 90
+# Cambio relativo de 'proceso' que --comparar marca como más lenta (entre
+# corridas iguales varía alrededor de un 10 %)
+UMBRAL_REGRESION = 0.20
+MEDIDAS = ("proceso", "importar", "constructor", "primera_tabla")
+
+def medir_pantalla(script, argumentos, id_empleado):
+    """Se ejecuta en el proceso hijo: abre 'script' y devuelve sus tiempos en ms."""
+    t = time.perf_counter()
+    from PyQt5.QtWidgets import QApplication, QTableView
+    from aplicacion import PANTALLAS
+    modulo, clase, constructor, _ = PANTALLAS[script]
+    clase = getattr(__import__(modulo), clase)
+    importar = time.perf_counter() - t
+    app = QApplication(sys.argv[:1])
+
+    t = time.perf_counter()
+    parametros = constructor(id_empleado, argumentos) if constructor else ()
+    ventana = clase(*parametros)
+    constructor_s = time.perf_counter() - t
+
+    t = time.perf_counter()
+    ventana.show()
+    primera_tabla = None
+    cargador = getattr(ventana, "cargador", None)
+    while time.perf_counter() - t < ESPERA_TABLA:
+        app.processEvents()
+        tablas = ventana.findChildren(QTableView)
+        if (any(tabla.model() is not None and tabla.model().rowCount() > 0 for tabla in tablas)
+                or (cargador is not None and not cargador.ocupado)):
+            primera_tabla = time.perf_counter() - t
+            break
+        if not tablas and cargador is None:
+            # Sin tablas ni cargas en segundo plano: ya terminó de abrir
+            break
+        time.sleep(0.001)
+    listo = time.time()
+
+    from importacion_diferida import tiempos_importacion
+    resultado = {
+        "importar": importar * 1000,
+        "constructor": constructor_s * 1000,
+        "primera_tabla": primera_tabla * 1000 if primera_tabla is not None else None,
+        "listo": listo,
+        "importaciones_diferidas": {m: s * 1000 for m, s in tiempos_importacion().items()},
+    }
+    ventana.close()
+    return resultado
+
+def argumentos_de_prueba(db_path):
+    """Argumentos de las pantallas que los necesitan, con datos de la base."""
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    try:
+        id_producto, codigo = conn.execute(
+            "SELECT id_producto, codigo FROM productos ORDER BY id_producto LIMIT 1").fetchone() or (1, "P001")
+        id_empleado = (conn.execute("SELECT MIN(id_empleado) FROM empleado").fetchone() or (None,))[0]
+    finally:
+        conn.close()
+    argumentos = {
+        "Modificar_producto.py": [str(id_producto), str(id_empleado)],
+        "Modificar_empleado.py": [str(id_empleado)],
+        "historial_prod.py": [str(codigo)],
+    }
+    return argumentos, id_empleado
+
+def correr(script, argumentos, id_empleado, db_path):
+    """Lanza un proceso que mide 'script'; devuelve sus tiempos o un error."""
+    entorno = dict(os.environ, FARMACIA_DB_PATH=db_path, QT_QPA_PLATFORM="offscreen")
+    comando = [sys.executable, os.path.abspath(__file__), "--medir", script,
+               "--id-empleado", str(id_empleado), "--"] + argumentos
+    lanzado = time.time()
+    try:
+        salida = subprocess.run(comando, cwd=BASE_DIR, env=entorno, capture_output=True,
+                                text=True, timeout=ESPERA_PROCESO)
+    except subprocess.TimeoutExpired:
+        return {"error": f"sin terminar después de {ESPERA_PROCESO} s"}
+    lineas = [l for l in salida.stdout.splitlines() if l.startswith("{")]
+    if salida.returncode != 0 or not lineas:
+        return {"error": (salida.stderr.strip().splitlines() or ["sin salida"])[-1]}
+    resultado = json.loads(lineas[-1])
+    # Tiempo de pared hasta la primera tabla, incluido el arranque del intérprete
+    resultado["proceso"] = (resultado.pop("listo") - lanzado) * 1000
+    return resultado
+
+def mediana(corridas, medida):
+    valores = [c[medida] for c in corridas if c.get(medida) is not None]
+    return round(statistics.median(valores), 1) if valores else None
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def comparar(resultados, anterior_path):
+    with open(anterior_path, encoding="utf-8") as archivo:
+        anterior = json.load(archivo)
+    print(f"\nComparación con {anterior_path} (commit {anterior.get('commit')}), ms:")
+    print(f"{'pantalla':<26}{'antes':>10}{'ahora':>10}{'cambio':>10}")
+    for script, medidas in resultados["pantallas"].items():
+        antes = anterior.get("pantallas", {}).get(script, {}).get("proceso")
+        ahora = medidas.get("proceso")
+        if antes is None or ahora is None:
+            continue
+        cambio = (ahora - antes) / antes * 100 if antes else 0
+        aviso = "  <-- más lenta" if cambio > UMBRAL_REGRESION * 100 else ""
+        print(f"{script:<26}{antes:>10.0f}{ahora:>10.0f}{cambio:>+9.0f}%{aviso}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque de las pantallas")
+    parser.add_argument("--db", help="Base de datos a usar (por defecto se genera una)")
+    parser.add_argument("--productos", type=int, default=5000)
+    parser.add_argument("--movimientos", type=int, default=100000)
+    parser.add_argument("--pantallas", nargs="+", help="Scripts a medir (por defecto todos)")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--salida", help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    parser.add_argument("--medir", help=argparse.SUPPRESS)
+    parser.add_argument("--id-empleado", help=argparse.SUPPRESS)
+    parser.add_argument("argumentos", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        id_empleado = int(args.id_empleado) if args.id_empleado and args.id_empleado.isdigit() else None
+        print(json.dumps(medir_pantalla(args.medir, args.argumentos, id_empleado)))
+        return
+
+    from aplicacion import PANTALLAS
+    db_path = args.db
+    if not db_path:
+        from sembrar_db import sembrar
+        db_path = os.path.join(tempfile.gettempdir(), "farmacia_benchmark_arranque.db")
+        print(f"Generando {db_path} con {args.productos} productos y {args.movimientos} movimientos...")
+        sembrar(db_path, productos=args.productos, movimientos=args.movimientos)
+        # Las migraciones se aplican una vez aquí y no en la primera pantalla medida
+        from conexion_db import crear_conexion
+        crear_conexion(db_path).close()
+
+    pantallas = args.pantallas or list(PANTALLAS)
+    argumentos, id_empleado = argumentos_de_prueba(db_path)
+    resultados = {
+        "commit": commit_actual(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "db": db_path,
+        "repeticiones": args.repeticiones,
+        "pantallas": {},
+    }
+
+    print(f"{'pantalla':<26}" + "".join(f"{m:>15}" for m in MEDIDAS))
+    for script in pantallas:
+        corridas = [correr(script, argumentos.get(script, []), id_empleado, db_path)
+                    for _ in range(args.repeticiones)]
+        errores = [c["error"] for c in corridas if "error" in c]
+        corridas = [c for c in corridas if "error" not in c]
+        if not corridas:
+            resultados["pantallas"][script] = {"error": errores[0]}
+            print(f"{script:<26}error: {errores[0]}")
+            continue
+        medidas = {m: mediana(corridas, m) for m in MEDIDAS}
+        medidas["importaciones_diferidas"] = corridas[-1]["importaciones_diferidas"]
+        resultados["pantallas"][script] = medidas
+        print(f"{script:<26}" + "".join(
+            f"{medidas[m]:>15.1f}" if medidas[m] is not None else f"{'-':>15}" for m in MEDIDAS))
+
+    salida = args.salida
+    if not salida:
+        os.makedirs(CARPETA_RESULTADOS, exist_ok=True)
+        nombre = f"arranque-{resultados['commit'] or 'sin-commit'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+        salida = os.path.join(CARPETA_RESULTADOS, nombre)
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {salida}")
+
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+if __name__ == "__main__":
+    main()
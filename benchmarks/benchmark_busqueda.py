@@ -0,0 +1,69 @@
+"""
+Compara la búsqueda de productos con LIKE '%texto%' (recorre toda la tabla)
+contra el índice FTS5 productos_fts. Muestra la mediana de tiempo y el
+número de filas de cada búsqueda.
+
+Uso:
+    python benchmarks/benchmark_busqueda.py --productos 50000
+    python benchmarks/benchmark_busqueda.py --db /tmp/farmacia_grande.db
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import tempfile
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from conexion_db import obtener_conexion
+from busqueda_productos import buscar_productos
+from sembrar_db import sembrar
+
+BUSQUEDAS = ["acido", "amox", "ibuprofeno 500", "jarabe", "B00012", "paracetamol tabletas 4"]
+COLUMNAS = ("id_producto", "nombre", "codigo", "precio", "stock")
+
+def buscar_like(conn, texto):
+    like = f"%{texto}%"
+    return conn.execute("""
+        SELECT id_producto, nombre, codigo, precio, stock
+        FROM productos
+        WHERE stock > 0 AND (nombre LIKE ? OR codigo LIKE ?)
+    """, (like, like)).fetchall()
+
+def buscar_fts(conn, texto):
+    return buscar_productos(conn, texto, COLUMNAS, condicion="p.stock > 0")
+
+def medir(funcion, conn, texto, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        filas = funcion(conn, texto)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos), len(filas)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda de productos")
+    parser.add_argument("--db", help="Base de datos a usar (por defecto se genera una)")
+    parser.add_argument("--productos", type=int, default=50000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    db_path = args.db
+    if not db_path:
+        db_path = os.path.join(tempfile.gettempdir(), "farmacia_benchmark_busqueda.db")
+        print(f"Generando {db_path} con {args.productos} productos...")
+        sembrar(db_path, productos=args.productos, movimientos=0)
+
+    # obtener_conexion aplica las migraciones (crea y llena productos_fts)
+    conn = obtener_conexion(db_path)
+    print(f"{'búsqueda':<26}{'LIKE ms':>10}{'filas':>8}{'FTS5 ms':>10}{'filas':>8}")
+    for texto in BUSQUEDAS:
+        antes, filas_antes = medir(buscar_like, conn, texto, args.repeticiones)
+        despues, filas_despues = medir(buscar_fts, conn, texto, args.repeticiones)
+        print(f"{texto:<26}{antes:>10.2f}{filas_antes:>8}{despues:>10.2f}{filas_despues:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compara la latencia de las consultas de cada pantalla abriendo una conexión
+nueva por consulta (comportamiento anterior) contra la conexión reutilizable
+de conexion_db.
+
+Uso:
+    python benchmarks/benchmark_conexiones.py --db /tmp/farmacia_grande.db --repeticiones 50
+    python benchmarks/benchmark_conexiones.py --sembrar  # genera la base grande antes de medir
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import statistics
+import tempfile
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.dirname(__file__))
+
+import conexion_db
+from sembrar_db import sembrar
+
+# Consultas representativas de cada pantalla
+CONSULTAS = {
+    "ver_productos.get_products": ("""
+        SELECT p.id_producto, p.codigo, p.imagen, p.nombre, p.precio, p.stock, p.fecha_venc,
+               IFNULL(e.nombre, 'Sin asignar') as empleado
+        FROM productos p
+        LEFT JOIN empleado e ON p.id_empleado = e.id_empleado
+    """, ()),
+    "venta_registro.cargar_movimientos (hoy)": ("""
+        SELECT mi.id_movimiento, mi.codigo_producto, COALESCE(p.nombre, 'Sin nombre'),
+               mi.tipo_movimiento, mi.cantidad, mi.fecha_movimiento,
+               COALESCE(mi.observaciones, ''), COALESCE(mi.usuario, '')
+        FROM movimientos_inventario mi
+        LEFT JOIN productos p ON mi.codigo_producto = p.codigo
+        WHERE date(mi.fecha_movimiento) = date('now', 'localtime')
+        ORDER BY mi.fecha_movimiento DESC
+    """, ()),
+    "insertar_lotes.obtener_productos": (
+        "SELECT id_producto, nombre, codigo FROM productos ORDER BY nombre", ()),
+    "historial_prod.cargar_historial": ("""
+        SELECT id_movimiento, codigo_producto, tipo_movimiento, cantidad, fecha_movimiento, observaciones, usuario
+        FROM movimientos_inventario
+        WHERE codigo_producto = ?
+        ORDER BY fecha_movimiento DESC
+    """, ("B0000042",)),
+    "login.verificar_usuario": (
+        "SELECT id_empleado, contrasena_hash, rol FROM empleado WHERE nombre = ?", ("admin",)),
+}
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos), max(tiempos)
+
+def consulta_antes(db_path, sql, params):
+    # Lo que hacían las pantallas: conectar, consultar y cerrar
+    conn = sqlite3.connect(db_path)
+    conn.execute(sql, params).fetchall()
+    conn.close()
+
+def consulta_despues(db_path, sql, params):
+    conexion_db.obtener_conexion(db_path).execute(sql, params).fetchall()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de conexiones por pantalla")
+    parser.add_argument("--db", help="Base de datos a usar (por defecto, la generada con --sembrar)")
+    parser.add_argument("--sembrar", action="store_true", help="Generar una base grande temporal")
+    parser.add_argument("--movimientos", type=int, default=200000)
+    parser.add_argument("--repeticiones", type=int, default=30)
+    args = parser.parse_args()
+
+    db_path = args.db
+    if args.sembrar or not db_path:
+        db_path = os.path.join(tempfile.gettempdir(), "farmacia_benchmark.db")
+        print(f"Generando {db_path} con {args.movimientos} movimientos...")
+        sembrar(db_path, movimientos=args.movimientos)
+
+    # Calentar la caché de páginas del sistema operativo para ambos casos
+    consulta_despues(db_path, "SELECT count(*) FROM movimientos_inventario", ())
+
+    print(f"{'Consulta':45} {'antes (ms)':>12} {'después (ms)':>14} {'mejora':>8}")
+    for nombre, (sql, params) in CONSULTAS.items():
+        antes, _ = medir(lambda: consulta_antes(db_path, sql, params), args.repeticiones)
+        despues, _ = medir(lambda: consulta_despues(db_path, sql, params), args.repeticiones)
+        mejora = antes / despues if despues else float("inf")
+        print(f"{nombre:45} {antes:12.3f} {despues:14.3f} {mejora:7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compara los filtros de fecha anteriores (date()/strftime() sobre la columna de
+texto) con los rangos semiabiertos sobre fecha_epoch. Muestra el plan de
+consulta de cada uno y la mediana de tiempo.
+
+Uso:
+    python benchmarks/benchmark_fechas.py --movimientos 1000000
+    python benchmarks/benchmark_fechas.py --db /tmp/farmacia_grande.db
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import tempfile
+from datetime import date
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from conexion_db import obtener_conexion
+from periodos import FILTRO_RANGO, rango_dia, rango_mes, rango_anio
+from sembrar_db import sembrar
+
+def casos(hoy):
+    mes = hoy.strftime('%Y-%m')
+    return [
+        ("día",
+         'date(fecha_movimiento) = ?', [hoy.strftime('%Y-%m-%d')],
+         FILTRO_RANGO, list(rango_dia(hoy))),
+        ("mes",
+         'strftime("%Y-%m", fecha_movimiento) = ?', [mes],
+         FILTRO_RANGO, list(rango_mes(hoy.year, hoy.month))),
+        ("año",
+         'strftime("%Y", fecha_movimiento) = ?', [str(hoy.year)],
+         FILTRO_RANGO, list(rango_anio(hoy.year))),
+        ("ventas del mes",
+         'tipo_movimiento = \'venta\' AND strftime("%Y-%m", fecha_movimiento) = ?', [mes],
+         'tipo_movimiento = \'venta\' AND ' + FILTRO_RANGO, list(rango_mes(hoy.year, hoy.month))),
+    ]
+
+def plan(conn, sql, params):
+    filas = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return "; ".join(fila[-1] for fila in filas)
+
+def medir(conn, sql, params, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        filas = conn.execute(sql, params).fetchall()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos), len(filas)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de filtros por fecha")
+    parser.add_argument("--db", help="Base de datos a usar (por defecto se genera una)")
+    parser.add_argument("--movimientos", type=int, default=500000)
+    parser.add_argument("--repeticiones", type=int, default=10)
+    args = parser.parse_args()
+
+    db_path = args.db
+    if not db_path:
+        db_path = os.path.join(tempfile.gettempdir(), "farmacia_benchmark_fechas.db")
+        print(f"Generando {db_path} con {args.movimientos} movimientos...")
+        sembrar(db_path, movimientos=args.movimientos)
+
+    # obtener_conexion aplica las migraciones (fecha_epoch e índices)
+    conn = obtener_conexion(db_path)
+    base = "SELECT id_movimiento, codigo_producto, cantidad FROM movimientos_inventario WHERE "
+
+    for nombre, sql_antes, p_antes, sql_despues, p_despues in casos(date.today()):
+        antes, filas_antes = medir(conn, base + sql_antes, p_antes, args.repeticiones)
+        despues, filas_despues = medir(conn, base + sql_despues, p_despues, args.repeticiones)
+        print(f"\n== Filtro por {nombre} ({filas_antes} / {filas_despues} filas)")
+        print(f"  antes:   {antes:9.2f} ms  | {plan(conn, base + sql_antes, p_antes)}")
+        print(f"  después: {despues:9.2f} ms  | {plan(conn, base + sql_despues, p_despues)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Genera una copia grande de pruebas.db para las pruebas de rendimiento.
+
+Uso:
+    python benchmarks/sembrar_db.py /tmp/farmacia_grande.db --productos 5000 --movimientos 500000
+"""
+import os
+import sys
+import random
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BASE_DIR)
+
+from conexion_db import obtener_db_path
+
+TIPOS = ['venta', 'venta', 'venta', 'compra', 'entrada', 'ajuste de inventario', 'devolución']
+# Nombres variados (con acentos) para que la búsqueda de productos sea realista
+PRINCIPIOS = ['Ácido acetilsalicílico', 'Amoxicilina', 'Ibuprofeno', 'Paracetamol', 'Loratadina',
+              'Omeprazol', 'Metformina', 'Diclofenaco', 'Cetirizina', 'Vitamina C', 'Clotrimazol',
+              'Ácido fólico', 'Azitromicina', 'Naproxeno', 'Salbutamol', 'Ranitidina']
+PRESENTACIONES = ['tabletas', 'cápsulas', 'jarabe', 'suspensión', 'crema', 'gotas', 'inyectable']
+
+def sembrar(destino, productos=5000, movimientos=500000, dias=730, semilla=1234):
+    """Copia la base de datos actual a 'destino' y la llena con datos sintéticos."""
+    random.seed(semilla)
+    if os.path.exists(destino):
+        os.remove(destino)
+
+    origen = sqlite3.connect(obtener_db_path())
+    conn = sqlite3.connect(destino)
+    origen.backup(conn)
+    origen.close()
+
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("PRAGMA journal_mode = MEMORY")
+
+    vence = int((datetime.now() + timedelta(days=365)).timestamp())
+    codigos = [f"B{i:07d}" for i in range(productos)]
+    cursor.executemany("""
+        INSERT INTO productos (codigo, imagen, nombre, precio, stock, fecha_venc, id_empleado)
+        VALUES (?, '', ?, ?, ?, ?, NULL)
+    """, (
+        (codigo,
+         f"{random.choice(PRINCIPIOS)} {random.choice([100, 250, 500, 750])} mg {random.choice(PRESENTACIONES)} {i}",
+         round(random.uniform(1, 300), 2), random.randint(0, 500), vence)
+        for i, codigo in enumerate(codigos)
+    ))
+
+    fin = datetime.now()
+    segundos = dias * 24 * 3600
+
+    def generar_movimientos():
+        for _ in range(movimientos):
+            fecha = fin - timedelta(seconds=random.randint(0, segundos))
+            yield (
+                random.choice(codigos),
+                random.choice(TIPOS),
+                random.randint(1, 10),
+                fecha.strftime("%Y-%m-%d %H:%M:%S"),
+                "Movimiento sintético",
+                "benchmark",
+            )
+
+    cursor.executemany("""
+        INSERT INTO movimientos_inventario
+            (codigo_producto, tipo_movimiento, cantidad, fecha_movimiento, observaciones, usuario)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, generar_movimientos())
+    conn.commit()
+    cursor.execute("ANALYZE")
+    conn.close()
+    return destino
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera una base de datos grande para benchmarks")
+    parser.add_argument("destino", help="Ruta del archivo .db a generar")
+    parser.add_argument("--productos", type=int, default=5000)
+    parser.add_argument("--movimientos", type=int, default=500000)
+    parser.add_argument("--dias", type=int, default=730)
+    args = parser.parse_args()
+
+    sembrar(args.destino, args.productos, args.movimientos, args.dias)
+    print(f"Base de datos generada en {args.destino}")
+
+if __name__ == "__main__":
+    main()
@@ -5,33 +5,20 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 import sqlite3
-import os
-import subprocess
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla
 from functools import partial
 
-def obtener_db_path():
-    """Retorna la ruta de la base de datos 'pruebas.db'."""
-    if getattr(sys, 'frozen', False):
-        exe_dir = os.path.dirname(sys.executable)
-        db_path = os.path.join(exe_dir, "pruebas.db")
-        if os.path.exists(db_path):
-            return db_path
-        base_path = sys._MEIPASS
-        return os.path.join(base_path, "pruebas.db")
-    else:
-        return os.path.abspath(os.path.join(os.path.dirname(__file__), "pruebas.db"))
-
 db_path = obtener_db_path()
 
 # Función para obtener empleados desde la base de datos
 def obtener_empleados():
     try:
-        conn = sqlite3.connect(db_path)
+        conn = obtener_conexion()
         cursor = conn.cursor()
         # Se incluye apellidos en la consulta
         cursor.execute("SELECT id_empleado, CI, nombre, apellidos, celular, rol, fecha_creacion FROM empleado")
         empleados = cursor.fetchall()
-        conn.close()
         return empleados
     except sqlite3.Error as e:
         QMessageBox.critical(None, "Error", f"No se pudo obtener los datos: {e}")
@@ -39,8 +26,8 @@ def obtener_empleados():
 
 # Función para eliminar un empleado
 def eliminar_empleado(ci):
+    conn = obtener_conexion()
     try:
-        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         
         # 1. Recuperar datos del empleado
@@ -66,10 +53,8 @@ def eliminar_empleado(ci):
             QMessageBox.warning(None, "Advertencia", "Empleado no encontrado.")
             
     except sqlite3.Error as e:
+        conn.rollback()
         QMessageBox.critical(None, "Error", f"No se pudo completar la operación: {e}")
-    finally:
-        if conn:
-            conn.close()
 
 # Clase principal de la ventana
 class VerEmpleados(QMainWindow):
@@ -208,29 +193,14 @@ class VerEmpleados(QMainWindow):
             QMessageBox.warning(self, "Advertencia", "No se proporcionó ID de empleado")
             return
         
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "modificar_empleado.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el script de modificación: {script_path}")
-                return
-
-            # Cierra la ventana actual y abre la de modificación
+        # Abre la ventana de modificación y cierra la actual
+        if abrir_pantalla("Modificar_empleado.py", [str(id_empleado)]):
             self.close()
-            subprocess.Popen([sys.executable, script_path, str(id_empleado)])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir la ventana de modificación: {e}")
 
     def ir_inicio(self):
         """Ir a ventas_admin.py"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "ventas_admin.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("ventas_admin.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir ventas_admin.py: {e}")
 
     def insertar_empleados(self):
         # Abre el programa de insertar empleados
@@ -243,35 +213,17 @@ class VerEmpleados(QMainWindow):
     
     def menu_reportes(self):
         """Abrir el menú de reportes de empleados."""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "reporte_emp.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("reporte_emp.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir el menú de reportes: {e}")
 
     def ir_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
 
 def abrir_aplicacion(nombre_py):
     # Lógica para abrir otras aplicaciones, no la del mismo archivo
-    try:
-        script_path = os.path.join(os.path.dirname(__file__), nombre_py)
-        subprocess.Popen([sys.executable, script_path])
-    except Exception as e:
-        QMessageBox.critical(None, "Error", f"No se pudo abrir el archivo {nombre_py}: {e}")
+    abrir_pantalla(nombre_py)
 
 # Ejecutar la aplicación
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+"""
+Búsqueda de productos por nombre o código con un índice FTS5.
+
+productos_fts es una tabla FTS5 de contenido externo sobre productos
+(nombre, codigo): no duplica los datos, solo el índice, y los triggers
+creados en la migración 5 la mantienen al día. El tokenizador unicode61 con
+remove_diacritics 2 hace que "acido" encuentre "Ácido", y cada palabra
+escrita se busca como prefijo ("amox" encuentra "Amoxicilina"). Los
+resultados salen ordenados por relevancia (bm25), pesando más el nombre.
+
+Si el SQLite instalado no trae FTS5 se busca con LIKE, como antes.
+"""
+import re
+import sqlite3
+import logging
+
+# Peso de cada columna del índice en bm25 (nombre, codigo)
+PESOS_BM25 = (10.0, 5.0)
+# Filas que se muestran por búsqueda
+LIMITE_RESULTADOS = 200
+
+def consulta_fts(texto):
+    """
+    Convierte lo escrito en el buscador en una consulta MATCH: cada palabra
+    entre comillas y como prefijo, todas obligatorias. None si no hay palabras.
+    """
+    palabras = re.findall(r"\w+", texto)
+    if not palabras:
+        return None
+    return " ".join(f'"{palabra}"*' for palabra in palabras)
+
+def buscar_productos(conn, texto, columnas, condicion="", params=(), limite=LIMITE_RESULTADOS):
+    """
+    Devuelve hasta 'limite' filas de productos que coinciden con 'texto', de
+    la más a la menos relevante. 'columnas' es la lista de columnas de
+    productos a devolver y 'condicion' un filtro SQL adicional opcional sobre
+    productos con alias p (por ejemplo "p.stock > 0") con sus 'params'. Con
+    limite=None devuelve todas las coincidencias.
+
+    El filtro se aplica sobre todas las coincidencias y se ordena por bm25
+    antes del LIMIT: ninguna coincidencia queda afuera por no estar entre
+    las primeras del índice.
+    """
+    consulta = consulta_fts(texto)
+    if consulta is None:
+        return []
+    seleccion = ", ".join(f"p.{columna}" for columna in columnas)
+    filtro = f"AND ({condicion})" if condicion else ""
+    sql_limite = f"LIMIT {int(limite)}" if limite else ""
+    try:
+        return conn.execute(f"""
+            SELECT {seleccion}
+            FROM productos_fts
+            JOIN productos p ON p.id_producto = productos_fts.rowid
+            WHERE productos_fts MATCH ? {filtro}
+            ORDER BY bm25(productos_fts, {PESOS_BM25[0]}, {PESOS_BM25[1]})
+            {sql_limite}
+        """, (consulta, *params)).fetchall()
+    except sqlite3.OperationalError as e:
+        if "productos_fts" not in str(e) and "fts5" not in str(e):
+            raise
+        logging.warning(f"Índice de búsqueda no disponible ({e}); se usa LIKE")
+        like = f"%{texto}%"
+        return conn.execute(f"""
+            SELECT {seleccion}
+            FROM productos p
+            WHERE (p.nombre LIKE ? OR p.codigo LIKE ?) {filtro}
+            ORDER BY p.nombre
+            {sql_limite}
+        """, (like, like, *params)).fetchall()
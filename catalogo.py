@@ -0,0 +1,145 @@
+"""
+Catálogo de productos en memoria compartido por las pantallas.
+
+Las pantallas de ventas, productos y lotes leían la tabla productos completa
+cada vez que se cargaban o refrescaban (por ejemplo, después de cada venta).
+El catálogo la lee una sola vez y la indexa por id_producto y por codigo.
+
+Para saber qué cambió, los triggers de la migración 6 anotan en
+catalogo_cambios el id de cada producto insertado, modificado o borrado,
+con un número de versión creciente. Al refrescar solo se vuelven a leer las
+filas con versión mayor a la última vista. Antes de consultar esa tabla se
+mira PRAGMA data_version y total_changes de la conexión: si ninguna otra
+conexión ni esta misma escribió nada desde la última vez, no se hace ninguna
+consulta.
+"""
+import logging
+import threading
+from collections import defaultdict
+from conexion_db import obtener_db_path, obtener_conexion
+
+COLUMNAS = ("id_producto", "codigo", "imagen", "nombre", "precio", "stock", "fecha_venc", "id_empleado")
+
+class Catalogo:
+    """Copia en memoria de la tabla productos, refrescada por versiones."""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or obtener_db_path()
+        self.productos = {}
+        self._ids_por_codigo = defaultdict(set)
+        self._version = None
+        self._conexion_vista = None
+        self._marca = None
+
+    def _leer_filas(self, conn, ids=None):
+        columnas = ", ".join(COLUMNAS)
+        if ids is None:
+            return conn.execute(f"SELECT {columnas} FROM productos").fetchall()
+        filas = []
+        ids = list(ids)
+        # Por tandas para no pasar el límite de parámetros de SQLite
+        for inicio in range(0, len(ids), 500):
+            tanda = ids[inicio:inicio + 500]
+            marcadores = ",".join("?" * len(tanda))
+            filas += conn.execute(
+                f"SELECT {columnas} FROM productos WHERE id_producto IN ({marcadores})", tanda
+            ).fetchall()
+        return filas
+
+    def _quitar(self, id_producto):
+        anterior = self.productos.pop(id_producto, None)
+        if anterior is not None:
+            ids = self._ids_por_codigo[anterior["codigo"]]
+            ids.discard(id_producto)
+            if not ids:
+                del self._ids_por_codigo[anterior["codigo"]]
+
+    def _poner(self, fila):
+        producto = dict(zip(COLUMNAS, fila))
+        self._quitar(producto["id_producto"])
+        self.productos[producto["id_producto"]] = producto
+        self._ids_por_codigo[producto["codigo"]].add(producto["id_producto"])
+
+    def _marca_actual(self, conn):
+        """(data_version, total_changes): cambia si alguien escribió en la base."""
+        return conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes
+
+    def actualizar(self):
+        """
+        Trae los cambios desde la última llamada. Devuelve el conjunto de
+        id_producto que cambiaron (insertados, modificados o borrados), o
+        None si se cargó el catálogo completo.
+        """
+        conn = obtener_conexion(self.db_path)
+        if conn.in_transaction and self._version is not None:
+            # A mitad de una escritura propia: lo visible podría deshacerse
+            return set()
+        marca = self._marca_actual(conn)
+        if self._version is not None and conn is self._conexion_vista and marca == self._marca:
+            return set()
+
+        # La versión se lee antes que las filas: si algo cambia entre las dos
+        # consultas, se vuelve a leer en el próximo refresco.
+        version = conn.execute("SELECT COALESCE(MAX(version), 0) FROM catalogo_cambios").fetchone()[0]
+        if self._version is None:
+            self.productos.clear()
+            self._ids_por_codigo.clear()
+            for fila in self._leer_filas(conn):
+                self._poner(fila)
+            cambiados = None
+            logging.info(f"Catálogo cargado: {len(self.productos)} productos")
+        elif version == self._version:
+            cambiados = set()
+        else:
+            cambiados = {
+                fila[0] for fila in conn.execute(
+                    "SELECT id_producto FROM catalogo_cambios WHERE version > ?", (self._version,)
+                )
+            }
+            for id_producto in cambiados:
+                self._quitar(id_producto)
+            for fila in self._leer_filas(conn, cambiados):
+                self._poner(fila)
+
+        self._version = version
+        self._conexion_vista = conn
+        self._marca = marca
+        return cambiados
+
+    def invalidar(self):
+        """Obliga a recargar todo el catálogo en el próximo acceso."""
+        self._version = None
+
+    def por_id(self, id_producto):
+        self.actualizar()
+        return self.productos.get(id_producto)
+
+    def por_codigo(self, codigo):
+        """codigo no es UNIQUE en productos: devuelve el de menor id_producto."""
+        self.actualizar()
+        ids = self._ids_por_codigo.get(codigo)
+        return self.productos[min(ids)] if ids else None
+
+    def filas(self, columnas, filtro=None, orden=None):
+        """
+        Tuplas con 'columnas' de cada producto, como las devolvería un SELECT.
+        'filtro' es una función opcional que recibe el diccionario del producto;
+        'orden' el nombre de la columna por la que ordenar (por defecto id_producto).
+        """
+        self.actualizar()
+        productos = self.productos.values()
+        if filtro is not None:
+            productos = [p for p in productos if filtro(p)]
+        productos = sorted(productos, key=lambda p: p[orden or "id_producto"])
+        return [tuple(p[c] for c in columnas) for p in productos]
+
+_catalogos = {}
+_lock = threading.Lock()
+
+def obtener_catalogo(db_path=None):
+    """Catálogo compartido del proceso para la base de datos indicada."""
+    db_path = db_path or obtener_db_path()
+    with _lock:
+        if db_path not in _catalogos:
+            _catalogos[db_path] = Catalogo(db_path)
+        return _catalogos[db_path]
@@ -0,0 +1,132 @@
+import os
+import sys
+import sqlite3
+import atexit
+import threading
+import logging
+from migraciones import aplicar_migraciones
+
+# Nombre del archivo de base de datos
+DB_NAME = "pruebas.db"
+
+# Parámetros de ajuste de SQLite. Se pueden sobreescribir con variables de
+# entorno para probar otros valores sin tocar el código.
+BUSY_TIMEOUT_MS = int(os.environ.get("FARMACIA_BUSY_TIMEOUT_MS", 5000))
+MMAP_SIZE = int(os.environ.get("FARMACIA_MMAP_SIZE", 64 * 1024 * 1024))      # 64 MB
+CACHE_SIZE_KB = int(os.environ.get("FARMACIA_CACHE_SIZE_KB", 16 * 1024))     # 16 MB
+CACHED_STATEMENTS = int(os.environ.get("FARMACIA_CACHED_STATEMENTS", 256))
+
+# Conexiones reutilizables, una por hilo y por ruta de base de datos
+_local = threading.local()
+_todas = []
+_todas_lock = threading.Lock()
+
+# Rutas cuyo esquema ya se migró en este proceso
+_migradas = set()
+_migradas_lock = threading.Lock()
+
+def obtener_db_path():
+    """Obtiene la ruta de la base de datos 'pruebas.db'."""
+    ruta_env = os.environ.get("FARMACIA_DB_PATH")
+    if ruta_env:
+        return os.path.abspath(ruta_env)
+    if getattr(sys, 'frozen', False):
+        # Carpeta donde está el ejecutable
+        exe_dir = os.path.dirname(sys.executable)
+        db_path = os.path.join(exe_dir, DB_NAME)
+        if os.path.exists(db_path):
+            return db_path
+        # Si no está, busca en la carpeta temporal de PyInstaller
+        if hasattr(sys, '_MEIPASS'):
+            return os.path.join(sys._MEIPASS, DB_NAME)
+        return db_path
+    # En desarrollo, busca en la carpeta del proyecto
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), DB_NAME))
+
+def configurar_conexion(conn):
+    """Aplica los PRAGMA de rendimiento a una conexión recién abierta."""
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    try:
+        modo = cursor.execute("PRAGMA journal_mode = WAL").fetchone()
+        if modo and str(modo[0]).lower() != "wal":
+            logging.warning(f"No se pudo activar WAL, modo actual: {modo[0]}")
+        # Con WAL, NORMAL es seguro ante caídas de la aplicación y evita un fsync por commit
+        cursor.execute("PRAGMA synchronous = NORMAL")
+    except sqlite3.OperationalError as e:
+        # Por ejemplo, base de datos de solo lectura dentro de _MEIPASS
+        logging.warning(f"No se pudo activar WAL: {e}")
+    cursor.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    # Valor negativo = tamaño en KiB en lugar de número de páginas
+    cursor.execute(f"PRAGMA cache_size = {-CACHE_SIZE_KB}")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.close()
+    return conn
+
+def crear_conexion(db_path=None):
+    """Abre una conexión nueva y ajustada, que el llamador debe cerrar.
+
+    Se usa cuando se necesita una conexión propia (por ejemplo, para poder
+    interrumpirla desde otro hilo). Las pantallas deben usar obtener_conexion().
+    """
+    db_path = db_path or obtener_db_path()
+    conn = sqlite3.connect(
+        db_path,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        cached_statements=CACHED_STATEMENTS,
+    )
+    configurar_conexion(conn)
+    migrar_si_hace_falta(conn, db_path)
+    return conn
+
+def migrar_si_hace_falta(conn, db_path):
+    """Aplica las migraciones pendientes la primera vez que se abre cada base de datos."""
+    db_path = os.path.abspath(db_path)
+    with _migradas_lock:
+        if db_path in _migradas:
+            return
+        try:
+            aplicar_migraciones(conn)
+        except sqlite3.Error as e:
+            # Una base de solo lectura o bloqueada no debe impedir abrir la pantalla
+            logging.error(f"No se pudieron aplicar las migraciones en {db_path}: {e}")
+        _migradas.add(db_path)
+
+def obtener_conexion(db_path=None):
+    """Devuelve la conexión reutilizable del hilo actual.
+
+    La conexión se abre una sola vez por hilo y por base de datos; no se debe
+    cerrar al terminar cada consulta.
+    """
+    db_path = os.path.abspath(db_path or obtener_db_path())
+    conexiones = getattr(_local, "conexiones", None)
+    if conexiones is None:
+        conexiones = _local.conexiones = {}
+    conn = conexiones.get(db_path)
+    if conn is None:
+        conn = crear_conexion(db_path)
+        conexiones[db_path] = conn
+        with _todas_lock:
+            _todas.append(conn)
+    return conn
+
+def cerrar_conexion(db_path=None):
+    """Cierra la conexión reutilizable del hilo actual, si existe."""
+    db_path = os.path.abspath(db_path or obtener_db_path())
+    conexiones = getattr(_local, "conexiones", {})
+    conn = conexiones.pop(db_path, None)
+    if conn is not None:
+        with _todas_lock:
+            if conn in _todas:
+                _todas.remove(conn)
+        conn.close()
+
+@atexit.register
+def _cerrar_todas():
+    with _todas_lock:
+        for conn in _todas:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _todas.clear()
@@ -0,0 +1,200 @@
+"""
+Consultas agregadas de las estadísticas de ventas.
+
+Cada consulta devuelve solo los grupos que necesita una vista (por día, por
+hora, por tipo, los productos más y menos vendidos con ORDER BY ... LIMIT),
+así que lo que ocupan en memoria y lo que tardan en llegar a Python crece
+con la cantidad de grupos y no con la de movimientos. Los días, productos y
+tipos salen del resumen ventas_diarias; las horas, de movimientos_inventario
+(el resumen no las guarda).
+
+Con 'desde_id' las consultas por día, hora y tipo leen solo los movimientos
+con id mayor, para sumarlos a lo ya cargado (ver EstadisticasVentas.refrescar_cambios).
+
+leer_movimientos trae el detalle sin agrupar, solo para exportarlo.
+"""
+import logging
+from importacion_diferida import importar_diferido
+from resumen_ventas import SQL_DIA, SQL_PRECIO_MOVIMIENTO
+from agregados_ventas import armar_agregados, sumar_agregados
+
+pd = importar_diferido("pandas")
+
+# Cuántos productos se traen para las listas de más y menos vendidos
+LIMITE_MAS_VENDIDOS = 20
+LIMITE_MENOS_VENDIDOS = 10
+
+SQL_NOMBRE = """COALESCE((SELECT p.nombre FROM productos p
+                  WHERE p.codigo = {col}
+                  ORDER BY p.id_producto LIMIT 1), 'Producto Desconocido')"""
+
+def _filtros(rango, tipo, desde_id=None, movimientos=False):
+    """
+    Condición WHERE y parámetros sobre ventas_diarias, o sobre
+    movimientos_inventario si 'movimientos' o si hay 'desde_id'.
+    """
+    movimientos = movimientos or desde_id is not None
+    columna_fecha = "fecha_epoch" if movimientos else "dia_epoch"
+    condicion = f"{columna_fecha} >= ? AND {columna_fecha} < ?"
+    params = list(rango)
+    if tipo:
+        condicion += " AND tipo_movimiento = ?"
+        params.append(tipo)
+    if desde_id is not None:
+        condicion += " AND id_movimiento > ?"
+        params.append(desde_id)
+    return condicion, params
+
+def leer_por_dia(conn, rango, tipo=None, desde_id=None):
+    """Cantidad, valor y movimientos por día, indexados por fecha"""
+    condicion, params = _filtros(rango, tipo, desde_id)
+    if desde_id is None:
+        query = f'''
+            SELECT dia, SUM(cantidad), SUM(valor), SUM(movimientos)
+            FROM ventas_diarias
+            WHERE {condicion}
+            GROUP BY dia_epoch
+            ORDER BY dia_epoch
+        '''
+    else:
+        query = f'''
+            SELECT {SQL_DIA.format(col='fecha_movimiento')} AS dia, SUM(cantidad),
+                   SUM(cantidad * {SQL_PRECIO_MOVIMIENTO.format(mov='mi')}), COUNT(*)
+            FROM movimientos_inventario mi
+            WHERE {condicion} AND fecha_movimiento IS NOT NULL
+            GROUP BY dia
+            ORDER BY dia
+        '''
+    filas = conn.execute(query, params).fetchall()
+    dias = pd.DataFrame(filas, columns=['dia', 'cantidad', 'valor', 'movimientos'])
+    dias.index = pd.to_datetime(dias.pop('dia'), format='%Y-%m-%d')
+    return dias.astype('float64')
+
+def leer_por_hora(conn, rango, tipo=None, desde_id=None):
+    """Cantidad por hora del día, agrupada en SQL sobre el rango indexado"""
+    condicion, params = _filtros(rango, tipo, desde_id, movimientos=True)
+    filas = conn.execute(f'''
+        SELECT (fecha_epoch / 3600) % 24 AS hora, SUM(cantidad)
+        FROM movimientos_inventario
+        WHERE {condicion}
+        GROUP BY hora
+    ''', params).fetchall()
+    return pd.Series(dict(filas), dtype='float64').sort_index()
+
+def leer_por_tipo(conn, rango, tipo=None, desde_id=None):
+    """Movimientos por tipo de movimiento"""
+    condicion, params = _filtros(rango, tipo, desde_id)
+    if desde_id is None:
+        query = f"SELECT tipo_movimiento, SUM(movimientos) FROM ventas_diarias WHERE {condicion} GROUP BY tipo_movimiento"
+    else:
+        query = f"SELECT tipo_movimiento, COUNT(*) FROM movimientos_inventario WHERE {condicion} GROUP BY tipo_movimiento"
+    return pd.Series(dict(conn.execute(query, params).fetchall()), dtype='float64')
+
+def leer_productos(conn, rango, tipo=None, limite=LIMITE_MAS_VENDIDOS, menos_vendidos=False):
+    """
+    Los 'limite' productos más vendidos (o los menos vendidos, sin contar los
+    que no vendieron), con cantidad y valor, agrupados por nombre.
+    """
+    condicion, params = _filtros(rango, tipo)
+    orden = "ASC" if menos_vendidos else "DESC"
+    filas = conn.execute(f'''
+        SELECT {SQL_NOMBRE.format(col='t.codigo_producto')} AS nombre,
+               SUM(t.cantidad) AS cantidad, SUM(t.valor) AS valor
+        FROM (
+            SELECT codigo_producto, SUM(cantidad) AS cantidad, SUM(valor) AS valor
+            FROM ventas_diarias
+            WHERE {condicion}
+            GROUP BY codigo_producto
+        ) t
+        GROUP BY nombre
+        {"HAVING SUM(t.cantidad) > 0" if menos_vendidos else ""}
+        ORDER BY cantidad {orden}, nombre
+        LIMIT ?
+    ''', params + [limite]).fetchall()
+    productos = pd.DataFrame(filas, columns=['nombre', 'cantidad', 'valor']).set_index('nombre')
+    return productos.astype('float64')
+
+def leer_agregados(conn, rango, tipo=None, progreso=None):
+    """AgregadosVentas del rango, con una consulta agrupada por vista"""
+    avisar = progreso or (lambda valor: None)
+    dias = leer_por_dia(conn, rango, tipo)
+    avisar(30)
+    por_hora = leer_por_hora(conn, rango, tipo)
+    avisar(60)
+    por_tipo = leer_por_tipo(conn, rango, tipo)
+    mas_vendidos = leer_productos(conn, rango, tipo)
+    avisar(80)
+    menos_vendidos = leer_productos(conn, rango, tipo, LIMITE_MENOS_VENDIDOS, menos_vendidos=True)
+    avisar(100)
+    logging.info(f"Estadísticas: {len(dias)} días, {len(por_hora)} horas, {len(por_tipo)} tipos")
+    return armar_agregados(dias, por_hora, por_tipo, mas_vendidos, menos_vendidos)
+
+def leer_agregados_nuevos(conn, agregados, rango, tipo, desde_id):
+    """
+    Suma a 'agregados' los movimientos con id mayor a 'desde_id'. Las listas
+    de productos se vuelven a consultar: un producto puede entrar o salir de
+    ellas (ventas_diarias ya incluye los movimientos nuevos).
+    """
+    dias = leer_por_dia(conn, rango, tipo, desde_id)
+    if dias.empty:
+        return agregados
+    return sumar_agregados(
+        agregados, dias,
+        leer_por_hora(conn, rango, tipo, desde_id),
+        leer_por_tipo(conn, rango, tipo, desde_id),
+        leer_productos(conn, rango, tipo),
+        leer_productos(conn, rango, tipo, LIMITE_MENOS_VENDIDOS, menos_vendidos=True),
+    )
+
+def leer_movimientos(conn, rango, tipo=None, desde_id=None):
+    """Movimientos sin agrupar del rango; con 'desde_id', solo los de id mayor"""
+    params = list(rango)
+    filtros = ""
+    if tipo:
+        filtros += " AND mi.tipo_movimiento = ?"
+        params.append(tipo)
+    if desde_id is not None:
+        filtros += " AND mi.id_movimiento > ?"
+        params.append(desde_id)
+    
+    query = f'''
+        SELECT
+            mi.id_movimiento,
+            mi.codigo_producto,
+            COALESCE(p.nombre, 'Producto Desconocido') as nombre,
+            COALESCE(mi.precio_unitario, p.precio, 0) as precio_unitario,
+            mi.cantidad,
+            mi.tipo_movimiento,
+            mi."fecha_movimiento" as fecha_movimiento,
+            COALESCE(mi.usuario, 'Sistema') as usuario,
+            COALESCE(mi.observaciones, '') as observaciones,
+            (mi.cantidad * COALESCE(mi.precio_unitario, p.precio, 0)) as valor_total
+        FROM movimientos_inventario mi
+        LEFT JOIN productos p ON mi.codigo_producto = p.codigo
+        WHERE mi.fecha_epoch >= ? AND mi.fecha_epoch < ?
+        {filtros}
+        ORDER BY mi.fecha_epoch DESC
+    '''
+    
+    df = pd.read_sql_query(query, conn, params=params)
+    
+    if not df.empty:
+        # ISO 8601 ('YYYY-mm-dd HH:MM:SS', con o sin fracciones) sin inferir el formato
+        df['fecha_movimiento'] = pd.to_datetime(df['fecha_movimiento'], format='ISO8601', errors='coerce')
+        
+        # Eliminar filas con fechas inválidas
+        df = df.dropna(subset=['fecha_movimiento'])
+        
+        # Limpiar valores numéricos
+        df['cantidad'] = pd.to_numeric(df['cantidad'], errors='coerce').fillna(0)
+        df['precio_unitario'] = pd.to_numeric(df['precio_unitario'], errors='coerce').fillna(0)
+        df['valor_total'] = pd.to_numeric(df['valor_total'], errors='coerce').fillna(0)
+    return df
+
+def ultimo_movimiento(conn):
+    """id_movimiento más alto (AUTOINCREMENT: nunca baja, aunque se borren filas)"""
+    return conn.execute("SELECT COALESCE(MAX(id_movimiento), 0) FROM movimientos_inventario").fetchone()[0]
+
+def version_cambios(conn):
+    """Contador de estadisticas_cambios: sube con todo lo que no es un movimiento nuevo"""
+    return conn.execute("SELECT version FROM estadisticas_cambios WHERE id = 1").fetchone()[0]
@@ -1,13 +1,17 @@
 import sys
-import sqlite3
+from conexion_db import obtener_conexion
+from navegacion import abrir_pantalla, abrir_en_aplicacion
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
     QPushButton, QMessageBox, QHeaderView, QHBoxLayout, QLineEdit
 )
-from fpdf import FPDF
+from importacion_diferida import importar_diferido
 import tempfile
 import os
 
+# Solo para generar el PDF
+fpdf = importar_diferido("fpdf")
+
 class ReporteEmpleadosRetirados(QWidget):
     def __init__(self):
         super().__init__()
@@ -52,18 +56,13 @@ class ReporteEmpleadosRetirados(QWidget):
 
     def ir_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            import subprocess
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
 
     def volver_a_buscar_empleado(self):
+        if abrir_en_aplicacion("buscar_empleado.py"):
+            self.close()
+            return
         try:
             from buscar_empleado import VerEmpleados
             self.ventana_buscar = VerEmpleados()
@@ -73,7 +72,7 @@ class ReporteEmpleadosRetirados(QWidget):
             QMessageBox.critical(self, "Error", f"No se pudo abrir la ventana de búsqueda:\n{e}")
 
     def cargar_datos(self, filtro=""):
-        conexion = sqlite3.connect("pruebas.db")
+        conexion = obtener_conexion()
         cursor = conexion.cursor()
 
         if filtro:
@@ -112,8 +111,6 @@ class ReporteEmpleadosRetirados(QWidget):
 
             self.tabla.setCellWidget(fila_idx, 6, contenedor_botones)
 
-        conexion.close()
-
     def buscar_empleados(self):
         texto = self.input_busqueda.text().strip()
         self.cargar_datos(filtro=texto)
@@ -124,8 +121,8 @@ class ReporteEmpleadosRetirados(QWidget):
             QMessageBox.Yes | QMessageBox.No
         )
         if confirmacion == QMessageBox.Yes:
+            con = obtener_conexion()
             try:
-                con = sqlite3.connect("pruebas.db")
                 cur = con.cursor()
 
                 cur.execute("SELECT * FROM empleados_eliminados WHERE ci = ?", (ci,))
@@ -143,8 +140,8 @@ class ReporteEmpleadosRetirados(QWidget):
                     self.cargar_datos()
                 else:
                     QMessageBox.warning(self, "Error", "Empleado no encontrado.")
-                con.close()
             except Exception as e:
+                con.rollback()
                 QMessageBox.critical(self, "Error", str(e))
 
     def borrar_definitivo(self, ci):
@@ -153,19 +150,19 @@ class ReporteEmpleadosRetirados(QWidget):
             QMessageBox.Yes | QMessageBox.No
         )
         if confirmacion == QMessageBox.Yes:
+            con = obtener_conexion()
             try:
-                con = sqlite3.connect("pruebas.db")
                 cur = con.cursor()
                 cur.execute("DELETE FROM empleados_eliminados WHERE ci = ?", (ci,))
                 con.commit()
-                con.close()
                 QMessageBox.information(self, "Eliminado", "Empleado eliminado permanentemente.")
                 self.cargar_datos()
             except Exception as e:
+                con.rollback()
                 QMessageBox.critical(self, "Error", str(e))
 
     def generar_pdf(self):
-        pdf = FPDF()
+        pdf = fpdf.FPDF()
         pdf.add_page()
         pdf.set_font("Arial", size=10)
         pdf.cell(200, 10, txt="Reporte de Empleados Retirados", ln=True, align='C')
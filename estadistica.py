@@ -1,101 +1,67 @@
 import sys
 import sqlite3
 import os
-import pandas as pd
-import numpy as np
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, 
     QHBoxLayout, QComboBox, QDateEdit, QMessageBox, QGroupBox, QGridLayout,
-    QSplitter, QScrollArea, QFrame, QTableWidgetItem
+    QSplitter, QScrollArea, QFrame, QTableWidgetItem, QProgressBar
 )
 from PyQt5.QtCore import Qt, QDate, QTimer
 from PyQt5.QtGui import QFont, QPalette, QColor
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from datetime import datetime, timedelta
-import seaborn as sns
 import logging
+from importacion_diferida import importar_diferido
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla, abrir_en_aplicacion
+from periodos import rango_dias
+from tareas_fondo import CargadorEnSegundoPlano
+from agregados_ventas import agregados_vacios
+from consultas_estadisticas import (
+    leer_agregados, leer_agregados_nuevos, leer_movimientos, ultimo_movimiento,
+    version_cambios
+)
+from graficos_estadisticas import PanelGraficos
+from reporte_estadisticas import escribir_excel, reporte_html
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Configurar estilo de matplotlib
-plt.style.use('default')
-sns.set_palette("husl")
-
-def obtener_db_path():
-    """Obtiene la ruta de la base de datos de forma robusta"""
-    try:
-        if getattr(sys, 'frozen', False):
-            exe_dir = os.path.dirname(sys.executable)
-            db_path = os.path.join(exe_dir, "pruebas.db")
-            if os.path.exists(db_path):
-                return db_path
-            if hasattr(sys, '_MEIPASS'):
-                base_path = sys._MEIPASS
-                return os.path.join(base_path, "pruebas.db")
-        else:
-            return os.path.abspath(os.path.join(os.path.dirname(__file__), "pruebas.db"))
-    except Exception as e:
-        logging.error(f"Error obteniendo ruta de DB: {e}")
-        return "pruebas.db"
-
-def crear_tablas_si_no_existen():
-    """Crea las tablas necesarias si no existen"""
-    try:
-        conn = sqlite3.connect(obtener_db_path())
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS movimientos_inventario (
-                id_movimiento INTEGER PRIMARY KEY AUTOINCREMENT,
-                codigo_producto TEXT NOT NULL,
-                tipo_movimiento TEXT NOT NULL,
-                cantidad REAL NOT NULL,
-                "fecha_movimiento" DATETIME NOT NULL,
-                observaciones TEXT,
-                usuario TEXT
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS productos (
-                codigo TEXT PRIMARY KEY,
-                nombre TEXT NOT NULL,
-                presentacion TEXT,
-                linea TEXT,
-                precio REAL DEFAULT 0.0
-            )
-        ''')
-        
-        # Crear índices para mejorar rendimiento
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_movimientos_fecha ON movimientos_inventario("fecha_movimiento")')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_movimientos_tipo ON movimientos_inventario(tipo_movimiento)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_movimientos_codigo ON movimientos_inventario(codigo_producto)')
-        
-        conn.commit()
-        conn.close()
-        logging.info("Tablas y índices verificados/creados correctamente")
-    except Exception as e:
-        logging.error(f"Error creando tablas: {e}")
+# pandas se importa la primera vez que se usa; matplotlib y seaborn, con el
+# primer gráfico (graficos_estadisticas.py)
+pd = importar_diferido("pandas")
 
 class EstadisticasVentas(QMainWindow):
     def __init__(self):
         super().__init__()
         self.db_path = obtener_db_path()
-        self.df_ventas = pd.DataFrame()
-        
-        # Crear tablas si no existen
-        crear_tablas_si_no_existen()
+        # Movimientos sin agrupar; solo se cargan cuando se exportan
+        self.df_ventas = None
+        # Todas las agrupaciones que leen gráficos y reportes, ya agrupadas
+        # en SQL (consultas_estadisticas.py, agregados_ventas.py)
+        self.agregados = agregados_vacios()
+        # Hasta qué movimiento incluyen los datos cargados, y el contador de
+        # estadisticas_cambios en ese momento (ver refrescar_cambios)
+        self.ultimo_id = None
+        self.version_cambios = None
+        
+        # Las consultas corren en otro hilo; un cambio de filtro cancela la anterior
+        self.cargador = CargadorEnSegundoPlano(self.db_path, self)
+        self.cargador.iniciado.connect(self.mostrar_progreso)
+        self.cargador.progreso.connect(lambda valor: self.barra_progreso.setValue(valor))
+        self.cargador.terminado.connect(self.mostrar_estadisticas)
+        self.cargador.fallo.connect(self.mostrar_error_carga)
+        # Movimientos nuevos que se suman a lo ya cargado
+        self.cargador_cambios = CargadorEnSegundoPlano(self.db_path, self)
+        self.cargador_cambios.terminado.connect(self.sumar_cambios)
+        self.cargador_cambios.fallo.connect(
+            lambda error: logging.error(f"Error leyendo movimientos nuevos: {error}"))
         
         self.setGeometry(50, 20, 1700, 1200)
         self.init_ui()
         
         # Timer para actualización automática cada 5 minutos
         self.timer = QTimer()
-        self.timer.timeout.connect(self.cargar_estadisticas)
+        self.timer.timeout.connect(self.refrescar_cambios)
         self.timer.start(300000)  # 5 minutos
         
         # Cargar datos iniciales
@@ -234,6 +200,14 @@ class EstadisticasVentas(QMainWindow):
         btn_actualizar.clicked.connect(self.cargar_estadisticas)
         filtros_layout.addWidget(btn_actualizar)
         
+        # Indicador de carga en segundo plano
+        self.barra_progreso = QProgressBar()
+        self.barra_progreso.setRange(0, 100)
+        self.barra_progreso.setFormat('Cargando... %p%')
+        self.barra_progreso.setMaximumWidth(200)
+        self.barra_progreso.hide()
+        filtros_layout.addWidget(self.barra_progreso)
+        
         filtros_layout.addStretch()
         layout.addWidget(filtros_group)
 
@@ -274,15 +248,13 @@ class EstadisticasVentas(QMainWindow):
         graficos_layout = QVBoxLayout()
         graficos_widget.setLayout(graficos_layout)
         
-        # Crear figura con subplots
-        self.figure = Figure(figsize=(14, 10), dpi=100)
-        self.figure.patch.set_facecolor('white')
-        self.canvas = FigureCanvas(self.figure)
+        # Una sola figura; cada vista crea sus ejes la primera vez que se muestra
+        self.graficos = PanelGraficos()
         
         # Área de scroll para el canvas
         scroll_area = QScrollArea()
         scroll_area.setWidgetResizable(True)
-        scroll_area.setWidget(self.canvas)
+        scroll_area.setWidget(self.graficos.canvas)
         
         graficos_layout.addWidget(scroll_area)
         parent.addWidget(graficos_widget)
@@ -331,6 +303,9 @@ class EstadisticasVentas(QMainWindow):
         layout.addWidget(controles_group)
 
     def ir_a_ventas_admin(self):
+        if abrir_en_aplicacion("ventas_admin.py"):
+            self.close()
+            return
         try:
             from ventas_admin import VentasWindow
             self.nueva_ventana = VentasWindow()
@@ -340,6 +315,9 @@ class EstadisticasVentas(QMainWindow):
             QMessageBox.critical(self, 'Error', f'No se pudo abrir Ventas Admin:\n{e}')
 
     def volver_a_venta_registro(self):
+        if abrir_en_aplicacion("venta_registro.py"):
+            self.close()
+            return
         try:
             from venta_registro import LibroDiarioVentas
             self.nueva_ventana = LibroDiarioVentas()
@@ -350,65 +328,12 @@ class EstadisticasVentas(QMainWindow):
 
     def ir_a_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            import subprocess
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
 
     def mostrar_productos_menos_populares(self):
         """Muestra los productos menos vendidos de menor a mayor"""
-        try:
-            if self.df_ventas.empty:
-                self.limpiar_graficos()
-                return
-            
-            self.figure.clear()
-            
-            # Bottom 10 productos (excluyendo los que nunca se vendieron)
-            if 'nombre' not in self.df_ventas.columns or 'cantidad' not in self.df_ventas.columns:
-                ax = self.figure.add_subplot(111)
-                ax.text(0.5, 0.5, 'No hay datos de productos/cantidades', ha='center', va='center', fontsize=14)
-                self.canvas.draw()
-                return
-            
-            productos_vendidos = self.df_ventas.groupby('nombre')['cantidad'].sum()
-            menos_populares = productos_vendidos[productos_vendidos > 0].nsmallest(10)
-            
-            ax = self.figure.add_subplot(111)
-            if menos_populares.empty:
-                ax.text(0.5, 0.5, 'No hay productos con ventas bajas', ha='center', va='center', fontsize=14)
-            else:
-                try:
-                    bars = ax.barh(range(len(menos_populares)), menos_populares.values, color=sns.color_palette("crest", len(menos_populares)))
-                except Exception:
-                    bars = ax.barh(range(len(menos_populares)), menos_populares.values, color='gray')
-                
-                ax.set_yticks(range(len(menos_populares)))
-                ax.set_yticklabels(menos_populares.index)
-                ax.set_xlabel('Cantidad Vendida')
-                ax.set_title('Top 10 Productos Menos Populares', fontsize=16, fontweight='bold')
-                
-                # No invertir el eje Y, así se muestra de menor a mayor (menos vendido arriba)
-                
-                # Agregar valores en las barras
-                for i, (bar, valor) in enumerate(zip(bars, menos_populares.values)):
-                    ax.text(valor + max(menos_populares.values)*0.01 if max(menos_populares.values) > 0 else 0.1, 
-                            i, f'{valor:.0f}', va='center', fontsize=10, fontweight='bold')
-                
-                ax.grid(True, alpha=0.3, axis='x')
-            
-            self.figure.tight_layout()
-            self.canvas.draw()
-            
-        except Exception as e:
-            logging.error(f"Error mostrando productos menos populares: {e}")
-            QMessageBox.warning(self, 'Error', f'Error generando gráfico: {e}')
+        self.mostrar_vista('menos_populares')
 
     def on_periodo_changed(self):
         """Maneja el cambio de período"""
@@ -441,58 +366,9 @@ class EstadisticasVentas(QMainWindow):
                 logging.warning(f"Base de datos no encontrada: {self.db_path}")
                 return pd.DataFrame()
             
-            conn = sqlite3.connect(self.db_path)
-            
-            # Determinar tipo de movimiento a consultar
-            tipo_filtro = ""
-            tipo_seleccionado = self.combo_tipo.currentText()
-            if tipo_seleccionado == 'Ventas':
-                tipo_filtro = "AND mi.tipo_movimiento = 'venta'"
-            elif tipo_seleccionado == 'Compras':
-                tipo_filtro = "AND mi.tipo_movimiento = 'compra'"
-            
-            # Obtener fechas en formato correcto
-            fecha_inicio = self.date_inicio.date().toPyDate().strftime('%Y-%m-%d')
-            fecha_fin = self.date_fin.date().toPyDate().strftime('%Y-%m-%d')
-            
-            query = f'''
-                SELECT
-                    mi.id_movimiento,
-                    mi.codigo_producto,
-                    COALESCE(p.nombre, 'Producto Desconocido') as nombre,
-                    COALESCE(p.precio, 0) as precio_unitario,
-                    mi.cantidad,
-                    mi.tipo_movimiento,
-                    mi."fecha_movimiento" as fecha_movimiento,
-                    COALESCE(mi.usuario, 'Sistema') as usuario,
-                    COALESCE(mi.observaciones, '') as observaciones,
-                    (mi.cantidad * COALESCE(p.precio, 0)) as valor_total
-                FROM movimientos_inventario mi
-                LEFT JOIN productos p ON mi.codigo_producto = p.codigo
-                WHERE DATE(mi."fecha_movimiento") BETWEEN '{fecha_inicio}' AND '{fecha_fin}'
-                {tipo_filtro}
-                ORDER BY mi."fecha_movimiento" DESC
-            '''
-            
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            
-            if not df.empty:
-                # Convertir fecha a datetime - manejar diferentes formatos
-                try:
-                    df['fecha_movimiento'] = pd.to_datetime(df['fecha_movimiento'], errors='coerce')
-                except:
-                    # Si falla, intentar con formato específico
-                    df['fecha_movimiento'] = pd.to_datetime(df['fecha_movimiento'], 
-                                                           format='%Y-%m-%d %H:%M:%S', errors='coerce')
-                
-                # Eliminar filas con fechas inválidas
-                df = df.dropna(subset=['fecha_movimiento'])
-                
-                # Limpiar valores numéricos
-                df['cantidad'] = pd.to_numeric(df['cantidad'], errors='coerce').fillna(0)
-                df['precio_unitario'] = pd.to_numeric(df['precio_unitario'], errors='coerce').fillna(0)
-                df['valor_total'] = pd.to_numeric(df['valor_total'], errors='coerce').fillna(0)
+            conn = obtener_conexion(self.db_path)
+            rango, tipo = self.filtros_actuales()
+            df = leer_movimientos(conn, rango, tipo)
             
             logging.info(f"Cargados {len(df)} registros de ventas")
             return df
@@ -502,22 +378,144 @@ class EstadisticasVentas(QMainWindow):
             QMessageBox.critical(self, 'Error', f'Error cargando datos: {e}')
             return pd.DataFrame()
 
+    def tipo_movimiento_filtro(self):
+        """Tipo de movimiento elegido en el combo, o None para todos"""
+        return {'Ventas': 'venta', 'Compras': 'compra'}.get(self.combo_tipo.currentText())
+
+    def filtros_actuales(self):
+        """(rango de fecha_epoch, tipo de movimiento) elegidos en los filtros"""
+        rango = rango_dias(
+            self.date_inicio.date().toPyDate(),
+            self.date_fin.date().toPyDate()
+        )
+        return rango, self.tipo_movimiento_filtro()
+
+    def obtener_df_ventas(self):
+        """Movimientos sin agrupar del período, cargados la primera vez que se piden"""
+        if self.df_ventas is None:
+            self.df_ventas = self.cargar_datos_ventas()
+        return self.df_ventas
+
     def cargar_estadisticas(self):
-        """Carga y actualiza todas las estadísticas"""
+        """Lanza la carga de las estadísticas en segundo plano"""
+        rango, tipo = self.filtros_actuales()
+        
+        def cargar(conn, progreso):
+            # Una sola transacción de lectura: ultimo_id y la versión
+            # corresponden exactamente a los datos incluidos en el resumen
+            conn.execute("BEGIN")
+            try:
+                ultimo_id = ultimo_movimiento(conn)
+                version = version_cambios(conn)
+                # Solo los grupos de cada vista; el detalle se pide solo al exportar
+                agregados = leer_agregados(conn, rango, tipo, progreso)
+            finally:
+                conn.rollback()
+            return agregados, ultimo_id, version
+        
+        self.cargador_cambios.cancelar()
+        self.cargador.cargar(cargar)
+
+    def refrescar_cambios(self):
+        """
+        Actualización automática. Si nada cambió desde la última carga no
+        consulta nada más; si solo llegaron movimientos nuevos, lee esos y
+        los suma a lo cargado; si cambió otra cosa, recarga todo.
+        """
+        if self.cargador.ocupado or self.cargador_cambios.ocupado:
+            return
+        if self.ultimo_id is None:
+            self.cargar_estadisticas()
+            return
+        # El contador lo suben triggers, así que también ve lo que escribió
+        # esta misma conexión (PRAGMA data_version solo ve otras conexiones)
         try:
-            # Cargar datos
-            self.df_ventas = self.cargar_datos_ventas()
+            conn = obtener_conexion(self.db_path)
+            version = version_cambios(conn)
+            ultimo_id = ultimo_movimiento(conn)
+        except sqlite3.Error as e:
+            logging.error(f"Error revisando cambios: {e}")
+            return
+        if version != self.version_cambios:
+            # Cambió algo que no son movimientos nuevos (productos,
+            # ediciones o borrados): se recarga todo
+            self.cargar_estadisticas()
+            return
+        if ultimo_id == self.ultimo_id:
+            logging.info("Estadísticas sin cambios")
+            return
+        
+        rango, tipo = self.filtros_actuales()
+        desde_id = self.ultimo_id
+        version_cargada = self.version_cambios
+        agregados = self.agregados
+        con_detalle = self.df_ventas is not None
+        
+        def cargar(conn, progreso):
+            conn.execute("BEGIN")
+            try:
+                if version_cambios(conn) != version_cargada:
+                    # Entre la revisión y esta lectura hubo una edición o un borrado
+                    return desde_id, None, None, None
+                hasta_id = ultimo_movimiento(conn)
+                nuevos = leer_agregados_nuevos(conn, agregados, rango, tipo, desde_id)
+                detalle = leer_movimientos(conn, rango, tipo, desde_id) if con_detalle else None
+            finally:
+                conn.rollback()
+            return desde_id, hasta_id, nuevos, detalle
+        
+        self.cargador_cambios.cargar(cargar)
+
+    def sumar_cambios(self, resultado):
+        """Suma los movimientos nuevos a los datos y agregados ya cargados"""
+        desde_id, hasta_id, nuevos, detalle = resultado
+        if desde_id != self.ultimo_id:
+            # Mientras se leían hubo una recarga completa
+            return
+        if hasta_id is None:
+            self.cargar_estadisticas()
+            return
+        self.ultimo_id = hasta_id
+        logging.info(f"Estadísticas: {nuevos.total_movimientos - self.agregados.total_movimientos} "
+                     f"movimientos nuevos hasta el id {hasta_id}")
+        if nuevos is self.agregados:
+            return
+        try:
+            self.agregados = nuevos
+            if detalle is not None and self.df_ventas is not None:
+                # df_ventas pudo cargarse después de desde_id y tener ya algunos
+                detalle = detalle[~detalle['id_movimiento'].isin(self.df_ventas['id_movimiento'])]
+                self.df_ventas = pd.concat([detalle, self.df_ventas], ignore_index=True)
+            self.calcular_estadisticas()
+            self.refrescar_graficos()
+        except Exception as e:
+            logging.error(f"Error sumando movimientos nuevos: {e}")
+            self.cargar_estadisticas()
+
+    def mostrar_progreso(self):
+        self.barra_progreso.setValue(0)
+        self.barra_progreso.show()
+
+    def mostrar_error_carga(self, error):
+        self.barra_progreso.hide()
+        logging.error(f"Error cargando estadísticas: {error}")
+        QMessageBox.critical(self, 'Error', f'Error cargando datos: {error}')
+
+    def mostrar_estadisticas(self, resultado):
+        """Actualiza resumen y gráficos con los datos cargados en segundo plano"""
+        self.barra_progreso.hide()
+        try:
+            self.agregados, self.ultimo_id, self.version_cambios = resultado
+            self.df_ventas = None
             
-            if self.df_ventas.empty:
+            if self.agregados.vacio:
                 self.actualizar_stats_vacias()
-                self.limpiar_graficos()
-                return
-            
-            # Calcular estadísticas
-            self.calcular_estadisticas()
+            else:
+                # Calcular estadísticas
+                self.calcular_estadisticas()
             
-            # Actualizar gráficos por defecto
-            self.mostrar_ventas_tiempo()
+            # La vista que se está mostrando (al abrir, ventas por tiempo)
+            self.refrescar_graficos()
             
         except Exception as e:
             logging.error(f"Error en cargar_estadisticas: {e}")
@@ -526,23 +524,23 @@ class EstadisticasVentas(QMainWindow):
     def calcular_estadisticas(self):
         """Calcula las estadísticas principales"""
         try:
-            df = self.df_ventas
+            agregados = self.agregados
             
             # Validar que tenemos datos
-            if df.empty:
+            if agregados.vacio:
                 self.actualizar_stats_vacias()
                 return
             
             # Estadísticas básicas
-            total_movimientos = len(df)
-            total_productos = df['cantidad'].sum()
+            total_movimientos = agregados.total_movimientos
+            total_productos = agregados.total_cantidad
             
             # Producto más vendido
             try:
-                productos_vendidos = df.groupby('nombre')['cantidad'].sum()
+                productos_vendidos = agregados.mas_vendidos
                 if not productos_vendidos.empty:
-                    producto_top = productos_vendidos.idxmax()
-                    cantidad_top = productos_vendidos.max()
+                    producto_top = productos_vendidos.index[0]
+                    cantidad_top = productos_vendidos.iloc[0]
                     producto_top_texto = f"{producto_top} ({cantidad_top:.0f} unidades)"
                 else:
                     producto_top_texto = "N/A"
@@ -550,23 +548,22 @@ class EstadisticasVentas(QMainWindow):
                 logging.warning(f"Error calculando producto top: {e}")
                 producto_top_texto = "N/A"
             
-            # Valor promedio (si hay precios)
+            # Valor promedio por movimiento (si hay precios)
             try:
-                valor_promedio = df['valor_total'].mean() if 'valor_total' in df.columns else 0
+                valor_promedio = agregados.valor_promedio
             except Exception as e:
                 logging.warning(f"Error calculando valor promedio: {e}")
                 valor_promedio = 0
             
             # Ventas de hoy
             try:
-                hoy = pd.Timestamp.now().date()
-                ventas_hoy = len(df[df['fecha_movimiento'].dt.date == hoy])
+                ventas_hoy = agregados.ventas_hoy
             except Exception as e:
                 logging.warning(f"Error calculando ventas de hoy: {e}")
                 ventas_hoy = 0
             
             # Tendencia (comparar con período anterior)
-            tendencia = self.calcular_tendencia(df)
+            tendencia = self.calcular_tendencia(agregados.por_dia)
             
             # Actualizar labels de forma segura
             try:
@@ -583,15 +580,9 @@ class EstadisticasVentas(QMainWindow):
             logging.error(f"Error calculando estadísticas: {e}")
             self.actualizar_stats_vacias()
 
-    def calcular_tendencia(self, df):
-        """Calcula la tendencia de ventas"""
+    def calcular_tendencia(self, df_dias):
+        """Calcula la tendencia de ventas a partir de la cantidad por día"""
         try:
-            if df.empty or len(df) < 2:
-                return "Sin datos suficientes"
-            
-            # Agrupar por día y calcular promedio de los últimos días
-            df_dias = df.groupby(df['fecha_movimiento'].dt.date)['cantidad'].sum()
-            
             if len(df_dias) < 2:
                 return "Sin datos suficientes"
             
@@ -624,292 +615,63 @@ class EstadisticasVentas(QMainWindow):
         except Exception as e:
             logging.error(f"Error actualizando stats vacías: {e}")
 
-    def limpiar_graficos(self):
-        """Limpia los gráficos cuando no hay datos"""
+    def mostrar_vista(self, nombre):
+        """Muestra una vista de gráficos con los agregados cargados"""
         try:
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-            ax.text(0.5, 0.5, 'No hay datos para mostrar\nSeleccione un período diferente', 
-                    ha='center', va='center', fontsize=16, color='gray')
-            ax.set_xticks([])
-            ax.set_yticks([])
-            self.canvas.draw()
+            self.graficos.mostrar(nombre, self.agregados)
         except Exception as e:
-            logging.error(f"Error limpiando gráficos: {e}")
+            logging.error(f"Error mostrando la vista {nombre}: {e}")
+            QMessageBox.warning(self, 'Error', f'Error generando gráfico: {e}')
 
-    def mostrar_ventas_tiempo(self):
-        """Muestra gráfico de ventas por tiempo"""
+    def refrescar_graficos(self):
+        """Actualiza la vista que se está mostrando; las demás, al volver a ellas"""
         try:
-            if self.df_ventas.empty:
-                self.limpiar_graficos()
-                return
-            
-            self.figure.clear()
-            
-            # Crear subplots con manejo de errores
-            try:
-                gs = self.figure.add_gridspec(3, 2, hspace=0.5, wspace=0.3)
-            except Exception as e:
-                logging.error(f"Error creando gridspec: {e}")
-                ax = self.figure.add_subplot(111)
-                ax.text(0.5, 0.5, 'Error configurando gráficos', ha='center', va='center', fontsize=14)
-                self.canvas.draw()
-                return
-
-            try:
-                # Gráfico 1: Ventas por día (arriba, ocupa toda la fila)
-                ax1 = self.figure.add_subplot(gs[0, :])
-                df_dias = self.df_ventas.groupby(self.df_ventas['fecha_movimiento'].dt.date)['cantidad'].sum()
-                
-                if not df_dias.empty:
-                    ax1.plot(df_dias.index, df_dias.values, marker='o', linewidth=2, markersize=4)
-                    ax1.set_title('Cantidad Vendida por Día', fontsize=14, fontweight='bold')
-                    ax1.set_xlabel('Fecha')
-                    ax1.set_ylabel('Cantidad')
-                    ax1.grid(True, alpha=0.3)
-                    ax1.tick_params(axis='x', rotation=45)
-                else:
-                    ax1.text(0.5, 0.5, 'Sin datos por día', ha='center', va='center')
-            except Exception as e:
-                logging.error(f"Error en gráfico de días: {e}")
-
-            try:
-                # Gráfico 2: Distribución por tipo de movimiento
-                ax2 = self.figure.add_subplot(gs[2, 0])
-                tipo_counts = self.df_ventas['tipo_movimiento'].value_counts()
-                
-                if not tipo_counts.empty:
-                    try:
-                        colors = sns.color_palette("Set3", len(tipo_counts))
-                    except:
-                        colors = ['skyblue', 'lightcoral', 'lightgreen', 'gold'][:len(tipo_counts)]
-                    
-                    ax2.pie(tipo_counts.values, labels=tipo_counts.index, autopct='%1.1f%%', colors=colors)
-                    ax2.set_title('Distribución por Tipo', fontsize=12, fontweight='bold')
-                else:
-                    ax2.text(0.5, 0.5, 'Sin datos de tipos', ha='center', va='center')
-            except Exception as e:
-                logging.error(f"Error en gráfico de tipos: {e}")
-
-            try:
-                # Gráfico 3: Ventas por hora del día
-                ax3 = self.figure.add_subplot(gs[2, 1])
-                
-                # Verificar que tenemos fecha_movimiento válida
-                if 'fecha_movimiento' in self.df_ventas.columns and not self.df_ventas['fecha_movimiento'].isna().all():
-                    self.df_ventas['hora'] = self.df_ventas['fecha_movimiento'].dt.hour
-                    ventas_hora = self.df_ventas.groupby('hora')['cantidad'].sum()
-                    
-                    if not ventas_hora.empty:
-                        ax3.bar(ventas_hora.index, ventas_hora.values, alpha=0.7, color='skyblue')
-                        ax3.set_title('Ventas por Hora del Día', fontsize=12, fontweight='bold')
-                        ax3.set_xlabel('Hora')
-                        ax3.set_ylabel('Cantidad')
-                        ax3.grid(True, alpha=0.3)
-                    else:
-                        ax3.text(0.5, 0.5, 'Sin datos por hora', ha='center', va='center')
-                else:
-                    ax3.text(0.5, 0.5, 'Sin datos de fechas válidas', ha='center', va='center')
-            except Exception as e:
-                logging.error(f"Error en gráfico de horas: {e}")
-
-            self.figure.tight_layout()
-            self.canvas.draw()
-            
+            self.graficos.refrescar(self.agregados)
         except Exception as e:
-            logging.error(f"Error mostrando ventas por tiempo: {e}")
-            QMessageBox.warning(self, 'Error', f'Error generando gráfico: {e}')
+            logging.error(f"Error actualizando gráficos: {e}")
+
+    def mostrar_ventas_tiempo(self):
+        """Muestra gráfico de ventas por tiempo"""
+        self.mostrar_vista('ventas_tiempo')
 
     def mostrar_top_productos(self):
         """Muestra los productos más vendidos de mayor a menor"""
-        try:
-            if self.df_ventas.empty:
-                self.limpiar_graficos()
-                return
-
-            self.figure.clear()
-
-            # Verificar que tenemos las columnas necesarias
-            if 'nombre' not in self.df_ventas.columns or 'cantidad' not in self.df_ventas.columns:
-                ax = self.figure.add_subplot(111)
-                ax.text(0.5, 0.5, 'No hay datos de productos/cantidades disponibles', 
-                       ha='center', va='center', fontsize=14)
-                self.canvas.draw()
-                return
-
-            # Top 10 productos de mayor a menor
-            top_productos = self.df_ventas.groupby('nombre')['cantidad'].sum().sort_values(ascending=False).head(10)
-
-            if top_productos.empty:
-                ax = self.figure.add_subplot(111)
-                ax.text(0.5, 0.5, 'No hay productos para mostrar', ha='center', va='center', fontsize=14)
-                self.canvas.draw()
-                return
-
-            ax = self.figure.add_subplot(111)
-
-            try:
-                colors = sns.color_palette("viridis", len(top_productos))
-            except:
-                colors = ['skyblue'] * len(top_productos)
-
-            bars = ax.barh(range(len(top_productos)), top_productos.values, color=colors)
-            ax.set_yticks(range(len(top_productos)))
-            ax.set_yticklabels(top_productos.index)
-            ax.set_xlabel('Cantidad Vendida')
-            ax.set_title('Top 10 Productos Más Vendidos', fontsize=16, fontweight='bold')
-
-            # Mostrar de mayor a menor (más vendido arriba)
-            ax.invert_yaxis()
-
-            # Agregar valores en las barras
-            for i, (bar, valor) in enumerate(zip(bars, top_productos.values)):
-                try:
-                    ax.text(valor + valor*0.01, i, f'{valor:.0f}', 
-                           va='center', fontsize=10, fontweight='bold')
-                except:
-                    pass  # Si falla la adición de texto, continúa sin error
-
-            ax.grid(True, alpha=0.3, axis='x')
-            self.figure.tight_layout()
-            self.canvas.draw()
-
-        except Exception as e:
-            logging.error(f"Error mostrando top productos: {e}")
-            QMessageBox.warning(self, 'Error', f'Error generando gráfico: {e}')
+        self.mostrar_vista('top_productos')
 
     def mostrar_tendencias(self):
         """Muestra análisis de tendencias"""
-        try:
-            if self.df_ventas.empty:
-                self.limpiar_graficos()
-                return
-            
-            self.figure.clear()
-            
-            # Crear subplots para diferentes análisis
-            try:
-                gs = self.figure.add_gridspec(2, 2, hspace=0.4, wspace=0.3)
-            except Exception as e:
-                logging.error(f"Error creando gridspec para tendencias: {e}")
-                ax = self.figure.add_subplot(111)
-                ax.text(0.5, 0.5, 'Error configurando gráficos de tendencias', ha='center', va='center', fontsize=14)
-                self.canvas.draw()
-                return
-            
-            try:
-                # Tendencia semanal
-                ax1 = self.figure.add_subplot(gs[0, :])
-                
-                # Verificar que tenemos fechas válidas
-                if 'fecha_movimiento' in self.df_ventas.columns and not self.df_ventas['fecha_movimiento'].isna().all():
-                    self.df_ventas['semana'] = self.df_ventas['fecha_movimiento'].dt.isocalendar().week
-                    semanas = self.df_ventas.groupby('semana')['cantidad'].sum()
-                    
-                    if not semanas.empty:
-                        ax1.plot(semanas.index, semanas.values, marker='o', linewidth=3, markersize=6)
-                        ax1.set_title('Tendencia de Ventas por Semana', fontsize=14, fontweight='bold')
-                        ax1.set_xlabel('Semana del Año')
-                        ax1.set_ylabel('Cantidad Total')
-                        ax1.grid(True, alpha=0.3)
-                    else:
-                        ax1.text(0.5, 0.5, 'Sin datos por semana', ha='center', va='center')
-                else:
-                    ax1.text(0.5, 0.5, 'Sin datos de fechas válidas', ha='center', va='center')
-            except Exception as e:
-                logging.error(f"Error en tendencia semanal: {e}")
-            
-            try:
-                # Ventas por día de la semana
-                ax2 = self.figure.add_subplot(gs[1, 0])
-                dias_semana = ['Lun', 'Mar', 'Mie', 'Jue', 'Vie', 'Sab', 'Dom']
-                
-                if 'fecha_movimiento' in self.df_ventas.columns and not self.df_ventas['fecha_movimiento'].isna().all():
-                    self.df_ventas['dia_semana'] = self.df_ventas['fecha_movimiento'].dt.dayofweek
-                    ventas_dia_sem = self.df_ventas.groupby('dia_semana')['cantidad'].sum()
-                    
-                    try:
-                        colors = sns.color_palette("coolwarm", 7)
-                    except:
-                        colors = ['skyblue'] * 7
-                    
-                    bars = ax2.bar(range(7), [ventas_dia_sem.get(i, 0) for i in range(7)], color=colors)
-                    ax2.set_xticks(range(7))
-                    ax2.set_xticklabels(dias_semana)
-                    ax2.set_title('Ventas por Día de la Semana', fontsize=12, fontweight='bold')
-                    ax2.set_ylabel('Cantidad')
-                else:
-                    ax2.text(0.5, 0.5, 'Sin datos de fechas', ha='center', va='center')
-            except Exception as e:
-                logging.error(f"Error en ventas por día de semana: {e}")
-            
-            try:
-                # Tendencia mensual
-                ax3 = self.figure.add_subplot(gs[1, 1])
-                
-                if 'fecha_movimiento' in self.df_ventas.columns and not self.df_ventas['fecha_movimiento'].isna().all():
-                    self.df_ventas['mes'] = self.df_ventas['fecha_movimiento'].dt.month
-                    ventas_mes = self.df_ventas.groupby('mes')['cantidad'].sum()
-                    
-                    meses = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 
-                            'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
-                    
-                    if not ventas_mes.empty:
-                        bars = ax3.bar(ventas_mes.index, ventas_mes.values, alpha=0.8, color='coral')
-                        ax3.set_title('Ventas por Mes', fontsize=12, fontweight='bold')
-                        ax3.set_xlabel('Mes')
-                        ax3.set_ylabel('Cantidad')
-                        
-                        # Configurar etiquetas del eje x de forma segura
-                        meses_presentes = [meses[i-1] for i in ventas_mes.index if 1 <= i <= 12]
-                        ax3.set_xticks(ventas_mes.index)
-                        ax3.set_xticklabels(meses_presentes, rotation=45)
-                    else:
-                        ax3.text(0.5, 0.5, 'Sin datos por mes', ha='center', va='center')
-                else:
-                    ax3.text(0.5, 0.5, 'Sin datos de fechas', ha='center', va='center')
-            except Exception as e:
-                logging.error(f"Error en tendencia mensual: {e}")
-            
-            self.canvas.draw()
-            
-        except Exception as e:
-            logging.error(f"Error mostrando tendencias: {e}")
-            QMessageBox.warning(self, 'Error', f'Error generando análisis: {e}')
+        self.mostrar_vista('tendencias')
 
     def mostrar_analisis_detallado(self):
         """Muestra un análisis detallado con múltiples métricas"""
         try:
-            if self.df_ventas.empty:
+            if self.agregados.vacio:
                 QMessageBox.information(self, 'Sin datos', 'No hay datos para analizar.')
                 return
             
             # Crear ventana de diálogo con análisis detallado
             analisis = []
-            df = self.df_ventas
+            agregados = self.agregados
+            total_movimientos = agregados.total_movimientos
             
             # Estadísticas básicas
             analisis.append("📊 ANÁLISIS DETALLADO DE VENTAS")
             analisis.append("=" * 50)
             analisis.append(f"Período analizado: {self.date_inicio.date().toPyDate()} a {self.date_fin.date().toPyDate()}")
-            analisis.append(f"Total de registros: {len(df):,}")
-            analisis.append(f"Total productos vendidos: {df['cantidad'].sum():,.0f}")
+            analisis.append(f"Total de registros: {total_movimientos:,}")
+            analisis.append(f"Total productos vendidos: {agregados.total_cantidad:,.0f}")
             
-            if 'valor_total' in df.columns and df['valor_total'].sum() > 0:
-                analisis.append(f"Valor total de ventas: {df['valor_total'].sum():,.2f} Bs.")
-                analisis.append(f"Valor promedio por venta: {df['valor_total'].mean():,.2f} Bs.")
+            if agregados.total_valor > 0:
+                analisis.append(f"Valor total de ventas: {agregados.total_valor:,.2f} Bs.")
+                analisis.append(f"Valor promedio por venta: {agregados.valor_promedio:,.2f} Bs.")
             
             analisis.append("")
             
             # Top 5 productos (con manejo de errores)
             try:
-                if 'nombre' in df.columns and 'cantidad' in df.columns:
-                    analisis.append("🏆 TOP 5 PRODUCTOS MÁS VENDIDOS:")
-                    top_5 = df.groupby('nombre')['cantidad'].sum().nlargest(5)
-                    for i, (producto, cantidad) in enumerate(top_5.items(), 1):
-                        analisis.append(f"{i}. {producto}: {cantidad:.0f} unidades")
-                else:
-                    analisis.append("🏆 TOP PRODUCTOS: Datos no disponibles")
+                analisis.append("🏆 TOP 5 PRODUCTOS MÁS VENDIDOS:")
+                for i, (producto, cantidad) in enumerate(agregados.top_productos(5).items(), 1):
+                    analisis.append(f"{i}. {producto}: {cantidad:.0f} unidades")
             except Exception as e:
                 logging.error(f"Error calculando top productos: {e}")
                 analisis.append("🏆 TOP PRODUCTOS: Error en cálculo")
@@ -918,18 +680,15 @@ class EstadisticasVentas(QMainWindow):
             
             # Análisis por días (con manejo de errores)
             try:
-                if 'fecha_movimiento' in df.columns and not df['fecha_movimiento'].isna().all():
-                    analisis.append("📅 ANÁLISIS POR DÍAS:")
-                    df_dias = df.groupby(df['fecha_movimiento'].dt.date)['cantidad'].sum()
-                    
-                    if not df_dias.empty:
-                        analisis.append(f"Día con más ventas: {df_dias.idxmax()} ({df_dias.max():.0f} unidades)")
-                        analisis.append(f"Día con menos ventas: {df_dias.idxmin()} ({df_dias.min():.0f} unidades)")
-                        analisis.append(f"Promedio diario: {df_dias.mean():.1f} unidades")
-                    else:
-                        analisis.append("Sin datos suficientes por días")
+                analisis.append("📅 ANÁLISIS POR DÍAS:")
+                df_dias = agregados.por_dia
+                
+                if not df_dias.empty:
+                    analisis.append(f"Día con más ventas: {df_dias.idxmax().date()} ({df_dias.max():.0f} unidades)")
+                    analisis.append(f"Día con menos ventas: {df_dias.idxmin().date()} ({df_dias.min():.0f} unidades)")
+                    analisis.append(f"Promedio diario: {df_dias.mean():.1f} unidades")
                 else:
-                    analisis.append("📅 ANÁLISIS POR DÍAS: Datos de fechas no válidos")
+                    analisis.append("Sin datos suficientes por días")
             except Exception as e:
                 logging.error(f"Error en análisis por días: {e}")
                 analisis.append("📅 ANÁLISIS POR DÍAS: Error en cálculo")
@@ -945,7 +704,7 @@ class EstadisticasVentas(QMainWindow):
     def exportar_datos(self):
         """Exporta los datos actuales a Excel"""
         try:
-            if self.df_ventas.empty:
+            if self.agregados.vacio:
                 QMessageBox.warning(self, 'Sin datos', 'No hay datos para exportar.')
                 return
             
@@ -965,78 +724,13 @@ class EstadisticasVentas(QMainWindow):
             if not path:
                 return
             
-            # Preparar datos para exportación
-            df_export = self.df_ventas.copy()
-            
-            # Formatear fechas de forma segura
-            if 'fecha_movimiento' in df_export.columns:
-                try:
-                    df_export['fecha_movimiento'] = df_export['fecha_movimiento'].dt.strftime('%d/%m/%Y %H:%M')
-                except:
-                    # Si falla el formateo, mantener como está
-                    pass
-            
-            # Crear resumen estadístico
-            resumen = {
-                'Métrica': [
-                    'Total de Movimientos',
-                    'Total Productos Vendidos',
-                    'Período de Análisis (Inicio)',
-                    'Período de Análisis (Fin)',
-                    'Fecha de Exportación'
-                ],
-                'Valor': [
-                    len(df_export),
-                    df_export['cantidad'].sum() if 'cantidad' in df_export.columns else 0,
-                    self.date_inicio.date().toPyDate().strftime('%d/%m/%Y'),
-                    self.date_fin.date().toPyDate().strftime('%d/%m/%Y'),
-                    datetime.now().strftime('%d/%m/%Y %H:%M')
-                ]
-            }
-            
-            df_resumen = pd.DataFrame(resumen)
-            
-            # Top productos (con manejo de errores)
-            try:
-                if 'nombre' in self.df_ventas.columns and 'cantidad' in self.df_ventas.columns:
-                    top_productos = self.df_ventas.groupby('nombre').agg({
-                        'cantidad': 'sum',
-                        'valor_total': 'sum' if 'valor_total' in self.df_ventas.columns else 'count'
-                    }).round(2)
-                    top_productos = top_productos.sort_values('cantidad', ascending=False).head(20)
-                else:
-                    # Crear DataFrame vacío si no hay datos
-                    top_productos = pd.DataFrame({'cantidad': [], 'valor_total': []})
-            except Exception as e:
-                logging.error(f"Error creando top productos: {e}")
-                top_productos = pd.DataFrame({'cantidad': [], 'valor_total': []})
-            
-            # Exportar con múltiples hojas
-            try:
-                with pd.ExcelWriter(path, engine='openpyxl') as writer:
-                    df_export.to_excel(writer, sheet_name='Datos Detallados', index=False)
-                    df_resumen.to_excel(writer, sheet_name='Resumen', index=False)
-                    
-                    if not top_productos.empty:
-                        top_productos.to_excel(writer, sheet_name='Top Productos')
-                    
-                    # Formatear hojas de forma segura
-                    try:
-                        for sheet_name in writer.sheets:
-                            worksheet = writer.sheets[sheet_name]
-                            for column_cells in worksheet.columns:
-                                try:
-                                    length = max(len(str(cell.value or "")) for cell in column_cells)
-                                    worksheet.column_dimensions[column_cells[0].column_letter].width = min(length + 2, 50)
-                                except:
-                                    pass  # Si falla el ajuste de ancho, continúa
-                    except Exception as e:
-                        logging.warning(f"Error formateando Excel: {e}")
-                
-                QMessageBox.information(self, 'Exportación Exitosa', 
-                                      f'Datos exportados exitosamente a:\n{path}')
-            except Exception as e:
-                raise Exception(f"Error escribiendo archivo Excel: {e}")
+            # Detalle sin agrupar, resumen y top productos (reporte_estadisticas.py)
+            escribir_excel(
+                path, self.obtener_df_ventas(), self.agregados,
+                self.date_inicio.date().toPyDate(), self.date_fin.date().toPyDate()
+            )
+            QMessageBox.information(self, 'Exportación Exitosa', 
+                                  f'Datos exportados exitosamente a:\n{path}')
             
         except Exception as e:
             logging.error(f"Error exportando datos: {e}")
@@ -1045,7 +739,7 @@ class EstadisticasVentas(QMainWindow):
     def imprimir_reporte(self):
         """Genera e imprime un reporte de estadísticas"""
         try:
-            if self.df_ventas.empty:
+            if self.agregados.vacio:
                 QMessageBox.warning(self, 'Sin datos', 'No hay datos para imprimir.')
                 return
             
@@ -1078,84 +772,23 @@ class EstadisticasVentas(QMainWindow):
 
     def generar_reporte_html(self):
         """Genera el contenido HTML del reporte"""
-        try:
-            df = self.df_ventas
-            
-            # Calcular estadísticas de forma segura
-            total_movimientos = len(df)
-            total_productos = df['cantidad'].sum() if 'cantidad' in df.columns else 0
-            periodo_inicio = self.date_inicio.date().toPyDate().strftime('%d/%m/%Y')
-            periodo_fin = self.date_fin.date().toPyDate().strftime('%d/%m/%Y')
-            
-            # Top 5 productos con manejo de errores
-            top_5_html = ""
-            try:
-                if 'nombre' in df.columns and 'cantidad' in df.columns:
-                    top_5 = df.groupby('nombre')['cantidad'].sum().nlargest(5)
-                    for i, (producto, cantidad) in enumerate(top_5.items(), 1):
-                        top_5_html += f"<tr><td>{i}</td><td>{producto}</td><td>{cantidad:.0f}</td></tr>"
-                else:
-                    top_5_html = "<tr><td colspan='3'>No hay datos de productos disponibles</td></tr>"
-            except Exception as e:
-                logging.error(f"Error generando top 5 para reporte: {e}")
-                top_5_html = "<tr><td colspan='3'>Error generando datos</td></tr>"
-            
-            html = f"""
-            <html>
-            <head>
-                <style>
-                    body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                    h1 {{ color: #2c3e50; text-align: center; }}
-                    h2 {{ color: #34495e; border-bottom: 2px solid #3498db; }}
-                    table {{ width: 100%; border-collapse: collapse; margin: 10px 0; }}
-                    th, td {{ border: 1px solid #bdc3c7; padding: 8px; text-align: left; }}
-                    th {{ background-color: #ecf0f1; font-weight: bold; }}
-                    .stat-box {{ background-color: #f8f9fa; padding: 10px; margin: 5px 0; border-left: 4px solid #3498db; }}
-                </style>
-            </head>
-            <body>
-                <h1>📊 Reporte de Estadísticas de Ventas</h1>
-                
-                <div class="stat-box">
-                    <strong>Período de Análisis:</strong> {periodo_inicio} - {periodo_fin}<br>
-                    <strong>Fecha de Reporte:</strong> {datetime.now().strftime('%d/%m/%Y %H:%M')}<br>
-                    <strong>Tipo de Análisis:</strong> {self.combo_tipo.currentText()}
-                </div>
-                
-                <h2>Resumen General</h2>
-                <table>
-                    <tr><th>Métrica</th><th>Valor</th></tr>
-                    <tr><td>Total de Movimientos</td><td>{total_movimientos:,}</td></tr>
-                    <tr><td>Total Productos Vendidos</td><td>{total_productos:,.0f}</td></tr>
-                    <tr><td>Valor total de ventas</td><td>{df['valor_total'].sum():,.2f} Bs.</td></tr>
-                    <tr><td>Valor promedio por venta</td><td>{df['valor_total'].mean():,.2f} Bs.</td></tr>
-                </table>
-                
-                <h2>Top 5 Productos Más Vendidos</h2>
-                <table>
-                    <tr><th>Posición</th><th>Producto</th><th>Cantidad</th></tr>
-                    {top_5_html}
-                </table>
-            </body>
-            </html>
-            """
-            
-            return html
-            
-        except Exception as e:
-            logging.error(f"Error generando reporte HTML: {e}")
-            return "<html><body><h1>Error generando reporte</h1></body></html>"
+        return reporte_html(
+            self.agregados, self.date_inicio.date().toPyDate(),
+            self.date_fin.date().toPyDate(), self.combo_tipo.currentText()
+        )
 
     def closeEvent(self, event):
         """Maneja el evento de cierre de la ventana"""
         try:
-            # Detener el timer
+            # Detener el timer y la carga en curso
             if hasattr(self, 'timer'):
                 self.timer.stop()
+            self.cargador.cancelar()
+            self.cargador_cambios.cancelar()
             
             # Limpiar recursos
-            if hasattr(self, 'figure'):
-                self.figure.clear()
+            if hasattr(self, 'graficos'):
+                self.graficos.cerrar()
             
             event.accept()
             
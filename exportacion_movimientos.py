@@ -0,0 +1,119 @@
+"""
+Exportación de movimientos a Excel o CSV por lotes.
+
+La exportación del libro diario juntaba todos los movimientos en una lista,
+armaba un DataFrame, lo escribía con openpyxl en modo normal (todas las
+celdas en memoria) y después medía cada celda para el ancho de las
+columnas. Aquí las filas se leen del cursor con fetchmany y se escriben en
+seguida, con openpyxl en modo write-only o con csv.writer, así que la
+memoria no depende de cuántos movimientos se exporten. El ancho de las
+columnas se estima con las primeras FILAS_MUESTRA filas.
+
+Se escribe en un archivo '.parcial' que recién al terminar reemplaza al
+destino: una exportación cancelada o fallida no deja un archivo a medias.
+Pensado para correr con CargadorEnSegundoPlano (ver
+LibroDiarioVentas.exportar_excel).
+"""
+import os
+import csv
+import logging
+from importacion_diferida import importar_diferido
+
+openpyxl = importar_diferido("openpyxl")
+
+# Filas que se piden al cursor por vez
+TAMANIO_LOTE = 5000
+# Filas con las que se estima el ancho de las columnas del Excel
+FILAS_MUESTRA = 1000
+ANCHO_MAXIMO = 50
+
+class ExportacionCancelada(Exception):
+    """Se pidió cancelar la exportación."""
+
+def _lotes(cursor, cancelar):
+    while True:
+        if cancelar is not None and cancelar.is_set():
+            raise ExportacionCancelada()
+        lote = cursor.fetchmany(TAMANIO_LOTE)
+        if not lote:
+            return
+        yield lote
+
+def _anchos(columnas, muestra):
+    """Ancho de cada columna según el encabezado y las filas de 'muestra'"""
+    anchos = [len(str(columna)) for columna in columnas]
+    for fila in muestra:
+        for i, valor in enumerate(fila):
+            anchos[i] = max(anchos[i], len(str(valor if valor is not None else "")))
+    return [min(ancho + 2, ANCHO_MAXIMO) for ancho in anchos]
+
+def _escribir_excel(path, columnas, lotes, hoja):
+    libro = openpyxl.Workbook(write_only=True)
+    worksheet = libro.create_sheet(hoja)
+    filas = 0
+    try:
+        for lote in lotes:
+            if not filas:
+                # En modo write-only los anchos se fijan antes de la primera fila
+                for i, ancho in enumerate(_anchos(columnas, lote[:FILAS_MUESTRA]), 1):
+                    worksheet.column_dimensions[openpyxl.utils.get_column_letter(i)].width = ancho
+                worksheet.append(columnas)
+            for fila in lote:
+                worksheet.append(fila)
+            filas += len(lote)
+            yield filas
+        if not filas:
+            worksheet.append(columnas)
+    finally:
+        # También al cancelar: guardar es lo que cierra los temporales de openpyxl
+        libro.save(path)
+
+def _escribir_csv(path, columnas, lotes):
+    # utf-8-sig: Excel reconoce los acentos al abrir el CSV
+    with open(path, "w", newline="", encoding="utf-8-sig") as archivo:
+        writer = csv.writer(archivo)
+        writer.writerow(columnas)
+        filas = 0
+        for lote in lotes:
+            writer.writerows(lote)
+            filas += len(lote)
+            yield filas
+
+def exportar_consulta(conn, sql, params, path, columnas, formatear_fila=None,
+                      total=None, progreso=None, cancelar=None, hoja="Movimientos"):
+    """
+    Escribe el resultado de 'sql' en 'path' (.csv como CSV, cualquier otra
+    extensión como Excel) y devuelve cuántas filas escribió.
+
+    formatear_fila(fila) -> fila   transforma cada fila antes de escribirla
+    total                          filas esperadas, para calcular el progreso
+    progreso(valor)                avance de 0 a 100
+    cancelar                       threading.Event; si se activa, lanza ExportacionCancelada
+    """
+    cursor = conn.execute(sql, params)
+    lotes = _lotes(cursor, cancelar)
+    if formatear_fila is not None:
+        lotes = ([formatear_fila(fila) for fila in lote] for lote in lotes)
+
+    parcial = f"{path}.parcial"
+    if path.lower().endswith(".csv"):
+        escritura = _escribir_csv(parcial, columnas, lotes)
+    else:
+        escritura = _escribir_excel(parcial, columnas, lotes, hoja)
+
+    filas = 0
+    try:
+        for filas in escritura:
+            if progreso is not None and total:
+                progreso(min(filas * 100 // total, 99))
+        os.replace(parcial, path)
+    except BaseException:
+        escritura.close()
+        cursor.close()
+        if os.path.exists(parcial):
+            os.remove(parcial)
+        raise
+    if progreso is not None:
+        progreso(100)
+    logging.info(f"Exportados {filas} movimientos a {path}")
+    return filas
@@ -0,0 +1,308 @@
+"""
+Gráficos del tablero de estadísticas.
+
+Cada cambio de vista y cada refresco del timer borraban la figura, volvían
+a crear la cuadrícula, los ejes y las barras, corrían tight_layout y
+dibujaban todo con canvas.draw(). Ahora cada vista crea sus ejes y
+artistas una sola vez, la primera vez que se muestra, con los márgenes de
+su cuadrícula fijos. Volver a mostrarla solo cambia qué ejes están
+visibles, y actualizarla solo les cambia los datos (set_data, set_height,
+set_width) antes de pedir un draw_idle. La figura no acumula ejes ni
+artistas en un turno largo.
+
+La torta por tipo es la excepción: sus porciones se vuelven a crear, solo
+en su eje y solo cuando cambian los tipos o sus cantidades.
+
+guardar_grafico dibuja una vista en un archivo, sin Qt, para
+reporte_estadisticas.py.
+"""
+import logging
+from abc import ABC, abstractmethod
+from importacion_diferida import importar_diferido
+
+def configurar_estilo(seaborn):
+    """Estilo de los gráficos; se aplica una vez, al importar seaborn"""
+    import matplotlib.style
+    matplotlib.style.use('default')
+    seaborn.set_palette("husl")
+
+# matplotlib y seaborn se importan con el primer gráfico; el estilo se
+# aplica antes de crear los ejes de la primera vista
+figura_mpl = importar_diferido("matplotlib.figure")
+backend_qt = importar_diferido("matplotlib.backends.backend_qt5agg")
+sns = importar_diferido("seaborn", al_cargar=configurar_estilo)
+
+MENSAJE_SIN_DATOS = 'No hay datos para mostrar\nSeleccione un período diferente'
+DIAS_SEMANA = ['Lun', 'Mar', 'Mie', 'Jue', 'Vie', 'Sab', 'Dom']
+MESES = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun',
+         'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
+# Barras de las listas de productos
+CANTIDAD_PRODUCTOS = 10
+
+def _paleta(nombre, cantidad, alternativa):
+    try:
+        return sns.color_palette(nombre, cantidad)
+    except Exception:
+        return [alternativa] * cantidad
+
+def _limite_superior(valores):
+    maximo = max(valores, default=0)
+    return maximo * 1.1 if maximo > 0 else 1
+
+def _alturas(barras, valores):
+    for barra, valor in zip(barras, valores):
+        barra.set_height(valor)
+
+class VistaGrafico(ABC):
+    """
+    Ejes y artistas de una vista. crear() los agrega a la figura una vez;
+    actualizar(agregados) les cambia los datos y devuelve un mensaje si no
+    hay nada que mostrar.
+    """
+
+    def __init__(self, figure):
+        self.figure = figure
+        self.ejes = []
+
+    def agregar_eje(self, posicion):
+        eje = self.figure.add_subplot(posicion)
+        self.ejes.append(eje)
+        return eje
+
+    def set_visible(self, visible):
+        for eje in self.ejes:
+            eje.set_visible(visible)
+
+    @abstractmethod
+    def crear(self):
+        """Agrega a la figura los ejes y artistas de la vista"""
+
+    @abstractmethod
+    def actualizar(self, agregados):
+        """Cambia los datos de los artistas; devuelve un mensaje si no hay datos"""
+
+class VistaVentasTiempo(VistaGrafico):
+    """Cantidad por día, distribución por tipo y ventas por hora"""
+
+    def crear(self):
+        gs = self.figure.add_gridspec(3, 2, hspace=0.5, wspace=0.3,
+                                      left=0.06, right=0.97, top=0.95, bottom=0.06)
+        self.ax_dias = self.agregar_eje(gs[0, :])
+        self.ax_dias.xaxis_date()
+        self.linea_dias, = self.ax_dias.plot([], [], marker='o', linewidth=2, markersize=4)
+        self.ax_dias.set_title('Cantidad Vendida por Día', fontsize=14, fontweight='bold')
+        self.ax_dias.set_xlabel('Fecha')
+        self.ax_dias.set_ylabel('Cantidad')
+        self.ax_dias.grid(True, alpha=0.3)
+        self.ax_dias.tick_params(axis='x', rotation=45)
+
+        self.ax_tipos = self.agregar_eje(gs[2, 0])
+        self.tipos = None
+
+        # Una barra por hora, aunque alguna no tenga ventas
+        self.ax_horas = self.agregar_eje(gs[2, 1])
+        self.barras_horas = self.ax_horas.bar(range(24), [0] * 24, alpha=0.7, color='skyblue')
+        self.ax_horas.set_xlim(-0.5, 23.5)
+        self.ax_horas.set_title('Ventas por Hora del Día', fontsize=12, fontweight='bold')
+        self.ax_horas.set_xlabel('Hora')
+        self.ax_horas.set_ylabel('Cantidad')
+        self.ax_horas.grid(True, alpha=0.3)
+
+    def actualizar(self, agregados):
+        por_dia = agregados.por_dia
+        self.linea_dias.set_data(por_dia.index.to_pydatetime(), por_dia.to_numpy())
+        self.ax_dias.relim()
+        self.ax_dias.autoscale_view()
+
+        por_tipo = agregados.por_tipo
+        if self.tipos is None or not self.tipos.equals(por_tipo):
+            self.tipos = por_tipo
+            self.ax_tipos.clear()
+            if not por_tipo.empty:
+                colores = _paleta("Set3", len(por_tipo), 'skyblue')
+                self.ax_tipos.pie(por_tipo.values, labels=por_tipo.index, autopct='%1.1f%%', colors=colores)
+                self.ax_tipos.set_title('Distribución por Tipo', fontsize=12, fontweight='bold')
+            else:
+                self.ax_tipos.text(0.5, 0.5, 'Sin datos de tipos', ha='center', va='center')
+
+        # El resumen diario no guarda la hora: se agrupa en SQL al cargar
+        por_hora = agregados.por_hora.reindex(range(24), fill_value=0).to_numpy()
+        _alturas(self.barras_horas, por_hora)
+        self.ax_horas.set_ylim(0, _limite_superior(por_hora))
+
+class VistaProductos(VistaGrafico):
+    """Los productos más vendidos (o los menos vendidos) en barras horizontales"""
+
+    def __init__(self, figure, menos_populares=False):
+        super().__init__(figure)
+        self.menos_populares = menos_populares
+
+    def crear(self):
+        gs = self.figure.add_gridspec(1, 1, left=0.25, right=0.95, top=0.93, bottom=0.07)
+        self.ax = self.agregar_eje(gs[0, 0])
+        if self.menos_populares:
+            colores = _paleta("crest", CANTIDAD_PRODUCTOS, 'gray')
+            titulo = 'Top 10 Productos Menos Populares'
+        else:
+            colores = _paleta("viridis", CANTIDAD_PRODUCTOS, 'skyblue')
+            titulo = 'Top 10 Productos Más Vendidos'
+        posiciones = range(CANTIDAD_PRODUCTOS)
+        self.barras = self.ax.barh(posiciones, [0] * CANTIDAD_PRODUCTOS, color=colores)
+        self.valores = [self.ax.text(0, i, '', va='center', fontsize=10, fontweight='bold')
+                        for i in posiciones]
+        self.ax.set_yticks(posiciones)
+        # Más vendido arriba; los menos populares, de menor a mayor desde abajo
+        if self.menos_populares:
+            self.ax.set_ylim(-0.5, CANTIDAD_PRODUCTOS - 0.5)
+        else:
+            self.ax.set_ylim(CANTIDAD_PRODUCTOS - 0.5, -0.5)
+        self.ax.set_xlabel('Cantidad Vendida')
+        self.ax.set_title(titulo, fontsize=16, fontweight='bold')
+        self.ax.grid(True, alpha=0.3, axis='x')
+
+    def actualizar(self, agregados):
+        if self.menos_populares:
+            # Sin contar los que nunca se vendieron
+            productos = agregados.menos_populares(CANTIDAD_PRODUCTOS)
+            if productos.empty:
+                return 'No hay productos con ventas bajas'
+        else:
+            productos = agregados.top_productos(CANTIDAD_PRODUCTOS)
+            if productos.empty:
+                return 'No hay productos para mostrar'
+
+        cantidades = productos.to_numpy()
+        margen = cantidades.max() * 0.01 if cantidades.max() > 0 else 0.1
+        for i, (barra, texto) in enumerate(zip(self.barras, self.valores)):
+            if i < len(cantidades):
+                barra.set_width(cantidades[i])
+                barra.set_visible(True)
+                texto.set_position((cantidades[i] + margen, i))
+                texto.set_text(f'{cantidades[i]:.0f}')
+            else:
+                barra.set_visible(False)
+                texto.set_text('')
+        etiquetas = list(productos.index) + [''] * (CANTIDAD_PRODUCTOS - len(productos))
+        self.ax.set_yticklabels(etiquetas)
+        self.ax.set_xlim(0, _limite_superior(cantidades))
+
+class VistaTendencias(VistaGrafico):
+    """Tendencia semanal, ventas por día de la semana y por mes"""
+
+    def crear(self):
+        gs = self.figure.add_gridspec(2, 2, hspace=0.4, wspace=0.3,
+                                      left=0.07, right=0.97, top=0.95, bottom=0.08)
+        self.ax_semanas = self.agregar_eje(gs[0, :])
+        self.linea_semanas, = self.ax_semanas.plot([], [], marker='o', linewidth=3, markersize=6)
+        self.ax_semanas.set_title('Tendencia de Ventas por Semana', fontsize=14, fontweight='bold')
+        self.ax_semanas.set_xlabel('Semana del Año')
+        self.ax_semanas.set_ylabel('Cantidad Total')
+        self.ax_semanas.grid(True, alpha=0.3)
+
+        self.ax_dias_semana = self.agregar_eje(gs[1, 0])
+        self.barras_dias_semana = self.ax_dias_semana.bar(
+            range(7), [0] * 7, color=_paleta("coolwarm", 7, 'skyblue'))
+        self.ax_dias_semana.set_xticks(range(7))
+        self.ax_dias_semana.set_xticklabels(DIAS_SEMANA)
+        self.ax_dias_semana.set_title('Ventas por Día de la Semana', fontsize=12, fontweight='bold')
+        self.ax_dias_semana.set_ylabel('Cantidad')
+
+        # Los doce meses siempre; los que no tienen datos quedan en cero
+        self.ax_meses = self.agregar_eje(gs[1, 1])
+        self.barras_meses = self.ax_meses.bar(range(1, 13), [0] * 12, alpha=0.8, color='coral')
+        self.ax_meses.set_xticks(range(1, 13))
+        self.ax_meses.set_xticklabels(MESES, rotation=45)
+        self.ax_meses.set_title('Ventas por Mes', fontsize=12, fontweight='bold')
+        self.ax_meses.set_xlabel('Mes')
+        self.ax_meses.set_ylabel('Cantidad')
+
+    def actualizar(self, agregados):
+        por_semana = agregados.por_semana
+        self.linea_semanas.set_data(por_semana.index.to_numpy(), por_semana.to_numpy())
+        self.ax_semanas.relim()
+        self.ax_semanas.autoscale_view()
+
+        por_dia_semana = agregados.por_dia_semana.to_numpy()
+        _alturas(self.barras_dias_semana, por_dia_semana)
+        self.ax_dias_semana.set_ylim(0, _limite_superior(por_dia_semana))
+
+        por_mes = agregados.por_mes.reindex(range(1, 13), fill_value=0).to_numpy()
+        _alturas(self.barras_meses, por_mes)
+        self.ax_meses.set_ylim(0, _limite_superior(por_mes))
+
+# nombre de la vista -> función que la crea sobre una figura
+VISTAS = {
+    'ventas_tiempo': VistaVentasTiempo,
+    'top_productos': VistaProductos,
+    'menos_populares': lambda figure: VistaProductos(figure, menos_populares=True),
+    'tendencias': VistaTendencias,
+}
+
+def guardar_grafico(nombre, agregados, path):
+    """Guarda la vista 'nombre' con 'agregados' en 'path' (PNG, JPG...)"""
+    sns.cargar()
+    figure = figura_mpl.Figure(figsize=(14, 10), dpi=100)
+    figure.patch.set_facecolor('white')
+    vista = VISTAS[nombre](figure)
+    vista.crear()
+    mensaje = MENSAJE_SIN_DATOS if agregados.vacio else vista.actualizar(agregados)
+    if mensaje:
+        vista.set_visible(False)
+        figure.text(0.5, 0.5, mensaje, ha='center', va='center', fontsize=16, color='gray')
+    figure.savefig(path, facecolor=figure.get_facecolor())
+    return path
+
+class PanelGraficos:
+    """Figura y canvas del tablero, con las vistas que ya se mostraron"""
+
+    def __init__(self):
+        self.figure = figura_mpl.Figure(figsize=(14, 10), dpi=100)
+        self.figure.patch.set_facecolor('white')
+        self.canvas = backend_qt.FigureCanvasQTAgg(self.figure)
+        self.aviso = self.figure.text(0.5, 0.5, '', ha='center', va='center',
+                                      fontsize=16, color='gray', visible=False)
+        self.vistas = {}
+        # nombre de la vista -> (agregados que muestra, mensaje si no hay datos)
+        self.mostrado = {}
+        self.actual = None
+
+    def vista(self, nombre):
+        vista = self.vistas.get(nombre)
+        if vista is None:
+            sns.cargar()
+            vista = VISTAS[nombre](self.figure)
+            vista.crear()
+            vista.set_visible(False)
+            self.vistas[nombre] = vista
+            logging.info(f"Vista de gráficos '{nombre}' creada")
+        return vista
+
+    def mostrar(self, nombre, agregados):
+        """Muestra la vista 'nombre' con 'agregados'; no redibuja si ya los muestra."""
+        anterior = self.mostrado.get(nombre)
+        if self.actual == nombre and anterior is not None and anterior[0] is agregados:
+            return
+        if agregados.vacio:
+            mensaje = MENSAJE_SIN_DATOS
+        elif anterior is not None and anterior[0] is agregados:
+            mensaje = anterior[1]
+        else:
+            mensaje = self.vista(nombre).actualizar(agregados)
+        self.mostrado[nombre] = (agregados, mensaje)
+        self.actual = nombre
+
+        for nombre_vista, vista in self.vistas.items():
+            vista.set_visible(nombre_vista == nombre and not mensaje)
+        self.aviso.set_text(mensaje or '')
+        self.aviso.set_visible(bool(mensaje))
+        self.canvas.draw_idle()
+
+    def refrescar(self, agregados, por_defecto='ventas_tiempo'):
+        """Vuelve a mostrar la vista actual (o 'por_defecto') con 'agregados'"""
+        self.mostrar(self.actual or por_defecto, agregados)
+
+    def cerrar(self):
+        self.figure.clear()
+        self.vistas.clear()
+        self.mostrado.clear()
+        self.actual = None
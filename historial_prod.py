@@ -1,6 +1,6 @@
 import sys
-import os
-import sqlite3
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
     QLabel, QPushButton, QHeaderView, QMessageBox
@@ -12,7 +12,7 @@ class HistorialProducto(QWidget):
         super().__init__()
         self.setWindowTitle(f"Historial de Movimientos - {codigo_producto}")
         self.resize(900, 500)
-        self.db_path = "pruebas.db"
+        self.db_path = obtener_db_path()
         self.codigo_producto = codigo_producto
 
         layout = QVBoxLayout(self)
@@ -50,21 +50,13 @@ class HistorialProducto(QWidget):
 
     def ir_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            import subprocess
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
 
     def cargar_historial(self):
         self.tabla.setRowCount(0)
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = obtener_conexion(self.db_path)
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id_movimiento, codigo_producto, tipo_movimiento, cantidad, fecha_movimiento, observaciones, usuario
@@ -73,7 +65,6 @@ class HistorialProducto(QWidget):
                 ORDER BY fecha_movimiento DESC
             """, (self.codigo_producto,))
             movimientos = cursor.fetchall()
-            conn.close()
             for row_num, (id_mov, cod_prod, tipo, cantidad, fecha, obs, usuario) in enumerate(movimientos):
                 self.tabla.insertRow(row_num)
                 self.tabla.setItem(row_num, 0, QTableWidgetItem(str(id_mov)))
@@ -0,0 +1,75 @@
+"""
+Importación diferida de dependencias pesadas.
+
+pandas, matplotlib, seaborn, cv2 y fpdf tardan entre décimas de segundo y
+más de un segundo en importarse, y varias pantallas los importaban al
+principio aunque solo los usen al exportar, tomar una foto o generar un
+PDF. Con importar_diferido el módulo se importa recién la primera vez que
+se usa uno de sus atributos:
+
+    pd = importar_diferido("pandas")
+    ...
+    df = pd.DataFrame(filas)     # aquí se importa pandas
+
+Lo que tarda cada importación queda en TIEMPOS_IMPORTACION (y en el log),
+incluidas las dependencias que arrastra y que no estaban importadas.
+"""
+import time
+import logging
+import importlib
+import threading
+
+# nombre del módulo -> segundos que tardó su importación diferida
+TIEMPOS_IMPORTACION = {}
+_lock = threading.RLock()
+
+class ModuloDiferido:
+    """Representa un módulo que todavía no se importó."""
+
+    def __init__(self, nombre, al_cargar=None):
+        self._nombre = nombre
+        self._al_cargar = al_cargar
+        self._modulo = None
+
+    def cargar(self):
+        """Importa el módulo, si todavía no se importó, y lo devuelve."""
+        if self._modulo is None:
+            # Se puede usar desde hilos de fondo (por ejemplo pandas en
+            # tareas_fondo): la importación y al_cargar corren una sola vez.
+            with _lock:
+                if self._modulo is None:
+                    inicio = time.perf_counter()
+                    modulo = importlib.import_module(self._nombre)
+                    if self._al_cargar is not None:
+                        self._al_cargar(modulo)
+                    duracion = time.perf_counter() - inicio
+                    TIEMPOS_IMPORTACION[self._nombre] = duracion
+                    logging.info(f"Importado {self._nombre} en {duracion * 1000:.0f} ms")
+                    self._modulo = modulo
+        return self._modulo
+
+    @property
+    def cargado(self):
+        return self._modulo is not None
+
+    def __getattr__(self, atributo):
+        # Solo se llama para atributos que no son de ModuloDiferido
+        if atributo in ("_nombre", "_al_cargar", "_modulo"):
+            raise AttributeError(atributo)
+        return getattr(self.cargar(), atributo)
+
+    def __repr__(self):
+        estado = "importado" if self.cargado else "sin importar"
+        return f"<módulo diferido {self._nombre} ({estado})>"
+
+def importar_diferido(nombre, al_cargar=None):
+    """
+    Devuelve un ModuloDiferido para 'nombre'. 'al_cargar(modulo)' se llama
+    una vez después de importarlo (por ejemplo, para configurar estilos).
+    """
+    return ModuloDiferido(nombre, al_cargar)
+
+def tiempos_importacion():
+    """Copia de TIEMPOS_IMPORTACION, de la importación más lenta a la más rápida."""
+    with _lock:
+        return dict(sorted(TIEMPOS_IMPORTACION.items(), key=lambda par: par[1], reverse=True))
@@ -0,0 +1,70 @@
+"""
+Ingreso de imágenes de productos a imagenes_productos/.
+
+Antes se copiaba el archivo elegido (o el cuadro de la cámara) tal cual, con
+fotos de varios MB. Ahora cada imagen se reduce a LADO_MAXIMO px por lado,
+se recomprime como JPEG y se guarda con el hash de su contenido como nombre:
+la misma imagen cargada dos veces ocupa un solo archivo. En el mismo paso se
+generan las miniaturas de las tablas (ver miniaturas.py).
+"""
+import os
+import hashlib
+import logging
+from miniaturas import BASE_DIR, MINIATURA_PRODUCTOS, MINIATURA_REPORTE, generar_miniatura
+from importacion_diferida import importar_diferido
+
+# Se importan al ingresar la primera imagen, no al abrir el formulario
+cv2 = importar_diferido("cv2")
+np = importar_diferido("numpy")
+
+CARPETA_IMAGENES = os.path.join(BASE_DIR, "imagenes_productos")
+# Lado máximo en px y calidad JPEG de las imágenes guardadas (configurables)
+LADO_MAXIMO = int(os.environ.get("FARMACIA_IMAGEN_LADO_MAXIMO", 1024))
+CALIDAD_JPEG = int(os.environ.get("FARMACIA_IMAGEN_CALIDAD", 85))
+
+def _reducir(imagen):
+    alto, ancho = imagen.shape[:2]
+    escala = LADO_MAXIMO / max(alto, ancho)
+    if escala >= 1:
+        return imagen
+    nuevo = (max(1, round(ancho * escala)), max(1, round(alto * escala)))
+    return cv2.resize(imagen, nuevo, interpolation=cv2.INTER_AREA)
+
+def guardar_imagen(imagen):
+    """
+    Guarda una imagen BGR (como las de cv2) reducida y recomprimida.
+    Devuelve la ruta relativa a la carpeta del programa, para productos.imagen.
+    """
+    if imagen is None or imagen.size == 0:
+        raise ValueError("La imagen está vacía")
+    ok, datos = cv2.imencode(".jpg", _reducir(imagen), [cv2.IMWRITE_JPEG_QUALITY, CALIDAD_JPEG])
+    if not ok:
+        raise ValueError("No se pudo comprimir la imagen")
+    datos = datos.tobytes()
+
+    os.makedirs(CARPETA_IMAGENES, exist_ok=True)
+    nombre = f"{hashlib.sha256(datos).hexdigest()[:32]}.jpg"
+    destino = os.path.join(CARPETA_IMAGENES, nombre)
+    if not os.path.exists(destino):
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(datos)
+        os.replace(temporal, destino)
+    else:
+        logging.info(f"Imagen repetida, se reutiliza {nombre}")
+
+    for tamanio in (MINIATURA_PRODUCTOS, MINIATURA_REPORTE):
+        generar_miniatura(destino, tamanio)
+    return os.path.relpath(destino, BASE_DIR)
+
+def ingresar_archivo(ruta):
+    """Ingresa la imagen del archivo 'ruta'. Lanza ValueError si no es una imagen."""
+    # np.fromfile + imdecode también abre rutas con tildes en Windows
+    imagen = cv2.imdecode(np.fromfile(ruta, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if imagen is None:
+        raise ValueError(f"No se pudo leer la imagen: {ruta}")
+    return guardar_imagen(imagen)
+
+def ingresar_foto(cuadro):
+    """Ingresa un cuadro tomado de la cámara con cv2.VideoCapture."""
+    return guardar_imagen(cuadro)
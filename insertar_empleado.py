@@ -5,26 +5,17 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 import sqlite3
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_en_aplicacion, abrir_con_lanzador
+from seguridad import hashear_contrasena
 import os
 from datetime import datetime
 import hashlib
-import bcrypt
 import subprocess
 import pathlib
 
 # ----------------- CÓDIGO CORREGIDO -----------------
 
-def obtener_db_path():
-    if getattr(sys, 'frozen', False):
-        exe_dir = os.path.dirname(sys.executable)
-        db_path = os.path.join(exe_dir, "pruebas.db")
-        if os.path.exists(db_path):
-            return db_path
-        base_path = sys._MEIPASS
-        return os.path.join(base_path, "pruebas.db")
-    else:
-        return os.path.abspath(os.path.join(os.path.dirname(__file__), "pruebas.db"))
-
 db_path = obtener_db_path()
 
 class InsertarEmpleadoWindow(QMainWindow):
@@ -102,7 +93,7 @@ class InsertarEmpleadoWindow(QMainWindow):
             QMessageBox.warning(self, "Advertencia", "Las contraseñas no coinciden. Por favor, verifique.")
             return
 
-        hash_contraseña = bcrypt.hashpw(contraseña_plana.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hash_contraseña = hashear_contrasena(contraseña_plana)
 
         datos = {
             "nombre": self.campos["nombre"].text().strip(),
@@ -121,8 +112,8 @@ class InsertarEmpleadoWindow(QMainWindow):
             QMessageBox.warning(self, "Advertencia", "El CI debe ser numérico y tener al menos 4 dígitos.")
             return
 
+        conn = obtener_conexion()
         try:
-            conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
             # Asegúrate de que tu tabla empleado tenga el campo 'apellidos'
             cursor.execute("""
@@ -138,10 +129,10 @@ class InsertarEmpleadoWindow(QMainWindow):
                 datos["rol"]
             ))
             conn.commit()
-            conn.close()
             QMessageBox.information(self, "Éxito", "Empleado guardado correctamente")
             self.limpiar_formulario()
         except sqlite3.IntegrityError as e:
+            conn.rollback()
             if "UNIQUE constraint failed: empleado.CI" in str(e):
                 QMessageBox.warning(self, "Advertencia", "El CI ya existe. Ingrese uno diferente.")
             elif "CHECK constraint failed: rol" in str(e):
@@ -149,8 +140,10 @@ class InsertarEmpleadoWindow(QMainWindow):
             else:
                 QMessageBox.critical(self, "Error de integridad", f"Error de integridad de la base de datos: {e}")
         except sqlite3.Error as e:
+            conn.rollback()
             QMessageBox.critical(self, "Error", f"No se pudo guardar el empleado: {e}")
         except ValueError:
+            conn.rollback()
             QMessageBox.critical(self, "Error de tipo de dato", "El valor de CI no es un número válido.")
 
     def limpiar_formulario(self):
@@ -162,6 +155,9 @@ class InsertarEmpleadoWindow(QMainWindow):
         self.campos["nombre"].setFocus()
 
     def volver_a_ver_empleado(self):
+        if abrir_en_aplicacion("buscar_empleado.py"):
+            self.close()
+            return
         try:
             from buscar_empleado import VerEmpleados
             self.ventana_buscar = VerEmpleados()
@@ -171,6 +167,8 @@ class InsertarEmpleadoWindow(QMainWindow):
             QMessageBox.critical(self, "Error", f"No se pudo abrir la ventana de búsqueda:\n{e}")
 
 def abrir_aplicacion(nombre_py):
+    if abrir_en_aplicacion(nombre_py) or abrir_con_lanzador(nombre_py):
+        return
     rutas = []
     if hasattr(sys, '_MEIPASS'):
         rutas.append(sys._MEIPASS)
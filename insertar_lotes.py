@@ -8,121 +8,26 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QDoubleValidator, QIntValidator
 import sqlite3
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla, abrir_en_aplicacion, abrir_con_lanzador
+from catalogo import obtener_catalogo
 from datetime import datetime
 import subprocess
 
-def obtener_db_path():
-    if getattr(sys, 'frozen', False):
-        exe_dir = os.path.dirname(sys.executable)
-        db_path = os.path.join(exe_dir, "pruebas.db")
-        if os.path.exists(db_path):
-            return db_path
-        base_path = sys._MEIPASS
-        return os.path.join(base_path, "pruebas.db")
-    else:
-        return os.path.abspath(os.path.join(os.path.dirname(__file__), "pruebas.db"))
-
 db_path = obtener_db_path()
 
-def crear_tablas():
-    """Crea las tablas productos, lotes y proveedores si no existen."""
-    conn = None
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Tabla 'productos' (ajustada a un formato consistente)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS productos (
-                id_producto INTEGER PRIMARY KEY,
-                codigo TEXT NOT NULL UNIQUE,
-                imagen TEXT NOT NULL,
-                nombre TEXT NOT NULL,
-                precio REAL NOT NULL,
-                stock INTEGER NOT NULL,
-                "fecha venc" INTEGER NOT NULL, -- Uso el nombre original de tu código
-                id_empleado INTEGER,
-                FOREIGN KEY(id_empleado) REFERENCES empleado(CI)
-            );
-        """)
-
-        # Tabla 'lotes'
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS lotes (
-                id_lote INTEGER PRIMARY KEY,
-                id_producto INTEGER NOT NULL,
-                codigo_lote TEXT NOT NULL UNIQUE,
-                cantidad INTEGER NOT NULL,
-                fecha_entrada TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                fecha_vencimiento INTEGER NOT NULL,
-                precio_costo REAL,
-                id_proveedor INTEGER,
-                FOREIGN KEY(id_producto) REFERENCES productos(id_producto),
-                FOREIGN KEY(id_proveedor) REFERENCES proveedores(id_proveedor)
-            );
-        """)
-        
-        # Tabla 'proveedores'
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS proveedores (
-                id_proveedor INTEGER PRIMARY KEY,
-                nombre_proveedor TEXT NOT NULL UNIQUE,
-                "nit ruc" TEXT,
-                "nombre contacto" TEXT,
-                telefono TEXT NOT NULL,
-                correo TEXT NOT NULL,
-                direccion TEXT,
-                estado TEXT DEFAULT 'activo'
-            );
-        """)
-        
-        conn.commit()
-        print("Tablas verificadas/creadas correctamente.")
-        
-    except sqlite3.Error as e:
-        print(f"Error al crear tablas: {e}")
-    finally:
-        if conn:
-            conn.close()
-
-def verificar_tablas():
-    """Función de depuración para ver las tablas existentes."""
-    conn = None
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tablas = cursor.fetchall()
-        print("Tablas existentes:")
-        for tabla in tablas:
-            print(f"- {tabla[0]}")
-    except sqlite3.Error as e:
-        print(f"Error al verificar tablas: {e}")
-    finally:
-        if conn:
-            conn.close()
-
 def obtener_productos():
     """Obtiene todos los productos para llenar el QComboBox de productos."""
-    conn = None
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id_producto, nombre, codigo FROM productos ORDER BY nombre")
-        productos = cursor.fetchall()
-        return productos
+        return obtener_catalogo().filas(("id_producto", "nombre", "codigo"), orden="nombre")
     except sqlite3.Error as e:
         QMessageBox.critical(None, "Error de DB", f"No se pudieron cargar los productos: {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
 
 def obtener_proveedores():
     """Obtiene todos los proveedores para llenar el QComboBox de proveedores."""
-    conn = None
+    conn = obtener_conexion()
     try:
-        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         cursor.execute("SELECT id_proveedor, nombre_proveedor FROM proveedores ORDER BY nombre_proveedor")
         proveedores = cursor.fetchall()
@@ -130,11 +35,10 @@ def obtener_proveedores():
     except sqlite3.Error as e:
         QMessageBox.critical(None, "Error de DB", f"No se pudieron cargar los proveedores: {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
 
 def abrir_aplicacion(nombre_py):
+    if abrir_en_aplicacion(nombre_py) or abrir_con_lanzador(nombre_py):
+        return
     rutas = []
     if hasattr(sys, '_MEIPASS'):
         rutas.append(sys._MEIPASS)
@@ -334,9 +238,8 @@ class InsertarLoteWindow(QMainWindow):
             QMessageBox.critical(self, "Error de formato", f"Verifique los valores numéricos ingresados: {e}")
             return
 
-        conn = None
+        conn = obtener_conexion()
         try:
-            conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
             
             # Insertar en la tabla 'lotes'
@@ -352,9 +255,8 @@ class InsertarLoteWindow(QMainWindow):
                 precio_costo,
                 id_proveedor
             ))
-            conn.commit()
 
-            # Actualizar el stock del producto en la tabla 'productos'
+            # Actualizar el stock del producto en la misma transacción que el lote
             cursor.execute("""
                 UPDATE productos SET stock = stock + ? WHERE id_producto = ?
             """, (cantidad, id_producto))
@@ -364,12 +266,11 @@ class InsertarLoteWindow(QMainWindow):
             self.abrir_ver_lotes()
 
         except sqlite3.IntegrityError as e:
+            conn.rollback()
             QMessageBox.warning(self, "Advertencia", f"Error de integridad: {e}. El código de lote podría ya existir o el proveedor no es válido.")
         except sqlite3.Error as e:
+            conn.rollback()
             QMessageBox.critical(self, "Error de Base de Datos", f"No se pudo guardar el lote: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     def limpiar_formulario(self):
         self.campos["id_producto"].setCurrentIndex(0)
@@ -384,6 +285,9 @@ class InsertarLoteWindow(QMainWindow):
         self.abrir_ver_lotes()
 
     def abrir_ver_lotes(self):
+        if abrir_en_aplicacion("ver_lotes.py"):
+            self.close()
+            return
         try:
             from ver_lotes import VerLotesWindow
         except ImportError:
@@ -396,19 +300,10 @@ class InsertarLoteWindow(QMainWindow):
 
     def ir_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
 
 if __name__ == "__main__":
-    crear_tablas()
-    verificar_tablas()
     app = QApplication(sys.argv)
     window = InsertarLoteWindow()
     window.show()
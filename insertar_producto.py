@@ -1,61 +1,25 @@
 import sys
 import os
-import shutil
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QLabel, 
     QLineEdit, QPushButton, QMessageBox, QDateEdit, QWidget, QComboBox, QFileDialog
 )
 from PyQt5.QtCore import Qt, QDate
 import sqlite3
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla, abrir_en_aplicacion, abrir_con_lanzador
 from datetime import datetime
 import subprocess
-import cv2  # <--- Asegúrate de tener instalado opencv-python
+from ingesta_imagenes import ingresar_archivo, ingresar_foto
+from importacion_diferida import importar_diferido
 
-# ----------------- INICIO DE MODIFICACIONES -----------------
+# opencv-python; solo se importa al tomar una foto
+cv2 = importar_diferido("cv2")
 
-def obtener_db_path():
-    if getattr(sys, 'frozen', False):
-        exe_dir = os.path.dirname(sys.executable)
-        # CORRECCIÓN: Usar la base de datos pruebas.db
-        db_path = os.path.join(exe_dir, "pruebas.db")
-        if os.path.exists(db_path):
-            return db_path
-        base_path = sys._MEIPASS
-        return os.path.join(base_path, "pruebas.db")
-    else:
-        # CORRECCIÓN: Usar la base de datos pruebas.db
-        return os.path.abspath(os.path.join(os.path.dirname(__file__), "pruebas.db"))
+# ----------------- INICIO DE MODIFICACIONES -----------------
 
 db_path = obtener_db_path()
 
-def verificar_tablas():
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tablas = cursor.fetchall()
-        
-        print("Tablas existentes:")
-        for tabla in tablas:
-            print(f"- {tabla[0]}")
-            
-    except sqlite3.Error as e:
-        print(f"Error al verificar tablas: {e}")
-    finally:
-        if conn:
-            conn.close()
-
-def mostrar_columnas():
-    # CORRECCIÓN: Usar la tabla 'productos'
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("PRAGMA table_info(productos)")
-    print("Columnas de la tabla productos:")
-    for col in cursor.fetchall():
-        print(col)
-    conn.close()
-
 class InsertarProductoWindow(QMainWindow):
     def __init__(self, id_empleado):
         super().__init__()
@@ -212,15 +176,14 @@ class InsertarProductoWindow(QMainWindow):
             QMessageBox.warning(self, "Advertencia", "La fecha de vencimiento no puede ser anterior a hoy.")
             return
 
+        conn = obtener_conexion()
         try:
-            conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
 
             # Verificar si el código ya existe
             cursor.execute("SELECT COUNT(*) FROM productos WHERE codigo = ?", (datos["codigo"],))
             if cursor.fetchone()[0] > 0:
                 QMessageBox.warning(self, "Advertencia", "El código ya existe. Ingrese uno diferente.")
-                conn.close()
                 return
 
             # Convertir la fecha a timestamp INTEGER
@@ -253,10 +216,13 @@ class InsertarProductoWindow(QMainWindow):
             self.limpiar_formulario()
 
         except sqlite3.IntegrityError:
+            conn.rollback()
             QMessageBox.warning(self, "Advertencia", "Error de integridad. El código podría ya existir.")
         except sqlite3.Error as e:
+            conn.rollback()
             QMessageBox.critical(self, "Error", f"No se pudo guardar el producto: {e}")
         except ValueError:
+            conn.rollback()
             QMessageBox.warning(self, "Error de formato", "Verifique los valores numéricos (precio, stock)")
 
     def limpiar_formulario(self):
@@ -274,21 +240,13 @@ class InsertarProductoWindow(QMainWindow):
     def cargar_imagen(self):
         ruta, _ = QFileDialog.getOpenFileName(self, "Seleccionar imagen", "", "Imágenes (*.png *.jpg *.jpeg *.bmp)")
         if ruta:
-            # Copia la imagen a la carpeta local de imágenes
-            carpeta_destino = os.path.join(os.path.dirname(__file__), "imagenes_productos")
-            os.makedirs(carpeta_destino, exist_ok=True)
-            nombre_archivo = os.path.basename(ruta)
-            destino = os.path.join(carpeta_destino, nombre_archivo)
-            shutil.copy(ruta, destino)
-            # Guarda la ruta relativa en el campo
-            self.campos["imagen"].setText(os.path.relpath(destino, os.path.dirname(__file__)))
+            # Se guarda reducida y recomprimida en imagenes_productos/
+            try:
+                self.campos["imagen"].setText(ingresar_archivo(ruta))
+            except (ValueError, OSError) as e:
+                QMessageBox.warning(self, "Imagen", f"No se pudo cargar la imagen: {e}")
 
     def tomar_foto(self):
-        carpeta_destino = os.path.join(os.path.dirname(__file__), "imagenes_productos")
-        os.makedirs(carpeta_destino, exist_ok=True)
-        nombre_archivo = f"foto_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-        destino = os.path.join(carpeta_destino, nombre_archivo)
-
         cap = cv2.VideoCapture(0)
         if not cap.isOpened():
             QMessageBox.warning(self, "Error", "No se pudo acceder a la cámara.")
@@ -301,8 +259,10 @@ class InsertarProductoWindow(QMainWindow):
             cv2.imshow("Tomar Foto (presiona 's' para guardar, 'q' para cancelar)", frame)
             key = cv2.waitKey(1)
             if key == ord('s'):
-                cv2.imwrite(destino, frame)
-                self.campos["imagen"].setText(os.path.relpath(destino, os.path.dirname(__file__)))
+                try:
+                    self.campos["imagen"].setText(ingresar_foto(frame))
+                except (ValueError, OSError) as e:
+                    QMessageBox.warning(self, "Imagen", f"No se pudo guardar la foto: {e}")
                 break
             elif key == ord('q'):
                 break
@@ -311,15 +271,8 @@ class InsertarProductoWindow(QMainWindow):
 
     def ir_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
 
 def abrir_aplicacion(nombre_py, argumentos=None):
     """
@@ -327,6 +280,8 @@ def abrir_aplicacion(nombre_py, argumentos=None):
     Si es .py, lo ejecuta con el intérprete de Python.
     Permite pasar argumentos.
     """
+    if abrir_en_aplicacion(nombre_py, argumentos) or abrir_con_lanzador(nombre_py, argumentos):
+        return
     # Si es ruta absoluta y existe, úsala directamente
     if os.path.isabs(nombre_py) and os.path.exists(nombre_py):
         if nombre_py.endswith('.py'):
@@ -368,8 +323,6 @@ def abrir_aplicacion(nombre_py, argumentos=None):
                         f"No se encontró el archivo:\n{nombre_py}")
 
 if __name__ == "__main__":
-    verificar_tablas() # Para verificar que la tabla 'productos' existe
-    mostrar_columnas() # Para ver las columnas de la tabla 'productos'
     app = QApplication(sys.argv)
     # Define aquí el id_empleado_actual (por ejemplo, 1 para pruebas)
     id_empleado_actual = 1  # Cambia este valor según corresponda
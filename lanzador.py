@@ -0,0 +1,185 @@
+"""
+Lanzador residente de pantallas.
+
+Abrir una pantalla como proceso nuevo cuesta sobre todo importar PyQt5,
+pandas y matplotlib. El lanzador mantiene siempre un intérprete de reserva
+con esos módulos ya importados; cuando una pantalla pide abrir otra (ver
+navegacion.py), la reserva ejecuta el script pedido y el lanzador prepara
+la siguiente. Los pedidos llegan por un socket local (127.0.0.1).
+
+Si el lanzador no está corriendo, las pantallas se abren como siempre con
+subprocess.
+
+Uso:
+    python lanzador.py          # dejarlo corriendo en segundo plano
+"""
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import runpy
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PUERTO = int(os.environ.get("FARMACIA_LANZADOR_PUERTO", 47653))
+# Segundos que una pantalla espera al lanzador antes de abrir un proceso normal
+TIEMPO_ESPERA = 0.3
+
+# Módulos que la reserva importa antes de recibir un pedido
+PRECARGA = (
+    "PyQt5.QtWidgets", "PyQt5.QtGui", "PyQt5.QtCore",
+    "pandas", "numpy", "matplotlib.pyplot", "matplotlib.backends.backend_qt5agg",
+    "seaborn", "conexion_db", "catalogo", "busqueda_productos", "periodos",
+)
+
+def _pantallas():
+    from aplicacion import PANTALLAS
+    return PANTALLAS
+
+def pedir(script, argumentos=None):
+    """
+    Pide al lanzador que abra 'script'. Devuelve False si el lanzador no
+    está corriendo o no aceptó el pedido.
+    """
+    if getattr(sys, "frozen", False):
+        return False
+    pedido = {
+        "script": os.path.basename(script),
+        "argumentos": [str(a) for a in argumentos or []],
+        "cwd": os.getcwd(),
+    }
+    try:
+        with socket.create_connection(("127.0.0.1", PUERTO), timeout=TIEMPO_ESPERA) as conexion:
+            conexion.sendall(json.dumps(pedido).encode("utf-8") + b"\n")
+            return conexion.makefile("rb").readline().strip() == b"ok"
+    except OSError:
+        return False
+
+def _pedido_valido(pedido):
+    """
+    El pedido tal como lo arma pedir(), solo con sus claves conocidas, o
+    None si no tiene esa forma.
+    """
+    if not isinstance(pedido, dict):
+        return None
+    script = pedido.get("script")
+    argumentos = pedido.get("argumentos")
+    cwd = pedido.get("cwd")
+    if not isinstance(script, str):
+        return None
+    if not isinstance(argumentos, list) or not all(isinstance(a, str) for a in argumentos):
+        return None
+    if cwd is not None and not isinstance(cwd, str):
+        return None
+    return {"script": script, "argumentos": argumentos, "cwd": cwd}
+
+def _precargar():
+    inicio = time.perf_counter()
+    for modulo in PRECARGA:
+        try:
+            __import__(modulo)
+        except ImportError as e:
+            logging.warning(f"Lanzador: no se pudo precargar {modulo}: {e}")
+    logging.info(f"Reserva lista en {time.perf_counter() - inicio:.1f} s")
+
+def _ejecutar_reserva():
+    """Proceso de reserva: precarga, espera un pedido y ejecuta el script."""
+    _precargar()
+    linea = sys.stdin.readline()
+    if not linea:
+        return
+    pedido = _pedido_valido(json.loads(linea))
+    if pedido is None:
+        logging.error("Lanzador: la reserva recibió un pedido inválido")
+        return
+    ruta = os.path.join(BASE_DIR, pedido["script"])
+    if pedido.get("cwd") and os.path.isdir(pedido["cwd"]):
+        os.chdir(pedido["cwd"])
+    sys.argv = [ruta] + pedido["argumentos"]
+    sys.stdin = open(os.devnull)
+    runpy.run_path(ruta, run_name="__main__")
+
+class Lanzador:
+    def __init__(self, puerto=PUERTO):
+        self.puerto = puerto
+        self.pantallas = _pantallas()
+        self.reserva = None
+        # Procesos ya entregados, para recoger los que terminan
+        self.lanzados = []
+
+    def _nueva_reserva(self):
+        comando = [sys.executable, os.path.abspath(__file__), "--reserva"]
+        self.reserva = subprocess.Popen(comando, stdin=subprocess.PIPE, cwd=BASE_DIR)
+
+    def _recoger(self):
+        self.lanzados = [p for p in self.lanzados if p.poll() is None]
+
+    def atender(self, pedido):
+        """Entrega el pedido a la reserva. Devuelve False si no se puede atender."""
+        valido = _pedido_valido(pedido)
+        if valido is None:
+            logging.warning(f"Lanzador: pedido inválido {pedido!r}")
+            return False
+        pedido = valido
+        if pedido["script"] not in self.pantallas:
+            logging.warning(f"Lanzador: pantalla desconocida {pedido['script']!r}")
+            return False
+        if self.reserva is None or self.reserva.poll() is not None:
+            self._nueva_reserva()
+        proceso, self.reserva = self.reserva, None
+        try:
+            proceso.stdin.write(json.dumps(pedido).encode("utf-8") + b"\n")
+            proceso.stdin.close()
+        except OSError as e:
+            logging.error(f"Lanzador: la reserva no aceptó el pedido: {e}")
+            proceso.kill()
+            return False
+        self.lanzados.append(proceso)
+        self._nueva_reserva()
+        logging.info(f"Lanzador: {pedido['script']} {' '.join(pedido['argumentos'])}")
+        return True
+
+    def servir(self):
+        servidor = socket.create_server(("127.0.0.1", self.puerto))
+        servidor.settimeout(5)
+        self._nueva_reserva()
+        logging.info(f"Lanzador escuchando en 127.0.0.1:{self.puerto}")
+        try:
+            while True:
+                self._recoger()
+                try:
+                    conexion, _ = servidor.accept()
+                except socket.timeout:
+                    continue
+                with conexion:
+                    conexion.settimeout(2)
+                    try:
+                        pedido = json.loads(conexion.makefile("rb").readline())
+                        ok = self.atender(pedido)
+                    except (OSError, ValueError) as e:
+                        logging.warning(f"Lanzador: pedido inválido: {e}")
+                        ok = False
+                    try:
+                        conexion.sendall(b"ok\n" if ok else b"error\n")
+                    except OSError:
+                        pass
+        finally:
+            servidor.close()
+            if self.reserva is not None:
+                self.reserva.kill()
+
+def main():
+    if "--reserva" in sys.argv:
+        # Sin basicConfig: la pantalla que se ejecute configura su propio logging
+        _ejecutar_reserva()
+        return
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        Lanzador().servir()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,25 @@
 import sys
 import sqlite3
-import bcrypt
-import subprocess
-import os
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel,
     QLineEdit, QPushButton, QMessageBox, QHBoxLayout, QCheckBox
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPixmap, QPalette, QBrush, QColor
+from conexion_db import obtener_conexion
+from navegacion import iniciar_sesion
+from tareas_fondo import CargadorEnSegundoPlano
+from seguridad import verificar_credenciales, UsuarioNoEncontradoError, ContrasenaIncorrectaError
+from permisos import resolver_permisos, registrar_permisos, MENU_ADMINISTRACION
 
 class LoginApp(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Inicio de Sesión")
+        # bcrypt tarda décimas de segundo: se verifica fuera del hilo de la interfaz
+        self.cargador = CargadorEnSegundoPlano(parent=self)
+        self.cargador.terminado.connect(self._login_correcto)
+        self.cargador.fallo.connect(self._login_fallido)
         self.setup_ui()
 
     def setup_ui(self):
@@ -107,11 +113,10 @@ class LoginApp(QWidget):
 
         # Obtener números de administradores desde la base de datos
         try:
-            conn = sqlite3.connect(obtener_db_path())
+            conn = obtener_conexion()
             cursor = conn.cursor()
             cursor.execute("SELECT nombre, celular FROM empleado WHERE rol LIKE '%admin%'")
             admins = cursor.fetchall()
-            conn.close()
             if admins:
                 admin_info = "\n".join([f"{nombre}: {celular}" for nombre, celular in admins])
                 info_text = (
@@ -142,38 +147,44 @@ class LoginApp(QWidget):
             self.show_message("Campos vacíos", "Por favor, ingrese su usuario y contraseña.", "warning")
             return
 
+        if self.cargador.ocupado:
+            return
         self.boton_login.setEnabled(False)
         self.boton_login.setText("Verificando...")
-
-        try:
-            conn = sqlite3.connect(obtener_db_path())
-            cursor = conn.cursor()
-            cursor.execute("SELECT id_empleado, contrasena_hash, rol FROM empleado WHERE nombre = ?", (nombre,))
-            resultado = cursor.fetchone()
-            conn.close()
-
-            if resultado:
-                id_empleado, hash_guardado, rol = resultado
-                if bcrypt.checkpw(contraseña.encode(), hash_guardado.encode()):
-                    self.close()
-                    rol = rol.strip().lower()
-                    archivo = "menu.py" if "admin" in rol or "gerente" in rol else "ventas.py"
-                    try:
-                        ruta_menu = os.path.abspath(os.path.join(os.path.dirname(__file__), archivo))
-                        subprocess.Popen([sys.executable, ruta_menu, str(id_empleado)])
-                    except Exception as e:
-                        self.show_message("Error", str(e), "error")
-                else:
-                    self.show_message("Error de Autenticación", "La contraseña ingresada es incorrecta.", "error")
-            else:
-                self.show_message("Usuario no encontrado", "El usuario ingresado no existe en el sistema.", "error")
-        except sqlite3.Error as e:
-            self.show_message("Error de Base de Datos", f"Error al conectar con la base de datos:\n{str(e)}", "error")
-        except Exception as e:
-            self.show_message("Error del Sistema", f"Ocurrió un error inesperado:\n{str(e)}", "error")
-        finally:
-            self.boton_login.setEnabled(True)
-            self.boton_login.setText("Iniciar Sesión")
+        self.cargador.cargar(lambda conn, progreso: self._autenticar(conn, nombre, contraseña))
+
+    @staticmethod
+    def _autenticar(conn, nombre, contraseña):
+        # En el hilo de fondo: credenciales y permisos de la sesión
+        id_empleado, _ = verificar_credenciales(conn, nombre, contraseña)
+        return id_empleado, resolver_permisos(conn, id_empleado)
+
+    def _restaurar_boton(self):
+        self.boton_login.setEnabled(True)
+        self.boton_login.setText("Iniciar Sesión")
+
+    def _login_correcto(self, resultado):
+        self._restaurar_boton()
+        id_empleado, permisos = resultado
+        registrar_permisos(id_empleado, permisos)
+        archivo = "menu.py" if MENU_ADMINISTRACION in permisos else "ventas.py"
+        if iniciar_sesion(id_empleado, archivo):
+            self.close()
+
+    def _login_fallido(self, error):
+        self._restaurar_boton()
+        if isinstance(error, UsuarioNoEncontradoError):
+            self.show_message("Usuario no encontrado", "El usuario ingresado no existe en el sistema.", "error")
+        elif isinstance(error, ContrasenaIncorrectaError):
+            self.show_message("Error de Autenticación", "La contraseña ingresada es incorrecta.", "error")
+        elif isinstance(error, sqlite3.Error):
+            self.show_message("Error de Base de Datos", f"Error al conectar con la base de datos:\n{str(error)}", "error")
+        else:
+            self.show_message("Error del Sistema", f"Ocurrió un error inesperado:\n{str(error)}", "error")
+
+    def closeEvent(self, event):
+        self.cargador.cancelar()
+        super().closeEvent(event)
 
     def show_message(self, title, message, msg_type):
         msg_box = QMessageBox(self)
@@ -187,17 +198,6 @@ class LoginApp(QWidget):
             msg_box.setIcon(QMessageBox.Critical)
         msg_box.exec_()
 
-def obtener_db_path():
-    if getattr(sys, 'frozen', False):
-        exe_dir = os.path.dirname(sys.executable)
-        db_path = os.path.join(exe_dir, "pruebas.db")
-        if os.path.exists(db_path):
-            return db_path
-        base_path = sys._MEIPASS
-        return os.path.join(base_path, "pruebas.db")
-    else:
-        return os.path.abspath(os.path.join(os.path.dirname(__file__), "pruebas.db"))
-
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     ventana = LoginApp()
@@ -1,30 +1,27 @@
 import sys
 import os
-import subprocess
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QPushButton,
     QWidget, QLabel, QMessageBox, QFileDialog
 )
 from PyQt5.QtCore import Qt
 from datetime import datetime
-import shutil
+import sqlite3
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla
+from permisos import puede_abrir
 
-def abrir_aplicacion(nombre_py):
-    if not os.path.isabs(nombre_py):
-        base_dir = os.path.dirname(__file__)
-        nombre_py = os.path.join(base_dir, nombre_py)
-    if os.path.exists(nombre_py):
-        try:
-            subprocess.Popen([sys.executable, nombre_py])
-        except Exception as e:
-            QMessageBox.critical(None, "Error", f"No se pudo abrir el ejecutable:\n{e}")
-            return
-    else:
-        QMessageBox.warning(None, "Archivo no encontrado", f"No se encontró el archivo:\n{nombre_py}")
+def abrir_aplicacion(nombre_py, argumentos=None):
+    """Dentro de aplicacion.py cambia de página; si no, abre un proceso nuevo."""
+    return abrir_pantalla(nombre_py, argumentos)
+
+# Pantallas que reciben el id del empleado que inició sesión
+SCRIPTS_CON_EMPLEADO = {"ventas_admin.py"}
 
 class MenuPrincipal(QMainWindow):
-    def __init__(self):
+    def __init__(self, id_empleado=None):
         super().__init__()
+        self.id_empleado = id_empleado
         self.setWindowTitle("Menú Principal - Sistema de Farmacia")
         self._construir_ui()
 
@@ -59,6 +56,9 @@ class MenuPrincipal(QMainWindow):
         ]
 
         for texto, script in botones:
+            # Sin empleado (menu.py abierto solo) se muestran todas
+            if self.id_empleado is not None and not puede_abrir(self.id_empleado, script):
+                continue
             btn = QPushButton(texto)
             btn.setMinimumHeight(40)
             if script == "volver":
@@ -77,11 +77,14 @@ class MenuPrincipal(QMainWindow):
             script_path = os.path.join(base_dir, script_name)
         else:
             script_path = script_name
-        abrir_aplicacion(script_path)
-        self.close()
+        argumentos = None
+        if self.id_empleado is not None and os.path.basename(script_path) in SCRIPTS_CON_EMPLEADO:
+            argumentos = [str(self.id_empleado)]
+        if abrir_aplicacion(script_path, argumentos):
+            self.close()
 
     def exportar_base_datos(self):
-        db_path = os.path.join(os.path.dirname(__file__), "pruebas.db")
+        db_path = obtener_db_path()
         if not os.path.exists(db_path):
             QMessageBox.warning(self, "Base de datos no encontrada", f"No se encontró la base de datos en:\n{db_path}")
             return
@@ -96,31 +99,34 @@ class MenuPrincipal(QMainWindow):
         if not file_path:
             return
         try:
-            shutil.copy2(db_path, file_path)
+            # Con WAL, copiar el archivo puede perder cambios que siguen en
+            # pruebas.db-wal; la API de respaldo copia una instantánea consistente.
+            destino = sqlite3.connect(file_path)
+            try:
+                obtener_conexion(db_path).backup(destino)
+            finally:
+                destino.close()
             QMessageBox.information(self, "Exportación exitosa", f"Base de datos exportada a:\n{file_path}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"No se pudo exportar la base de datos:\n{e}")
 
     def volver_a_login(self):
         """Cerrar menú y volver a login.py"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "login.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("login.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir login.py: {e}")
+
+def id_empleado_desde_argv():
+    """login.py abre el menú pasando el id del empleado como primer argumento."""
+    return int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else None
 
 def main():
     app = QApplication(sys.argv)
-    window = MenuPrincipal()
+    window = MenuPrincipal(id_empleado_desde_argv())
     window.showMaximized()
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = MenuPrincipal()
+    window = MenuPrincipal(id_empleado_desde_argv())
     window.showMaximized()
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,732 @@
+"""
+Migraciones versionadas del esquema de pruebas.db.
+
+Cada migración se aplica una sola vez, dentro de su propia transacción, y
+queda registrada en la tabla schema_version. Los pasos usan IF NOT EXISTS /
+IF EXISTS para que se puedan volver a ejecutar sin error sobre bases de datos
+que ya tenían parte del esquema creado a mano.
+
+Las migraciones no usan código de otros módulos: el SQL y los datos
+iniciales están copiados aquí tal como eran al escribirlas, para que una
+base nueva y una ya migrada terminen con el mismo esquema. Un cambio
+posterior de esquema es una migración nueva, no una edición de una vieja.
+
+Uso desde la línea de comandos:
+    python migraciones.py            # aplica las pendientes y muestra la versión
+    python migraciones.py ruta.db
+"""
+import sys
+import sqlite3
+import logging
+
+def _columnas(cursor, tabla):
+    return [fila[1] for fila in cursor.execute(f"PRAGMA table_info({tabla})")]
+
+def _agregar_columna(cursor, tabla, columna, definicion):
+    """ALTER TABLE ADD COLUMN solo si la columna todavía no existe."""
+    if columna not in _columnas(cursor, tabla):
+        cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+
+# ----------------- Migraciones -----------------
+
+def _esquema_base(cursor):
+    """Tablas que usa la aplicación, tal como están en pruebas.db."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS empleado (
+            id_empleado INTEGER PRIMARY KEY AUTOINCREMENT,
+            CI INTEGER UNIQUE NOT NULL,
+            nombre TEXT NOT NULL,
+            celular TEXT,
+            contrasena_hash TEXT NOT NULL,
+            rol TEXT CHECK(rol IN ('administrador', 'empleado')) NOT NULL,
+            fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            apellidos TEXT
+        )
+    """)
+    _agregar_columna(cursor, "empleado", "apellidos", "TEXT")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS clientes (
+            id_cliente INTEGER PRIMARY KEY AUTOINCREMENT,
+            ci INTEGER UNIQUE NOT NULL,
+            nombre_cliente TEXT NOT NULL,
+            email TEXT UNIQUE,
+            telefono TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ventas (
+            id_venta INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_cliente INTEGER,
+            id_empleado INTEGER NOT NULL,
+            fecha_venta TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            total_venta REAL NOT NULL DEFAULT 0.00,
+            FOREIGN KEY (id_cliente) REFERENCES clientes(id_cliente) ON DELETE SET NULL,
+            FOREIGN KEY (id_empleado) REFERENCES empleado(id_empleado) ON DELETE SET NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS detalles_venta (
+            id_detalle INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_venta INTEGER NOT NULL,
+            id_producto INTEGER,
+            cantidad INTEGER NOT NULL,
+            precio_unitario REAL NOT NULL,
+            subtotal REAL NOT NULL,
+            FOREIGN KEY (id_venta) REFERENCES ventas(id_venta) ON DELETE CASCADE,
+            FOREIGN KEY (id_producto) REFERENCES productos(id_producto) ON DELETE SET NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS permisos (
+            id_permiso INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre_permiso TEXT UNIQUE NOT NULL,
+            descripcion TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS bitacora_precios (
+            id_bitacora INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_producto INTEGER,
+            precio_anterior REAL,
+            precio_nuevo REAL,
+            fecha_cambio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            id_empleado INTEGER,
+            FOREIGN KEY (id_producto) REFERENCES productos(id_producto) ON DELETE CASCADE
+        )
+    """)
+    _agregar_columna(cursor, "bitacora_precios", "id_empleado", "INTEGER")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS reportes_precios (
+            id_reporte INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_producto INTEGER,
+            fecha_reporte DATE NOT NULL,
+            precio REAL NOT NULL,
+            FOREIGN KEY (id_producto) REFERENCES productos(id_producto) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS empleados_eliminados (
+            id_borrado INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_empleado INTEGER,
+            ci TEXT,
+            nombre TEXT,
+            celular TEXT,
+            rol TEXT CHECK(rol IN ('administrador', 'empleado')),
+            fecha_creacion TEXT,
+            fecha_borrado TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS productos_borrados (
+            id_borrado INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_producto INTEGER,
+            codigo TEXT NOT NULL,
+            imagen TEXT,
+            nombre TEXT NOT NULL,
+            precio REAL,
+            stock INTEGER,
+            fecha_venc INTEGER,
+            fecha_eliminacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            id_empleado INTEGER
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS proveedores (
+            id_proveedor INTEGER PRIMARY KEY,
+            nombre_proveedor TEXT NOT NULL UNIQUE,
+            nit_ruc TEXT UNIQUE,
+            nombre_contacto TEXT,
+            telefono TEXT NOT NULL,
+            correo TEXT NOT NULL,
+            direccion TEXT,
+            estado TEXT DEFAULT 'activo' CHECK(estado IN ('activo', 'inactivo')),
+            fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS productos (
+            id_producto INTEGER PRIMARY KEY,
+            codigo TEXT NOT NULL,
+            imagen TEXT NOT NULL,
+            nombre TEXT NOT NULL,
+            precio REAL NOT NULL,
+            stock INTEGER NOT NULL,
+            fecha_venc INTEGER NOT NULL,
+            id_empleado INTEGER,
+            FOREIGN KEY (id_empleado) REFERENCES empleado(id_empleado)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS lotes (
+            id_lote INTEGER PRIMARY KEY,
+            id_producto INTEGER NOT NULL,
+            codigo_lote TEXT NOT NULL UNIQUE,
+            cantidad INTEGER NOT NULL,
+            fecha_entrada TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            fecha_vencimiento INTEGER NOT NULL,
+            precio_costo REAL,
+            id_proveedor INTEGER,
+            FOREIGN KEY(id_producto) REFERENCES productos(id_producto),
+            FOREIGN KEY(id_proveedor) REFERENCES proveedores(id_proveedor)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS movimientos_inventario (
+            id_movimiento INTEGER PRIMARY KEY AUTOINCREMENT,
+            codigo_producto TEXT NOT NULL,
+            tipo_movimiento TEXT CHECK(tipo_movimiento IN (
+                'entrada',
+                'salida',
+                'venta',
+                'compra',
+                'ajuste de inventario',
+                'devolución',
+                'baja por vencimiento',
+                'transferencia',
+                'restauración'
+            )) NOT NULL,
+            cantidad INTEGER NOT NULL,
+            fecha_movimiento TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            observaciones TEXT,
+            usuario TEXT,
+            FOREIGN KEY (codigo_producto) REFERENCES productos(codigo)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cliente ON ventas(id_cliente)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_empleado ON ventas(id_empleado)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_detalles_venta_id_producto ON detalles_venta(id_producto)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_movimientos_tipo ON movimientos_inventario(tipo_movimiento)")
+
+def _indices_de_acceso(cursor):
+    """Índices para las búsquedas que se hacen en cada venta, lote y login."""
+    # El índice original apuntaba a "fecha movimiento" (con espacio), una
+    # columna que no existe, así que no servía para filtrar por fecha.
+    cursor.execute("DROP INDEX IF EXISTS idx_movimientos_fecha")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_movimientos_fecha ON movimientos_inventario(fecha_movimiento)")
+    # Historial de un producto: WHERE codigo_producto = ? ORDER BY fecha_movimiento.
+    # Reemplaza al índice solo por código, que queda cubierto por este.
+    cursor.execute("DROP INDEX IF EXISTS idx_movimientos_codigo")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_movimientos_codigo_fecha
+        ON movimientos_inventario(codigo_producto, fecha_movimiento)
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_productos_codigo ON productos(codigo)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lotes_producto ON lotes(id_producto)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lotes_vencimiento ON lotes(fecha_vencimiento)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_empleado_nombre ON empleado(nombre)")
+    cursor.execute("ANALYZE")
+
+def _fecha_epoch_movimientos(cursor):
+    """
+    Columna entera fecha_epoch para filtrar por rango de fechas con índice.
+    Guarda los segundos del reloj local de fecha_movimiento (ver periodos.py).
+    """
+    _agregar_columna(cursor, "movimientos_inventario", "fecha_epoch", "INTEGER")
+    cursor.execute("""
+        UPDATE movimientos_inventario
+        SET fecha_epoch = CAST(strftime('%s', fecha_movimiento) AS INTEGER)
+        WHERE fecha_epoch IS NULL AND fecha_movimiento IS NOT NULL
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_movimientos_epoch ON movimientos_inventario(fecha_epoch)")
+    # Estadísticas filtra por tipo ('venta', 'compra') dentro del rango
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_movimientos_tipo_epoch
+        ON movimientos_inventario(tipo_movimiento, fecha_epoch)
+    """)
+    # Las pantallas que insertan solo fecha_movimiento siguen funcionando:
+    # los triggers completan fecha_epoch.
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_movimientos_epoch_insert
+        AFTER INSERT ON movimientos_inventario
+        WHEN NEW.fecha_epoch IS NULL AND NEW.fecha_movimiento IS NOT NULL
+        BEGIN
+            UPDATE movimientos_inventario
+            SET fecha_epoch = CAST(strftime('%s', NEW.fecha_movimiento) AS INTEGER)
+            WHERE id_movimiento = NEW.id_movimiento;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_movimientos_epoch_update
+        AFTER UPDATE OF fecha_movimiento ON movimientos_inventario
+        BEGIN
+            UPDATE movimientos_inventario
+            SET fecha_epoch = CAST(strftime('%s', NEW.fecha_movimiento) AS INTEGER)
+            WHERE id_movimiento = NEW.id_movimiento;
+        END
+    """)
+    cursor.execute("ANALYZE movimientos_inventario")
+
+# Precio actual de un código ({col}); codigo no es UNIQUE en productos, se
+# toma el de menor id_producto
+_SQL_PRECIO_ACTUAL = "COALESCE((SELECT precio FROM productos WHERE codigo = {col} ORDER BY id_producto LIMIT 1), 0)"
+
+def _sumar_ventas_diarias(prefijo, signo, precio):
+    """Suma (o resta, con signo '-') la fila {prefijo} de movimientos_inventario a ventas_diarias."""
+    return f"""
+        INSERT INTO ventas_diarias
+            (dia_epoch, dia, codigo_producto, tipo_movimiento, cantidad, valor, movimientos)
+        VALUES (
+            CAST(strftime('%s', date({prefijo}.fecha_movimiento)) AS INTEGER),
+            date({prefijo}.fecha_movimiento),
+            {prefijo}.codigo_producto,
+            {prefijo}.tipo_movimiento,
+            {signo}{prefijo}.cantidad,
+            {signo}{prefijo}.cantidad * {precio.format(mov=prefijo)},
+            {signo}1
+        )
+        ON CONFLICT (dia_epoch, codigo_producto, tipo_movimiento) DO UPDATE SET
+            cantidad = cantidad + excluded.cantidad,
+            valor = valor + excluded.valor,
+            movimientos = movimientos + excluded.movimientos;
+    """
+
+def _triggers_ventas_diarias(cursor, precio):
+    """Triggers que mantienen ventas_diarias; 'precio' es la expresión del precio de {mov}."""
+    limpiar = "DELETE FROM ventas_diarias WHERE movimientos <= 0;"
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_ventas_diarias_insert
+        AFTER INSERT ON movimientos_inventario
+        WHEN NEW.fecha_movimiento IS NOT NULL
+        BEGIN
+            {_sumar_ventas_diarias('NEW', '', precio)}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_ventas_diarias_delete
+        AFTER DELETE ON movimientos_inventario
+        WHEN OLD.fecha_movimiento IS NOT NULL
+        BEGIN
+            {_sumar_ventas_diarias('OLD', '-', precio)}
+            {limpiar}
+        END
+    """)
+    # Solo las columnas que cambian el resumen; el trigger de fecha_epoch no lo dispara
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_ventas_diarias_update
+        AFTER UPDATE OF fecha_movimiento, codigo_producto, tipo_movimiento, cantidad
+        ON movimientos_inventario
+        BEGIN
+            {_sumar_ventas_diarias('OLD', '-', precio)}
+            {_sumar_ventas_diarias('NEW', '', precio)}
+            {limpiar}
+        END
+    """)
+
+def _reconstruir_ventas_diarias(cursor, precio):
+    """Vuelve a calcular todo ventas_diarias desde movimientos_inventario."""
+    cursor.execute("DELETE FROM ventas_diarias")
+    cursor.execute(f"""
+        INSERT INTO ventas_diarias
+            (dia_epoch, dia, codigo_producto, tipo_movimiento, cantidad, valor, movimientos)
+        SELECT
+            CAST(strftime('%s', date(mi.fecha_movimiento)) AS INTEGER),
+            date(mi.fecha_movimiento),
+            mi.codigo_producto,
+            mi.tipo_movimiento,
+            SUM(mi.cantidad),
+            SUM(mi.cantidad * {precio.format(mov='mi')}),
+            COUNT(*)
+        FROM movimientos_inventario mi
+        WHERE mi.fecha_movimiento IS NOT NULL
+        GROUP BY 1, 3, 4
+    """)
+
+def _ventas_diarias(cursor):
+    """Resumen por día, producto y tipo de movimiento mantenido por triggers."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ventas_diarias (
+            dia_epoch INTEGER NOT NULL,
+            dia TEXT NOT NULL,
+            codigo_producto TEXT NOT NULL,
+            tipo_movimiento TEXT NOT NULL,
+            cantidad INTEGER NOT NULL DEFAULT 0,
+            valor REAL NOT NULL DEFAULT 0,
+            movimientos INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dia_epoch, codigo_producto, tipo_movimiento)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ventas_diarias_tipo
+        ON ventas_diarias(tipo_movimiento, dia_epoch)
+    """)
+    # Todavía no hay precio_unitario en los movimientos: se valúan al precio actual
+    precio = _SQL_PRECIO_ACTUAL.format(col="{mov}.codigo_producto")
+    _triggers_ventas_diarias(cursor, precio)
+    _reconstruir_ventas_diarias(cursor, precio)
+
+def _busqueda_productos(cursor):
+    """Índice FTS5 de nombre y código de productos, sincronizado por triggers."""
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts USING fts5(
+                nombre, codigo,
+                content='productos', content_rowid='id_producto',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        if "fts5" not in str(e):
+            raise
+        logging.warning("SQLite sin FTS5: la búsqueda de productos usará LIKE")
+        return
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_productos_fts_insert
+        AFTER INSERT ON productos
+        BEGIN
+            INSERT INTO productos_fts(rowid, nombre, codigo)
+            VALUES (NEW.id_producto, NEW.nombre, NEW.codigo);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_productos_fts_delete
+        AFTER DELETE ON productos
+        BEGIN
+            INSERT INTO productos_fts(productos_fts, rowid, nombre, codigo)
+            VALUES ('delete', OLD.id_producto, OLD.nombre, OLD.codigo);
+        END
+    """)
+    # Solo nombre y código: los cambios de stock de cada venta no tocan el índice
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_productos_fts_update
+        AFTER UPDATE OF nombre, codigo, id_producto ON productos
+        BEGIN
+            INSERT INTO productos_fts(productos_fts, rowid, nombre, codigo)
+            VALUES ('delete', OLD.id_producto, OLD.nombre, OLD.codigo);
+            INSERT INTO productos_fts(rowid, nombre, codigo)
+            VALUES (NEW.id_producto, NEW.nombre, NEW.codigo);
+        END
+    """)
+    cursor.execute("INSERT INTO productos_fts(productos_fts) VALUES ('rebuild')")
+
+def _registro_cambios_catalogo(cursor):
+    """Versión por producto que usa el catálogo en memoria (catalogo.py) para refrescarse."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS catalogo_cambios (
+            id_producto INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_catalogo_cambios_version
+        ON catalogo_cambios(version)
+    """)
+
+    # Una fila por producto: el registro no crece con cada venta
+    def anotar(columna):
+        return f"""
+            INSERT INTO catalogo_cambios (id_producto, version)
+            VALUES ({columna}, (SELECT COALESCE(MAX(version), 0) + 1 FROM catalogo_cambios))
+            ON CONFLICT (id_producto) DO UPDATE SET version = excluded.version;
+        """
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_catalogo_insert
+        AFTER INSERT ON productos
+        BEGIN
+            {anotar('NEW.id_producto')}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_catalogo_update
+        AFTER UPDATE ON productos
+        BEGIN
+            {anotar('OLD.id_producto')}
+            {anotar('NEW.id_producto')}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_catalogo_delete
+        AFTER DELETE ON productos
+        BEGIN
+            {anotar('OLD.id_producto')}
+        END
+    """)
+
+def _usuario_empleado(cursor):
+    """
+    Clave de login única e indexada. El login buscaba por 'nombre', que no es
+    único: 'usuario' toma el nombre y, si ya está tomado, le agrega el id.
+    """
+    _agregar_columna(cursor, "empleado", "usuario", "TEXT COLLATE NOCASE")
+
+    def usuario_para(fila):
+        return f"""
+            trim({fila}.nombre) || CASE WHEN EXISTS (
+                SELECT 1 FROM empleado otro
+                WHERE otro.usuario = trim({fila}.nombre)
+                  AND otro.id_empleado <> {fila}.id_empleado
+            ) THEN '.' || {fila}.id_empleado ELSE '' END
+        """
+
+    # De a uno y por id: el primero con cada nombre se queda con el nombre
+    for (id_empleado,) in cursor.execute(
+            "SELECT id_empleado FROM empleado WHERE usuario IS NULL ORDER BY id_empleado").fetchall():
+        cursor.execute(f"UPDATE empleado SET usuario = {usuario_para('empleado')} WHERE id_empleado = ?",
+                       (id_empleado,))
+    for usuario, nombre in cursor.execute(
+            "SELECT usuario, nombre FROM empleado WHERE usuario <> trim(nombre)").fetchall():
+        logging.warning(f"Empleado '{nombre}' con nombre repetido: inicia sesión como '{usuario}'")
+
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_empleado_usuario
+        ON empleado(usuario)
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_empleado_usuario_insert
+        AFTER INSERT ON empleado
+        WHEN NEW.usuario IS NULL
+        BEGIN
+            UPDATE empleado SET usuario = {usuario_para('NEW')}
+            WHERE id_empleado = NEW.id_empleado;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_empleado_usuario_update
+        AFTER UPDATE OF nombre ON empleado
+        WHEN trim(NEW.nombre) IS NOT trim(OLD.nombre)
+        BEGIN
+            UPDATE empleado SET usuario = {usuario_para('NEW')}
+            WHERE id_empleado = NEW.id_empleado;
+        END
+    """)
+
+def _roles_permisos(cursor):
+    """Relación rol -> permiso, con los permisos iniciales de cada rol."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS roles_permisos (
+            rol TEXT NOT NULL,
+            id_permiso INTEGER NOT NULL REFERENCES permisos(id_permiso) ON DELETE CASCADE,
+            PRIMARY KEY (rol, id_permiso)
+        ) WITHOUT ROWID
+    """)
+    # Los nombres son las constantes de permisos.py
+    cursor.executemany(
+        "INSERT OR IGNORE INTO permisos (nombre_permiso, descripcion) VALUES (?, ?)", [
+            ("menu_administracion", "Abrir el menú principal de administración"),
+            ("ventas", "Registrar ventas"),
+            ("gestionar_productos", "Ver, insertar y modificar productos, lotes y proveedores"),
+            ("gestionar_empleados", "Ver, insertar y modificar empleados"),
+            ("ver_reportes", "Estadísticas, reportes e historiales"),
+        ])
+    cursor.executemany("""
+        INSERT OR IGNORE INTO roles_permisos (rol, id_permiso)
+        SELECT ?, id_permiso FROM permisos WHERE nombre_permiso = ?
+    """, [
+        ("administrador", "menu_administracion"),
+        ("administrador", "ventas"),
+        ("administrador", "gestionar_productos"),
+        ("administrador", "gestionar_empleados"),
+        ("administrador", "ver_reportes"),
+        ("empleado", "ventas"),
+    ])
+
+def _precio_movimientos(cursor):
+    """
+    Precio unitario en cada movimiento, para valuar las ventas con el precio
+    que tenían y no con el actual. Los cambios de precio quedan en
+    bitacora_precios, y el resumen ventas_diarias se recalcula con los
+    precios históricos.
+    """
+    _agregar_columna(cursor, "movimientos_inventario", "precio_unitario", "REAL")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_bitacora_precios_producto_fecha
+        ON bitacora_precios(id_producto, fecha_cambio)
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas(fecha_venta)")
+
+    # Cada cambio de precio, con hora local como fecha_movimiento
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_bitacora_precios
+        AFTER UPDATE OF precio ON productos
+        WHEN NEW.precio IS NOT OLD.precio
+        BEGIN
+            INSERT INTO bitacora_precios (id_producto, precio_anterior, precio_nuevo, fecha_cambio, id_empleado)
+            VALUES (NEW.id_producto, OLD.precio, NEW.precio, datetime('now', 'localtime'), NEW.id_empleado);
+        END
+    """)
+    # Las pantallas que insertan movimientos sin precio guardan el actual
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_movimientos_precio_insert
+        AFTER INSERT ON movimientos_inventario
+        WHEN NEW.precio_unitario IS NULL
+        BEGIN
+            UPDATE movimientos_inventario
+            SET precio_unitario = {_SQL_PRECIO_ACTUAL.format(col='NEW.codigo_producto')}
+            WHERE id_movimiento = NEW.id_movimiento;
+        END
+    """)
+
+    # Historial: el precio de la línea de venta si la hay; si no, el vigente
+    # en la fecha del movimiento según bitacora_precios
+    cursor.execute("""
+        UPDATE movimientos_inventario
+        SET precio_unitario = (
+            SELECT dv.precio_unitario
+            FROM ventas v
+            JOIN detalles_venta dv ON dv.id_venta = v.id_venta
+            WHERE v.fecha_venta = movimientos_inventario.fecha_movimiento
+              AND dv.id_producto = (SELECT id_producto FROM productos
+                                    WHERE codigo = movimientos_inventario.codigo_producto
+                                    ORDER BY id_producto LIMIT 1)
+            LIMIT 1
+        )
+        WHERE precio_unitario IS NULL AND tipo_movimiento = 'venta'
+    """)
+    # El precio_anterior del primer cambio posterior al movimiento o, si no
+    # hubo cambios después, el precio actual
+    actual = _SQL_PRECIO_ACTUAL.format(col="movimientos_inventario.codigo_producto")
+    cursor.execute(f"""
+        UPDATE movimientos_inventario
+        SET precio_unitario = COALESCE(
+            (SELECT b.precio_anterior FROM bitacora_precios b
+             WHERE b.id_producto = (SELECT id_producto FROM productos
+                                    WHERE codigo = movimientos_inventario.codigo_producto
+                                    ORDER BY id_producto LIMIT 1)
+               AND b.fecha_cambio > movimientos_inventario.fecha_movimiento
+             ORDER BY b.fecha_cambio LIMIT 1),
+            {actual})
+        WHERE precio_unitario IS NULL
+    """)
+
+    # Triggers del resumen con el precio guardado, y resumen con precios históricos
+    for trigger in ("trg_ventas_diarias_insert", "trg_ventas_diarias_delete", "trg_ventas_diarias_update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    precio = "COALESCE({mov}.precio_unitario, " + _SQL_PRECIO_ACTUAL.format(col="{mov}.codigo_producto") + ")"
+    _triggers_ventas_diarias(cursor, precio)
+    _reconstruir_ventas_diarias(cursor, precio)
+
+def _cambios_estadisticas(cursor):
+    """
+    Contador que suben los triggers cuando cambia algo que las estadísticas
+    no pueden sumar como movimiento nuevo: ediciones y borrados de
+    movimientos, y productos agregados, borrados o con otro nombre, código
+    o precio. Los cambios de stock no cuentan. Lo lee
+    EstadisticasVentas.refrescar_cambios para decidir si recarga todo.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS estadisticas_cambios (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO estadisticas_cambios (id, version) VALUES (1, 0)")
+
+    sumar = "UPDATE estadisticas_cambios SET version = version + 1 WHERE id = 1;"
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estadisticas_movimientos_delete
+        AFTER DELETE ON movimientos_inventario
+        BEGIN
+            {sumar}
+        END
+    """)
+    # Los triggers de inserción completan fecha_epoch y precio_unitario con
+    # un UPDATE; eso no es una edición y no se cuenta
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estadisticas_movimientos_update
+        AFTER UPDATE ON movimientos_inventario
+        WHEN OLD.cantidad IS NOT NEW.cantidad
+          OR OLD.tipo_movimiento IS NOT NEW.tipo_movimiento
+          OR OLD.codigo_producto IS NOT NEW.codigo_producto
+          OR OLD.fecha_movimiento IS NOT NEW.fecha_movimiento
+          OR (OLD.precio_unitario IS NOT NULL AND OLD.precio_unitario IS NOT NEW.precio_unitario)
+        BEGIN
+            {sumar}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estadisticas_productos_insert
+        AFTER INSERT ON productos
+        BEGIN
+            {sumar}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estadisticas_productos_delete
+        AFTER DELETE ON productos
+        BEGIN
+            {sumar}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estadisticas_productos_update
+        AFTER UPDATE OF nombre, codigo, precio ON productos
+        WHEN OLD.nombre IS NOT NEW.nombre
+          OR OLD.codigo IS NOT NEW.codigo
+          OR OLD.precio IS NOT NEW.precio
+        BEGIN
+            {sumar}
+        END
+    """)
+
+# (versión, descripción, función). Las versiones nuevas se agregan al final.
+MIGRACIONES = [
+    (1, "Esquema base", _esquema_base),
+    (2, "Índices de acceso para ventas, lotes y login", _indices_de_acceso),
+    (3, "fecha_epoch indexada en movimientos_inventario", _fecha_epoch_movimientos),
+    (4, "Resumen diario ventas_diarias", _ventas_diarias),
+    (5, "Índice FTS5 de búsqueda de productos", _busqueda_productos),
+    (6, "Registro de cambios del catálogo de productos", _registro_cambios_catalogo),
+    (7, "Clave de login única empleado.usuario", _usuario_empleado),
+    (8, "Permisos por rol roles_permisos", _roles_permisos),
+    (9, "Precio unitario en movimientos_inventario y bitácora de precios", _precio_movimientos),
+    (10, "Contador de cambios para las estadísticas", _cambios_estadisticas),
+]
+
+# ----------------- Motor -----------------
+
+def crear_tabla_version(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            descripcion TEXT NOT NULL,
+            fecha_aplicacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+def version_actual(conn):
+    fila = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return fila[0] or 0
+
+def aplicar_migraciones(conn):
+    """Aplica las migraciones pendientes y devuelve la versión final del esquema."""
+    crear_tabla_version(conn)
+    for version, descripcion, funcion in MIGRACIONES:
+        if version <= version_actual(conn):
+            continue
+        # BEGIN IMMEDIATE toma el bloqueo de escritura antes de volver a leer la
+        # versión, así dos pantallas que arrancan a la vez no aplican lo mismo.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if version <= version_actual(conn):
+                conn.rollback()
+                continue
+            cursor = conn.cursor()
+            funcion(cursor)
+            cursor.execute(
+                "INSERT INTO schema_version (version, descripcion) VALUES (?, ?)",
+                (version, descripcion)
+            )
+            conn.commit()
+            logging.info(f"Migración {version} aplicada: {descripcion}")
+        except Exception:
+            conn.rollback()
+            logging.exception(f"Error aplicando la migración {version}: {descripcion}")
+            raise
+    return version_actual(conn)
+
+def main():
+    from conexion_db import obtener_db_path, crear_conexion
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db_path = sys.argv[1] if len(sys.argv) > 1 else obtener_db_path()
+    conn = crear_conexion(db_path)
+    try:
+        print(f"{db_path}: esquema en la versión {version_actual(conn)}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Miniaturas de las imágenes de productos.
+
+Las tablas de productos mostraban cada foto decodificando el archivo original
+y escalándolo en cada recarga. Aquí cada miniatura se genera una sola vez y
+se guarda en disco (carpeta miniaturas/, PNG) con un nombre que depende de la
+ruta, la fecha de modificación, el tamaño del archivo y el tamaño pedido: si
+la foto cambia, la miniatura se vuelve a generar. En memoria se guardan en
+QPixmapCache (LRU de Qt), así una recarga de la tabla no lee ningún archivo.
+
+La lectura y el escalado corren en el QThreadPool con QImage (QPixmap solo
+se puede usar en el hilo de la interfaz); la tabla recibe el QPixmap cuando
+está listo.
+"""
+import os
+import hashlib
+import logging
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QPixmap, QPixmapCache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CARPETA_MINIATURAS = os.path.join(BASE_DIR, "miniaturas")
+# Memoria para QPixmapCache, en KB
+CACHE_KB = 32 * 1024
+# Lado máximo, en px, de las miniaturas de cada tabla
+MINIATURA_PRODUCTOS = 120   # ver_productos.py
+MINIATURA_REPORTE = 40      # reporte_productos.py
+
+def resolver_ruta(ruta):
+    """
+    Ruta absoluta de una imagen guardada en productos.imagen. Las rutas
+    relativas son respecto de la carpeta del programa; las guardadas en
+    Windows pueden venir con '\\' como separador.
+    """
+    if not ruta:
+        return None
+    ruta = ruta.replace("\\", os.sep) if os.sep != "\\" else ruta
+    if not os.path.isabs(ruta):
+        ruta = os.path.join(BASE_DIR, ruta)
+    return ruta
+
+def clave_miniatura(ruta, tamanio):
+    """Clave de la miniatura de 'ruta' (absoluta), o None si el archivo no existe."""
+    try:
+        info = os.stat(ruta)
+    except OSError:
+        return None
+    datos = f"{ruta}|{info.st_mtime_ns}|{info.st_size}|{tamanio}"
+    return hashlib.sha1(datos.encode("utf-8")).hexdigest()
+
+def ruta_miniatura(clave):
+    return os.path.join(CARPETA_MINIATURAS, f"{clave}.png")
+
+def generar_miniatura(ruta, tamanio, clave=None):
+    """
+    Devuelve la miniatura (QImage) de 'ruta' de 'tamanio' px como máximo,
+    leyéndola de disco si ya existe o generándola y guardándola si no.
+    Se puede llamar desde cualquier hilo. QImage nula si la imagen no se pudo leer.
+    """
+    clave = clave or clave_miniatura(ruta, tamanio)
+    if clave is None:
+        return QImage()
+    destino = ruta_miniatura(clave)
+    if os.path.exists(destino):
+        imagen = QImage(destino)
+        if not imagen.isNull():
+            return imagen
+
+    lector = QImageReader(ruta)
+    lector.setAutoTransform(True)
+    original = lector.size()
+    if original.isValid():
+        # El decodificador de JPEG reduce mientras lee: mucho menos trabajo
+        # que decodificar la foto completa y escalarla después.
+        lector.setScaledSize(original.scaled(QSize(tamanio, tamanio), Qt.KeepAspectRatio))
+    imagen = lector.read()
+    if imagen.isNull():
+        logging.warning(f"No se pudo leer la imagen {ruta}: {lector.errorString()}")
+        return imagen
+    if imagen.width() > tamanio or imagen.height() > tamanio:
+        imagen = imagen.scaled(tamanio, tamanio, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    try:
+        os.makedirs(CARPETA_MINIATURAS, exist_ok=True)
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        if imagen.save(temporal, "PNG"):
+            os.replace(temporal, destino)
+    except OSError as e:
+        logging.warning(f"No se pudo guardar la miniatura de {ruta}: {e}")
+    return imagen
+
+class _TareaMiniatura(QRunnable):
+    def __init__(self, ruta, tamanio, clave, senal):
+        super().__init__()
+        self.ruta = ruta
+        self.tamanio = tamanio
+        self.clave = clave
+        self.senal = senal
+
+    def run(self):
+        try:
+            imagen = generar_miniatura(self.ruta, self.tamanio, self.clave)
+        except Exception as e:
+            logging.error(f"Error generando miniatura de {self.ruta}: {e}")
+            imagen = QImage()
+        self.senal.emit(self.clave, imagen)
+
+class CargadorMiniaturas(QObject):
+    """Pide miniaturas en segundo plano y avisa en el hilo de la interfaz."""
+    _lista = pyqtSignal(str, QImage)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), CACHE_KB))
+        # clave -> funciones que esperan esa miniatura
+        self._pendientes = {}
+        self._lista.connect(self._al_estar_lista)
+
+    def pedir(self, ruta, tamanio, al_estar_lista):
+        """
+        Devuelve el QPixmap si ya está en memoria. Si no, devuelve None y
+        llama a al_estar_lista(pixmap) cuando esté listo (pixmap nulo si la
+        imagen no se pudo leer). Si el archivo no existe devuelve un QPixmap nulo.
+        """
+        ruta = resolver_ruta(ruta)
+        clave = clave_miniatura(ruta, tamanio) if ruta else None
+        if clave is None:
+            return QPixmap()
+        pixmap = QPixmapCache.find(clave)
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+        if clave in self._pendientes:
+            self._pendientes[clave].append(al_estar_lista)
+        else:
+            self._pendientes[clave] = [al_estar_lista]
+            QThreadPool.globalInstance().start(_TareaMiniatura(ruta, tamanio, clave, self._lista))
+        return None
+
+    def _al_estar_lista(self, clave, imagen):
+        pixmap = QPixmap.fromImage(imagen)
+        if not pixmap.isNull():
+            QPixmapCache.insert(clave, pixmap)
+        for funcion in self._pendientes.pop(clave, []):
+            try:
+                funcion(pixmap)
+            except RuntimeError:
+                # La celda ya no existe (la tabla se recargó mientras tanto)
+                pass
+
+_cargador = None
+
+def cargador_miniaturas():
+    """Cargador compartido del proceso (se crea con la primera pantalla que lo usa)."""
+    global _cargador
+    if _cargador is None:
+        _cargador = CargadorMiniaturas()
+    return _cargador
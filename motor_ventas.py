@@ -0,0 +1,143 @@
+"""
+Registro de ventas en una sola transacción.
+
+Una venta escribe la cabecera en 'ventas', una línea por producto en
+'detalles_venta' y el movimiento correspondiente en 'movimientos_inventario',
+descontando el stock de cada producto. Si algún producto no tiene stock
+suficiente no se escribe nada.
+"""
+import logging
+from datetime import datetime
+from periodos import a_epoch
+
+OBSERVACION_VENTA = "Venta realizada desde el sistema"
+
+class StockInsuficienteError(Exception):
+    """La venta no se registró porque faltaba stock en uno o más productos."""
+
+    def __init__(self, faltantes):
+        # faltantes: lista de (id_producto, nombre, cantidad_pedida, stock_disponible)
+        self.faltantes = faltantes
+        detalle = ", ".join(
+            f"{nombre} (pedido {pedido}, disponible {disponible})"
+            for _, nombre, pedido, disponible in faltantes
+        )
+        super().__init__(f"Stock insuficiente: {detalle}")
+
+def obtener_empleado(conn, id_empleado=None):
+    """
+    Devuelve (id_empleado, nombre) del vendedor. Si no se indicó ninguno
+    (pantalla abierta sin pasar por el login) usa el primer administrador.
+    """
+    cursor = conn.cursor()
+    if id_empleado is not None:
+        cursor.execute("SELECT id_empleado, nombre FROM empleado WHERE id_empleado = ?", (id_empleado,))
+        fila = cursor.fetchone()
+        if fila:
+            return fila
+    cursor.execute("""
+        SELECT id_empleado, nombre FROM empleado
+        WHERE rol = 'administrador'
+        ORDER BY id_empleado LIMIT 1
+    """)
+    return cursor.fetchone() or (None, "admin")
+
+def _agrupar_items(items):
+    """Suma las cantidades de un mismo producto que aparezca varias veces en el carrito."""
+    agrupados = {}
+    for item in items:
+        id_producto = int(item["id"])
+        if id_producto in agrupados:
+            agrupados[id_producto]["cantidad"] += int(item["cantidad"])
+        else:
+            agrupados[id_producto] = {
+                "id": id_producto,
+                "codigo": item["codigo"],
+                "nombre": item.get("nombre", item["codigo"]),
+                "cantidad": int(item["cantidad"]),
+            }
+    return list(agrupados.values())
+
+def _buscar_faltantes(cursor, items):
+    marcadores = ",".join("?" * len(items))
+    cursor.execute(
+        f"SELECT id_producto, stock FROM productos WHERE id_producto IN ({marcadores})",
+        [item["id"] for item in items]
+    )
+    stock = dict(cursor.fetchall())
+    return [
+        (item["id"], item["nombre"], item["cantidad"], stock.get(item["id"], 0))
+        for item in items
+        if stock.get(item["id"], 0) < item["cantidad"]
+    ]
+
+def registrar_venta(conn, items, id_empleado, usuario="admin",
+                    observaciones=OBSERVACION_VENTA, id_cliente=None, fecha=None):
+    """
+    Registra la venta de 'items' (diccionarios con id, codigo, cantidad y
+    opcionalmente nombre, como los del carrito) y devuelve (id_venta, total).
+
+    El precio de cada línea se toma de la tabla productos dentro de la misma
+    transacción. Lanza StockInsuficienteError si algún producto no alcanza;
+    en ese caso, y ante cualquier otro error, se deshace toda la venta.
+    """
+    items = _agrupar_items(items)
+    if not items:
+        raise ValueError("La venta no tiene productos")
+
+    fecha = fecha or datetime.now()
+    fecha_texto = fecha.strftime("%Y-%m-%d %H:%M:%S")
+    fecha_epoch = a_epoch(fecha)
+
+    cursor = conn.cursor()
+    # Bloqueo de escritura desde el inicio: otra caja no puede vender el mismo
+    # stock entre la comprobación y el descuento.
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.executemany(
+            "UPDATE productos SET stock = stock - ? WHERE id_producto = ? AND stock >= ?",
+            [(item["cantidad"], item["id"], item["cantidad"]) for item in items]
+        )
+        if cursor.rowcount != len(items):
+            conn.rollback()
+            raise StockInsuficienteError(_buscar_faltantes(cursor, items))
+
+        marcadores = ",".join("?" * len(items))
+        cursor.execute(
+            f"SELECT id_producto, precio FROM productos WHERE id_producto IN ({marcadores})",
+            [item["id"] for item in items]
+        )
+        precios = dict(cursor.fetchall())
+        lineas = []
+        for item in items:
+            precio = precios[item["id"]]
+            lineas.append((item, precio, round(precio * item["cantidad"], 2)))
+        total = round(sum(subtotal for _, _, subtotal in lineas), 2)
+
+        cursor.execute(
+            "INSERT INTO ventas (id_cliente, id_empleado, fecha_venta, total_venta) VALUES (?, ?, ?, ?)",
+            (id_cliente, id_empleado, fecha_texto, total)
+        )
+        id_venta = cursor.lastrowid
+
+        cursor.executemany(
+            """INSERT INTO detalles_venta (id_venta, id_producto, cantidad, precio_unitario, subtotal)
+               VALUES (?, ?, ?, ?, ?)""",
+            [(id_venta, item["id"], item["cantidad"], precio, subtotal) for item, precio, subtotal in lineas]
+        )
+        cursor.executemany(
+            """INSERT INTO movimientos_inventario
+                   (codigo_producto, tipo_movimiento, cantidad, fecha_movimiento, fecha_epoch,
+                    observaciones, usuario, precio_unitario)
+               VALUES (?, 'venta', ?, ?, ?, ?, ?, ?)""",
+            [(item["codigo"], item["cantidad"], fecha_texto, fecha_epoch, observaciones, usuario, precio)
+             for item, precio, _ in lineas]
+        )
+        conn.commit()
+        return id_venta, total
+    except StockInsuficienteError:
+        raise
+    except Exception:
+        conn.rollback()
+        logging.exception("Error registrando la venta; se deshizo la transacción")
+        raise
@@ -0,0 +1,73 @@
+"""
+Navegación entre pantallas.
+
+Con aplicacion.py todas las pantallas viven en un solo proceso y cambiar de
+pantalla es cambiar de página. Cada script se puede seguir ejecutando solo
+(python ventas.py); en ese caso abrir otra pantalla se pide a lanzador.py,
+que tiene un intérprete ya preparado, o si no está corriendo se lanza un
+proceso nuevo, como antes.
+"""
+import os
+import sys
+import subprocess
+import logging
+from PyQt5.QtWidgets import QMessageBox
+import lanzador
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Aplicacion (aplicacion.py) en ejecución, si la hay
+_aplicacion = None
+
+def registrar_aplicacion(aplicacion):
+    global _aplicacion
+    _aplicacion = aplicacion
+
+def en_aplicacion():
+    """True si las pantallas corren dentro de aplicacion.py."""
+    return _aplicacion is not None
+
+def id_empleado_sesion():
+    """id del empleado que inició sesión en aplicacion.py, o None."""
+    return _aplicacion.id_empleado if _aplicacion is not None else None
+
+def abrir_en_aplicacion(script, argumentos=None):
+    """
+    Muestra 'script' como página de aplicacion.py. Devuelve False si no hay
+    aplicación en ejecución o si 'script' no es una de sus pantallas.
+    """
+    if _aplicacion is None:
+        return False
+    return _aplicacion.mostrar(os.path.basename(script), argumentos)
+
+def abrir_con_lanzador(script, argumentos=None):
+    """Pide 'script' a lanzador.py. False si el lanzador no está corriendo."""
+    ruta = script if os.path.isabs(script) else os.path.join(BASE_DIR, script)
+    if os.path.dirname(os.path.abspath(ruta)) != BASE_DIR:
+        return False
+    return lanzador.pedir(script, argumentos)
+
+def abrir_pantalla(script, argumentos=None):
+    """
+    Abre la pantalla 'script' (por ejemplo "menu.py") con 'argumentos' como
+    los recibiría en sys.argv. Devuelve True si se abrió.
+    """
+    if abrir_en_aplicacion(script, argumentos) or abrir_con_lanzador(script, argumentos):
+        return True
+    ruta = script if os.path.isabs(script) else os.path.join(BASE_DIR, script)
+    if not os.path.exists(ruta):
+        QMessageBox.critical(None, "Error", f"No se encontró el archivo: {ruta}")
+        return False
+    try:
+        subprocess.Popen([sys.executable, ruta] + [str(a) for a in argumentos or []])
+    except Exception as e:
+        logging.error(f"No se pudo abrir {script}: {e}")
+        QMessageBox.critical(None, "Error", f"No se pudo abrir {os.path.basename(script)}: {e}")
+        return False
+    return True
+
+def iniciar_sesion(id_empleado, script):
+    """Abre 'script' (menu.py o ventas.py) para el empleado que inició sesión."""
+    if _aplicacion is not None:
+        return _aplicacion.iniciar_sesion(id_empleado, script)
+    return abrir_pantalla(script, [id_empleado])
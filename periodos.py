@@ -0,0 +1,86 @@
+"""
+Rangos de fechas para filtrar movimientos_inventario por la columna fecha_epoch.
+
+fecha_movimiento se guarda como texto con la hora local ("YYYY-mm-dd HH:MM:SS")
+y fecha_epoch son los segundos de ese mismo reloj local, calculados con
+strftime('%s', fecha_movimiento). Por eso aquí los límites se calculan con
+calendar.timegm sobre la fecha local, sin aplicar zona horaria.
+
+Todos los rangos son semiabiertos [inicio, fin): se filtran con
+    fecha_epoch >= ? AND fecha_epoch < ?
+para que SQLite pueda recorrer el índice en lugar de toda la tabla.
+"""
+import calendar
+from datetime import date, datetime, timedelta
+
+FILTRO_RANGO = "fecha_epoch >= ? AND fecha_epoch < ?"
+
+def a_epoch(valor):
+    """Convierte un date o datetime (hora local) a segundos de fecha_epoch."""
+    if isinstance(valor, datetime):
+        return calendar.timegm(valor.timetuple())
+    return calendar.timegm(valor.timetuple()[:3] + (0, 0, 0))
+
+def desde_epoch(segundos):
+    """Inverso de a_epoch: devuelve el datetime local correspondiente."""
+    return datetime(1970, 1, 1) + timedelta(seconds=segundos)
+
+def rango_dias(inicio, fin):
+    """Desde el día 'inicio' hasta el día 'fin', ambos incluidos."""
+    return a_epoch(inicio), a_epoch(fin + timedelta(days=1))
+
+def rango_dia(dia):
+    return rango_dias(dia, dia)
+
+def rango_mes(anio, mes):
+    inicio = date(anio, mes, 1)
+    siguiente = date(anio + 1, 1, 1) if mes == 12 else date(anio, mes + 1, 1)
+    return a_epoch(inicio), a_epoch(siguiente)
+
+def rango_anio(anio):
+    return a_epoch(date(anio, 1, 1)), a_epoch(date(anio + 1, 1, 1))
+
+def rango_periodo(periodo, hoy=None):
+    """Rango de los botones de período del libro diario ('dia', 'semana', 'mes', ...)."""
+    hoy = hoy or datetime.now().date()
+    if periodo == 'dia':
+        return rango_dia(hoy)
+    if periodo == 'semana':
+        inicio = hoy - timedelta(days=hoy.weekday())
+        return rango_dias(inicio, inicio + timedelta(days=6))
+    if periodo == 'mes':
+        return rango_mes(hoy.year, hoy.month)
+    if periodo == 'anio':
+        return rango_anio(hoy.year)
+    if periodo == 'semana_pasada':
+        inicio = hoy - timedelta(days=hoy.weekday() + 7)
+        return rango_dias(inicio, inicio + timedelta(days=6))
+    if periodo == 'mes_pasado':
+        ultimo_dia_mes_pasado = hoy.replace(day=1) - timedelta(days=1)
+        return rango_mes(ultimo_dia_mes_pasado.year, ultimo_dia_mes_pasado.month)
+    if periodo == 'anio_pasado':
+        return rango_anio(hoy.year - 1)
+    return None
+
+def rango_desde_texto(texto):
+    """
+    Interpreta 'YYYY-MM-DD', 'YYYY-MM', 'YYYY' o 'YYYY-MM-DD a YYYY-MM-DD'.
+    Devuelve None si el texto no es una fecha; lanza ValueError si lo parece
+    pero no es válida (por ejemplo, '2025-13').
+    """
+    texto = texto.strip().lower()
+    if ' a ' in texto:
+        partes = texto.split(' a ')
+        if len(partes) != 2:
+            return None
+        inicio = datetime.strptime(partes[0].strip(), "%Y-%m-%d").date()
+        fin = datetime.strptime(partes[1].strip(), "%Y-%m-%d").date()
+        return rango_dias(inicio, fin)
+    if len(texto) == 10 and texto.count('-') == 2:
+        return rango_dia(datetime.strptime(texto, "%Y-%m-%d").date())
+    if len(texto) == 7 and texto.count('-') == 1:
+        fecha = datetime.strptime(texto, "%Y-%m")
+        return rango_mes(fecha.year, fecha.month)
+    if len(texto) == 4 and texto.isdigit():
+        return rango_anio(int(texto))
+    return None
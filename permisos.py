@@ -0,0 +1,99 @@
+"""
+Permisos por rol.
+
+Cada rol de empleado tiene un conjunto de permisos (tabla roles_permisos,
+que relaciona empleado.rol con la tabla permisos). Los permisos del
+empleado se resuelven una vez por sesión y quedan en memoria, así que
+consultar un permiso es buscar en un frozenset, sin ir a la base de datos
+ni interpretar el texto del rol.
+
+    if tiene_permiso(id_empleado, GESTIONAR_EMPLEADOS):
+        ...
+
+Cuando cambia el rol de un empleado hay que llamar a invalidar_permisos
+(lo hace Modificar_empleado.py). La caché es del proceso: con aplicacion.py
+es toda la sesión.
+"""
+import threading
+from conexion_db import obtener_conexion
+
+MENU_ADMINISTRACION = "menu_administracion"
+VENTAS = "ventas"
+GESTIONAR_PRODUCTOS = "gestionar_productos"
+GESTIONAR_EMPLEADOS = "gestionar_empleados"
+VER_REPORTES = "ver_reportes"
+
+# La migración 8 carga estos permisos en la tabla permisos y los asigna:
+# todos al administrador, VENTAS al empleado. Un permiso nuevo necesita
+# una migración que lo inserte.
+
+# Permiso necesario para abrir cada pantalla; las que no están no piden ninguno
+PERMISO_PANTALLA = {
+    "menu.py": MENU_ADMINISTRACION,
+    "ventas.py": VENTAS,
+    "ventas_admin.py": VENTAS,
+    "ver_productos.py": GESTIONAR_PRODUCTOS,
+    "insertar_producto.py": GESTIONAR_PRODUCTOS,
+    "Modificar_producto.py": GESTIONAR_PRODUCTOS,
+    "productos_eliminados.py": GESTIONAR_PRODUCTOS,
+    "ver_lotes.py": GESTIONAR_PRODUCTOS,
+    "insertar_lotes.py": GESTIONAR_PRODUCTOS,
+    "ver_proveedor.py": GESTIONAR_PRODUCTOS,
+    "insertar_proveedor.py": GESTIONAR_PRODUCTOS,
+    "buscar_empleado.py": GESTIONAR_EMPLEADOS,
+    "insertar_empleado.py": GESTIONAR_EMPLEADOS,
+    "Modificar_empleado.py": GESTIONAR_EMPLEADOS,
+    "emp_eliminados.py": GESTIONAR_EMPLEADOS,
+    "reporte_emp.py": GESTIONAR_EMPLEADOS,
+    "estadistica.py": VER_REPORTES,
+    "reporte_productos.py": VER_REPORTES,
+    "historial_prod.py": VER_REPORTES,
+    "venta_registro.py": VER_REPORTES,
+}
+
+# id_empleado -> frozenset de nombres de permiso
+_cache = {}
+_lock = threading.Lock()
+
+def resolver_permisos(conn, id_empleado):
+    """Permisos del empleado según su rol, leídos de la base de datos."""
+    filas = conn.execute("""
+        SELECT p.nombre_permiso
+        FROM empleado e
+        JOIN roles_permisos rp ON rp.rol = lower(trim(e.rol))
+        JOIN permisos p ON p.id_permiso = rp.id_permiso
+        WHERE e.id_empleado = ?
+    """, (id_empleado,)).fetchall()
+    return frozenset(nombre for (nombre,) in filas)
+
+def registrar_permisos(id_empleado, permisos):
+    """Guarda permisos ya resueltos (login.py los resuelve en segundo plano)."""
+    with _lock:
+        _cache[id_empleado] = frozenset(permisos)
+
+def permisos_empleado(id_empleado, conn=None):
+    """Permisos del empleado; se resuelven la primera vez y quedan en caché."""
+    with _lock:
+        permisos = _cache.get(id_empleado)
+    if permisos is None:
+        if conn is None:
+            conn = obtener_conexion()
+        permisos = resolver_permisos(conn, id_empleado)
+        registrar_permisos(id_empleado, permisos)
+    return permisos
+
+def tiene_permiso(id_empleado, permiso):
+    return permiso in permisos_empleado(id_empleado)
+
+def puede_abrir(id_empleado, script):
+    """True si el empleado puede abrir la pantalla 'script'."""
+    permiso = PERMISO_PANTALLA.get(script)
+    return permiso is None or tiene_permiso(id_empleado, permiso)
+
+def invalidar_permisos(id_empleado=None):
+    """Olvida los permisos de un empleado (o de todos, sin argumento)."""
+    with _lock:
+        if id_empleado is None:
+            _cache.clear()
+        else:
+            _cache.pop(id_empleado, None)
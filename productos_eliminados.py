@@ -1,6 +1,7 @@
 import subprocess
 import sys
-import sqlite3
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla, abrir_en_aplicacion, abrir_con_lanzador
 import os
 import shutil
 from PyQt5.QtWidgets import (
@@ -9,20 +10,6 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from datetime import datetime
 
-def obtener_db_path():
-    if getattr(sys, 'frozen', False):
-        # Carpeta donde está el ejecutable
-        exe_dir = os.path.dirname(sys.executable)
-        db_path = os.path.join(exe_dir, "pruebas.db")  # Cambiado a pruebas.db
-        if os.path.exists(db_path):
-            return db_path
-        # Si no está, busca en la carpeta temporal de PyInstaller
-        base_path = sys._MEIPASS
-        return os.path.join(base_path, "pruebas.db")
-    else:
-        # En desarrollo, busca en la carpeta original
-        return os.path.abspath(os.path.join(os.path.dirname(__file__), "pruebas.db"))  # Cambiado a pruebas.db
-
 db_path = obtener_db_path()
 print("Conexión exitosa a la base de datos:", db_path)
 print("¿Existe?", os.path.exists(db_path))
@@ -81,7 +68,7 @@ class ProductosEliminadosWindow(QMainWindow):
     def cargar_productos(self, filtro=""):
         self.tabla.setRowCount(0)
         try:
-            conn = sqlite3.connect(db_path)
+            conn = obtener_conexion()
             cursor = conn.cursor()
             if filtro:
                 cursor.execute("""
@@ -97,7 +84,6 @@ class ProductosEliminadosWindow(QMainWindow):
                     ORDER BY id_producto DESC
                 """)
             productos = cursor.fetchall()
-            conn.close()
 
             for row_num, row_data in enumerate(productos):
                 self.tabla.insertRow(row_num)
@@ -142,8 +128,8 @@ class ProductosEliminadosWindow(QMainWindow):
         self.cargar_productos(filtro=texto)
 
     def restaurar_producto(self, producto_id):
+        conn = obtener_conexion()
         try:
-            conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
             # Recuperar datos del producto eliminado
             cursor.execute("""
@@ -164,7 +150,6 @@ class ProductosEliminadosWindow(QMainWindow):
                     )
                     if not ok or not nuevo_codigo.strip():
                         QMessageBox.information(self, "Cancelado", "Restauración cancelada.")
-                        conn.close()
                         return
 
                     # Verificar si ya existe un producto con el nuevo código
@@ -191,9 +176,9 @@ class ProductosEliminadosWindow(QMainWindow):
                         break
             else:
                 QMessageBox.warning(self, "No encontrado", "No se encontró el producto para restaurar.")
-            conn.close()
             self.cargar_productos()
         except Exception as e:
+            conn.rollback()
             QMessageBox.critical(self, "Error", f"No se pudo restaurar el producto: {e}")
 
     def eliminar_producto(self, producto_id):
@@ -205,24 +190,20 @@ class ProductosEliminadosWindow(QMainWindow):
             QMessageBox.No
         )
         if reply == QMessageBox.Yes:
+            conn = obtener_conexion()
             try:
-                conn = sqlite3.connect(db_path)
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM productos_borrados WHERE id_producto = ?", (producto_id,))
                 conn.commit()
                 QMessageBox.information(self, "Eliminado", "Producto eliminado permanentemente de eliminados.")
                 self.cargar_productos()
-                conn.close()
             except Exception as e:
+                conn.rollback()
                 QMessageBox.critical(self, "Error", f"Error al eliminar producto: {e}")
 
     def volver_atras(self):
-        import subprocess
-        import sys
-        import os
-        ruta = os.path.join(os.path.dirname(__file__), "ver_productos.py")
-        subprocess.Popen([sys.executable, ruta])
-        self.close()
+        if abrir_pantalla("ver_productos.py"):
+            self.close()
 
     def volver_a_lista(self):
         """Cierra la ventana y vuelve a la lista de productos"""
@@ -231,21 +212,16 @@ class ProductosEliminadosWindow(QMainWindow):
 
     def ir_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
 
 def abrir_aplicacion(nombre_py):
     """
     Abre el archivo .exe si existe, si no, ejecuta el .py en un nuevo proceso.
     Busca primero en la carpeta temporal (_MEIPASS), luego en la carpeta del ejecutable.
     """
+    if abrir_en_aplicacion(nombre_py) or abrir_con_lanzador(nombre_py):
+        return
     rutas = []
     # Carpeta temporal de PyInstaller
     if hasattr(sys, '_MEIPASS'):
@@ -1,10 +1,9 @@
 import sys
-import os
-import subprocess
-import sqlite3
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
-    QPushButton, QLineEdit, QLabel, QTabWidget, QHeaderView, QMessageBox
+    QPushButton, QLineEdit, QLabel, QTabWidget, QHeaderView
 )
 from PyQt5.QtCore import Qt
 from datetime import datetime
@@ -14,7 +13,7 @@ class ReporteEmpleados(QWidget):
         super().__init__()
         self.setWindowTitle("Reporte de Empleados")
         self.resize(800, 500)
-        self.db_path = "pruebas.db"
+        self.db_path = obtener_db_path()
 
         main_layout = QVBoxLayout()
         self.setLayout(main_layout)
@@ -91,7 +90,7 @@ class ReporteEmpleados(QWidget):
 
     def cargar_empleados_activos(self, filtro=""):
         self.tabla_activos.setRowCount(0)
-        conn = sqlite3.connect(self.db_path)
+        conn = obtener_conexion(self.db_path)
         cursor = conn.cursor()
         if filtro:
             cursor.execute("""
@@ -107,7 +106,6 @@ class ReporteEmpleados(QWidget):
                 ORDER BY fecha_creacion DESC
             """)
         empleados = cursor.fetchall()
-        conn.close()
         for row_num, (ci, nombre, celular, rol, fecha) in enumerate(empleados):
             self.tabla_activos.insertRow(row_num)
             self.tabla_activos.setItem(row_num, 0, QTableWidgetItem(str(ci)))
@@ -121,7 +119,7 @@ class ReporteEmpleados(QWidget):
 
     def cargar_empleados_eliminados(self, filtro=""):
         self.tabla_eliminados.setRowCount(0)
-        conn = sqlite3.connect(self.db_path)
+        conn = obtener_conexion(self.db_path)
         cursor = conn.cursor()
         if filtro:
             cursor.execute("""
@@ -137,7 +135,6 @@ class ReporteEmpleados(QWidget):
                 ORDER BY fecha_borrado DESC
             """)
         empleados = cursor.fetchall()
-        conn.close()
         for row_num, (ci, nombre, celular, rol, fecha) in enumerate(empleados):
             self.tabla_eliminados.insertRow(row_num)
             self.tabla_eliminados.setItem(row_num, 0, QTableWidgetItem(str(ci)))
@@ -159,24 +156,13 @@ class ReporteEmpleados(QWidget):
             return str(fecha)
 
     def regresar_a_buscar_empleado(self):
-        script_path = os.path.join(os.path.dirname(__file__), "buscar_empleado.py")
-        if not os.path.exists(script_path):
-            QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-            return
-        self.close()
-        subprocess.Popen([sys.executable, script_path])
+        if abrir_pantalla("buscar_empleado.py"):
+            self.close()
 
     def ir_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,348 @@
+"""
+Reportes de estadísticas sin interfaz.
+
+Arma directamente desde la base de datos lo mismo que el tablero de
+estadistica.py: el libro Excel, el reporte HTML o PDF y los gráficos en
+PNG, para cualquier rango de fechas y tipo de movimiento. Con varios
+períodos cada uno se genera en su propio proceso, así que el paquete de
+fin de mes (o de todo el año) puede correr de noche como tarea programada:
+
+    python reporte_estadisticas.py --desde 2025-03-01 --hasta 2025-03-31
+    python reporte_estadisticas.py --meses 2025 --salida reportes/2025
+    python reporte_estadisticas.py --meses 2025 --tipo todos --formatos excel pdf --procesos 4
+
+Cada período queda en su propia carpeta dentro de --salida (por ejemplo
+reportes/2025/2025-03). La base de datos es la de FARMACIA_DB_PATH, o --db.
+EstadisticasVentas usa escribir_excel y reporte_html para exportar e imprimir.
+"""
+import os
+import sys
+import logging
+import argparse
+import tempfile
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from importacion_diferida import importar_diferido
+from periodos import rango_dias
+from consultas_estadisticas import leer_agregados, leer_movimientos
+
+pd = importar_diferido("pandas")
+fpdf = importar_diferido("fpdf")
+
+FORMATOS = ("excel", "html", "pdf", "png")
+# Tipo de movimiento -> nombre que se muestra (el del combo del tablero)
+NOMBRES_TIPO = {'venta': 'Ventas', 'compra': 'Compras', None: 'Todos los movimientos'}
+# Vistas de graficos_estadisticas.py que se guardan, en orden
+GRAFICOS = ('ventas_tiempo', 'top_productos', 'menos_populares', 'tendencias')
+
+@dataclass(frozen=True)
+class Periodo:
+    """Días de 'inicio' a 'fin', ambos incluidos; 'nombre' es el de su carpeta."""
+    nombre: str
+    inicio: date
+    fin: date
+
+    @property
+    def rango(self):
+        return rango_dias(self.inicio, self.fin)
+
+def periodos_del_anio(anio):
+    """Un Periodo por mes de 'anio'."""
+    periodos = []
+    for mes in range(1, 13):
+        siguiente = date(anio + 1, 1, 1) if mes == 12 else date(anio, mes + 1, 1)
+        periodos.append(Periodo(f"{anio}-{mes:02d}", date(anio, mes, 1), siguiente - timedelta(days=1)))
+    return periodos
+
+def escribir_excel(path, detalle, agregados, inicio, fin):
+    """Libro con el detalle de movimientos, el resumen y los productos más vendidos"""
+    df_export = detalle.copy()
+
+    # Formatear fechas de forma segura
+    if 'fecha_movimiento' in df_export.columns:
+        try:
+            df_export['fecha_movimiento'] = df_export['fecha_movimiento'].dt.strftime('%d/%m/%Y %H:%M')
+        except Exception:
+            # Si falla el formateo, mantener como está
+            pass
+
+    # Crear resumen estadístico
+    df_resumen = pd.DataFrame({
+        'Métrica': [
+            'Total de Movimientos',
+            'Total Productos Vendidos',
+            'Período de Análisis (Inicio)',
+            'Período de Análisis (Fin)',
+            'Fecha de Exportación'
+        ],
+        'Valor': [
+            len(df_export),
+            df_export['cantidad'].sum() if 'cantidad' in df_export.columns else 0,
+            inicio.strftime('%d/%m/%Y'),
+            fin.strftime('%d/%m/%Y'),
+            datetime.now().strftime('%d/%m/%Y %H:%M')
+        ]
+    })
+
+    # Top productos (con manejo de errores)
+    try:
+        top_productos = pd.DataFrame({
+            'cantidad': agregados.mas_vendidos,
+            'valor_total': agregados.valor_mas_vendidos,
+        }).head(20).round(2)
+        top_productos.index.name = 'nombre'
+    except Exception as e:
+        logging.error(f"Error creando top productos: {e}")
+        top_productos = pd.DataFrame({'cantidad': [], 'valor_total': []})
+
+    # Exportar con múltiples hojas
+    try:
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            df_export.to_excel(writer, sheet_name='Datos Detallados', index=False)
+            df_resumen.to_excel(writer, sheet_name='Resumen', index=False)
+
+            if not top_productos.empty:
+                top_productos.to_excel(writer, sheet_name='Top Productos')
+
+            # Formatear hojas de forma segura
+            try:
+                for sheet_name in writer.sheets:
+                    worksheet = writer.sheets[sheet_name]
+                    for column_cells in worksheet.columns:
+                        try:
+                            length = max(len(str(cell.value or "")) for cell in column_cells)
+                            worksheet.column_dimensions[column_cells[0].column_letter].width = min(length + 2, 50)
+                        except Exception:
+                            pass  # Si falla el ajuste de ancho, continúa
+            except Exception as e:
+                logging.warning(f"Error formateando Excel: {e}")
+    except Exception as e:
+        raise Exception(f"Error escribiendo archivo Excel: {e}")
+    return path
+
+def reporte_html(agregados, inicio, fin, tipo_texto, imagenes=()):
+    """Contenido HTML del reporte; 'imagenes' son rutas de gráficos a incluir"""
+    try:
+        # Calcular estadísticas de forma segura
+        total_movimientos = agregados.total_movimientos
+        valor_promedio = agregados.valor_promedio
+        total_productos = agregados.total_cantidad
+        periodo_inicio = inicio.strftime('%d/%m/%Y')
+        periodo_fin = fin.strftime('%d/%m/%Y')
+
+        # Top 5 productos con manejo de errores
+        top_5_html = ""
+        try:
+            for i, (producto, cantidad) in enumerate(agregados.top_productos(5).items(), 1):
+                top_5_html += f"<tr><td>{i}</td><td>{producto}</td><td>{cantidad:.0f}</td></tr>"
+        except Exception as e:
+            logging.error(f"Error generando top 5 para reporte: {e}")
+            top_5_html = "<tr><td colspan='3'>Error generando datos</td></tr>"
+
+        graficos_html = "".join(
+            f'<p><img src="{os.path.basename(imagen)}" width="100%"></p>' for imagen in imagenes)
+        if graficos_html:
+            graficos_html = f"<h2>Gráficos</h2>{graficos_html}"
+
+        html = f"""
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <style>
+                body {{ font-family: Arial, sans-serif; margin: 20px; }}
+                h1 {{ color: #2c3e50; text-align: center; }}
+                h2 {{ color: #34495e; border-bottom: 2px solid #3498db; }}
+                table {{ width: 100%; border-collapse: collapse; margin: 10px 0; }}
+                th, td {{ border: 1px solid #bdc3c7; padding: 8px; text-align: left; }}
+                th {{ background-color: #ecf0f1; font-weight: bold; }}
+                .stat-box {{ background-color: #f8f9fa; padding: 10px; margin: 5px 0; border-left: 4px solid #3498db; }}
+            </style>
+        </head>
+        <body>
+            <h1>📊 Reporte de Estadísticas de Ventas</h1>
+
+            <div class="stat-box">
+                <strong>Período de Análisis:</strong> {periodo_inicio} - {periodo_fin}<br>
+                <strong>Fecha de Reporte:</strong> {datetime.now().strftime('%d/%m/%Y %H:%M')}<br>
+                <strong>Tipo de Análisis:</strong> {tipo_texto}
+            </div>
+
+            <h2>Resumen General</h2>
+            <table>
+                <tr><th>Métrica</th><th>Valor</th></tr>
+                <tr><td>Total de Movimientos</td><td>{total_movimientos:,}</td></tr>
+                <tr><td>Total Productos Vendidos</td><td>{total_productos:,.0f}</td></tr>
+                <tr><td>Valor total de ventas</td><td>{agregados.total_valor:,.2f} Bs.</td></tr>
+                <tr><td>Valor promedio por venta</td><td>{valor_promedio:,.2f} Bs.</td></tr>
+            </table>
+
+            <h2>Top 5 Productos Más Vendidos</h2>
+            <table>
+                <tr><th>Posición</th><th>Producto</th><th>Cantidad</th></tr>
+                {top_5_html}
+            </table>
+            {graficos_html}
+        </body>
+        </html>
+        """
+
+        return html
+
+    except Exception as e:
+        logging.error(f"Error generando reporte HTML: {e}")
+        return "<html><body><h1>Error generando reporte</h1></body></html>"
+
+def _texto_pdf(texto):
+    # Las fuentes básicas de FPDF son latin-1
+    return str(texto).encode('latin-1', 'replace').decode('latin-1')
+
+def escribir_pdf(path, agregados, inicio, fin, tipo_texto):
+    """Reporte en PDF: resumen, top 10 productos y los gráficos del tablero"""
+    from graficos_estadisticas import guardar_grafico
+
+    pdf = fpdf.FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, txt=_texto_pdf("Reporte de Estadísticas de Ventas"), ln=True, align='C')
+    pdf.set_font("Arial", size=10)
+    pdf.cell(0, 6, txt=_texto_pdf(
+        f"Período: {inicio.strftime('%d/%m/%Y')} - {fin.strftime('%d/%m/%Y')}   "
+        f"Tipo: {tipo_texto}   Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')}"), ln=True)
+    pdf.ln(4)
+
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, txt="Resumen General", ln=True)
+    pdf.set_font("Arial", size=10)
+    for metrica, valor in (
+        ("Total de Movimientos", f"{agregados.total_movimientos:,}"),
+        ("Total Productos Vendidos", f"{agregados.total_cantidad:,.0f}"),
+        ("Valor total de ventas", f"{agregados.total_valor:,.2f} Bs."),
+        ("Valor promedio por venta", f"{agregados.valor_promedio:,.2f} Bs."),
+    ):
+        pdf.cell(80, 7, txt=_texto_pdf(metrica), border=1)
+        pdf.cell(60, 7, txt=_texto_pdf(valor), border=1, ln=True)
+    pdf.ln(4)
+
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, txt=_texto_pdf("Top 10 Productos Más Vendidos"), ln=True)
+    pdf.set_font("Arial", size=10)
+    for i, (producto, cantidad) in enumerate(agregados.top_productos(10).items(), 1):
+        pdf.cell(12, 7, txt=str(i), border=1)
+        pdf.cell(128, 7, txt=_texto_pdf(producto)[:70], border=1)
+        pdf.cell(30, 7, txt=f"{cantidad:.0f}", border=1, ln=True)
+
+    # FPDF 1.7 no acepta PNG con canal alfa: los gráficos van en JPG temporales
+    with tempfile.TemporaryDirectory() as carpeta:
+        for nombre in GRAFICOS:
+            imagen = guardar_grafico(nombre, agregados, os.path.join(carpeta, f"{nombre}.jpg"))
+            pdf.add_page(orientation='L')
+            pdf.image(imagen, x=10, y=10, w=277)
+        pdf.output(path)
+    return path
+
+def generar_reporte(db_path, periodo, tipo, carpeta, formatos=FORMATOS):
+    """
+    Genera los archivos de 'periodo' en 'carpeta' y devuelve sus rutas. Abre
+    su propia conexión: corre en un proceso de generar_reportes.
+    """
+    from conexion_db import crear_conexion
+
+    os.makedirs(carpeta, exist_ok=True)
+    conn = crear_conexion(db_path)
+    try:
+        # Agregados y detalle de la misma instantánea de la base de datos
+        conn.execute("BEGIN")
+        agregados = leer_agregados(conn, periodo.rango, tipo)
+        detalle = leer_movimientos(conn, periodo.rango, tipo) if "excel" in formatos else None
+        conn.rollback()
+    finally:
+        conn.close()
+
+    tipo_texto = NOMBRES_TIPO.get(tipo, tipo)
+    base = os.path.join(carpeta, f"estadisticas_{periodo.nombre}")
+    archivos = []
+    if "excel" in formatos:
+        archivos.append(escribir_excel(f"{base}.xlsx", detalle, agregados, periodo.inicio, periodo.fin))
+    imagenes = []
+    if "png" in formatos:
+        from graficos_estadisticas import guardar_grafico
+        imagenes = [guardar_grafico(nombre, agregados, f"{base}_{nombre}.png") for nombre in GRAFICOS]
+        archivos.extend(imagenes)
+    if "html" in formatos:
+        with open(f"{base}.html", "w", encoding="utf-8") as archivo:
+            archivo.write(reporte_html(agregados, periodo.inicio, periodo.fin, tipo_texto, imagenes))
+        archivos.append(f"{base}.html")
+    if "pdf" in formatos:
+        archivos.append(escribir_pdf(f"{base}.pdf", agregados, periodo.inicio, periodo.fin, tipo_texto))
+    logging.info(f"Reporte {periodo.nombre}: {agregados.total_movimientos} movimientos, {len(archivos)} archivos")
+    return archivos
+
+def generar_reportes(db_path, periodos, tipo, salida, formatos=FORMATOS, procesos=None):
+    """
+    Genera los reportes de 'periodos' en paralelo, cada uno en la carpeta
+    salida/<nombre>. Devuelve {nombre: rutas} y {nombre: error}.
+    """
+    from conexion_db import crear_conexion
+
+    # Las migraciones se aplican una vez aquí y no en cada proceso a la vez
+    crear_conexion(db_path).close()
+
+    generados, errores = {}, {}
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = {
+            pool.submit(generar_reporte, db_path, periodo, tipo,
+                        os.path.join(salida, periodo.nombre), formatos): periodo
+            for periodo in periodos
+        }
+        for futuro in as_completed(futuros):
+            periodo = futuros[futuro]
+            try:
+                generados[periodo.nombre] = futuro.result()
+            except Exception as e:
+                logging.error(f"Error generando el reporte {periodo.nombre}: {e}")
+                errores[periodo.nombre] = str(e)
+    return generados, errores
+
+def _fecha(texto):
+    return datetime.strptime(texto, "%Y-%m-%d").date()
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Reportes de estadísticas de ventas sin interfaz")
+    parser.add_argument("--db", help="Base de datos (por defecto la de la aplicación)")
+    parser.add_argument("--desde", type=_fecha, help="Primer día (YYYY-MM-DD)")
+    parser.add_argument("--hasta", type=_fecha, help="Último día (YYYY-MM-DD)")
+    parser.add_argument("--meses", type=int, metavar="AÑO", help="Un reporte por cada mes del año")
+    parser.add_argument("--tipo", choices=("venta", "compra", "todos"), default="venta")
+    parser.add_argument("--formatos", nargs="+", choices=FORMATOS, default=list(FORMATOS))
+    parser.add_argument("--salida", default="reportes", help="Carpeta de salida")
+    parser.add_argument("--procesos", type=int, help="Procesos en paralelo (por defecto, uno por CPU)")
+    args = parser.parse_args()
+
+    if args.meses:
+        periodos = periodos_del_anio(args.meses)
+    elif args.desde:
+        hasta = args.hasta or args.desde
+        if hasta < args.desde:
+            parser.error("--hasta es anterior a --desde")
+        periodos = [Periodo(f"{args.desde:%Y-%m-%d}_{hasta:%Y-%m-%d}", args.desde, hasta)]
+    else:
+        parser.error("indique --desde (y --hasta) o --meses")
+
+    if args.db:
+        db_path = args.db
+    else:
+        from conexion_db import obtener_db_path
+        db_path = obtener_db_path()
+    tipo = None if args.tipo == "todos" else args.tipo
+
+    generados, errores = generar_reportes(db_path, periodos, tipo, args.salida, args.formatos, args.procesos)
+    for nombre in sorted(generados):
+        print(f"{nombre}: {len(generados[nombre])} archivos en {os.path.join(args.salida, nombre)}")
+    for nombre in sorted(errores):
+        print(f"{nombre}: error: {errores[nombre]}")
+    sys.exit(1 if errores else 0)
+
+if __name__ == "__main__":
+    main()
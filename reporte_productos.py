@@ -1,21 +1,23 @@
 import sys
-import os
-import sqlite3
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla
+from busqueda_productos import buscar_productos
+from miniaturas import cargador_miniaturas, MINIATURA_REPORTE
+from functools import partial
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
     QPushButton, QLineEdit, QLabel, QTabWidget, QHeaderView, QMessageBox, QFileDialog
 )
-from PyQt5.QtGui import QPixmap, QIcon
+from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import Qt
 from datetime import datetime
-import subprocess
 
 class ReporteProductos(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Reporte de Productos")
         self.resize(1000, 600)
-        self.db_path = "pruebas.db"
+        self.db_path = obtener_db_path()
 
         main_layout = QVBoxLayout(self)
 
@@ -104,12 +106,8 @@ class ReporteProductos(QWidget):
         main_layout.addWidget(btn_menu, alignment=Qt.AlignLeft)
 
     def volver(self):
-        script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-        if not os.path.exists(script_path):
-            QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-            return
-        self.close()
-        os.system(f'python "{script_path}"')
+        if abrir_pantalla("menu.py"):
+            self.close()
 
     def buscar(self):
         filtro = self.input_busqueda.text().strip()
@@ -119,34 +117,39 @@ class ReporteProductos(QWidget):
         else:
             self.cargar_eliminados(filtro)
 
+    def crear_item_imagen(self, imagen):
+        """Celda con la miniatura; si no está en caché se completa al generarse."""
+        img_item = QTableWidgetItem("[img]")
+        pixmap = cargador_miniaturas().pedir(imagen, MINIATURA_REPORTE, partial(self.poner_miniatura, img_item))
+        if pixmap is not None and not pixmap.isNull():
+            self.poner_miniatura(img_item, pixmap)
+        return img_item
+
+    def poner_miniatura(self, img_item, pixmap):
+        if not pixmap.isNull():
+            img_item.setData(Qt.DecorationRole, pixmap)
+            img_item.setText("")
+
     def cargar_disponibles(self, filtro=""):
         self.tabla_disp.setRowCount(0)
-        conn = sqlite3.connect(self.db_path)
+        conn = obtener_conexion(self.db_path)
         cursor = conn.cursor()
-        query = """
-            SELECT codigo, imagen, nombre, precio, stock
-            FROM productos
-            WHERE 1=1
-        """
-        params = []
         if filtro:
-            query += " AND (nombre LIKE ? OR codigo LIKE ?)"
-            params += [f"%{filtro}%", f"%{filtro}%"]
-        query += " ORDER BY nombre ASC"
-        cursor.execute(query, params)
-        productos = cursor.fetchall()
-        conn.close()
+            # El reporte lista todas las coincidencias, no solo las primeras
+            productos = buscar_productos(conn, filtro, ("codigo", "imagen", "nombre", "precio", "stock"),
+                                         limite=None)
+        else:
+            cursor.execute("""
+                SELECT codigo, imagen, nombre, precio, stock
+                FROM productos
+                ORDER BY nombre ASC
+            """)
+            productos = cursor.fetchall()
         for row_num, (codigo, imagen, nombre, precio, stock) in enumerate(productos):
             self.tabla_disp.insertRow(row_num)
             self.tabla_disp.setItem(row_num, 0, QTableWidgetItem(str(codigo)))
             # Imagen
-            img_item = QTableWidgetItem()
-            if imagen and os.path.exists(imagen):
-                pixmap = QPixmap(imagen).scaled(40, 40, Qt.KeepAspectRatio)
-                img_item.setData(Qt.DecorationRole, pixmap)
-            else:
-                img_item.setText("[img]")
-            self.tabla_disp.setItem(row_num, 1, img_item)
+            self.tabla_disp.setItem(row_num, 1, self.crear_item_imagen(imagen))
             self.tabla_disp.setItem(row_num, 2, QTableWidgetItem(nombre))
             self.tabla_disp.setItem(row_num, 3, QTableWidgetItem(f"{precio:.2f}"))
             self.tabla_disp.setItem(row_num, 4, QTableWidgetItem(str(stock)))
@@ -165,7 +168,7 @@ class ReporteProductos(QWidget):
 
     def cargar_eliminados(self, filtro=""):
         self.tabla_eli.setRowCount(0)
-        conn = sqlite3.connect(self.db_path)
+        conn = obtener_conexion(self.db_path)
         cursor = conn.cursor()
         query = """
             SELECT codigo, imagen, nombre, precio, stock
@@ -179,18 +182,11 @@ class ReporteProductos(QWidget):
         query += " ORDER BY nombre ASC"
         cursor.execute(query, params)
         productos = cursor.fetchall()
-        conn.close()
         for row_num, (codigo, imagen, nombre, precio, stock) in enumerate(productos):
             self.tabla_eli.insertRow(row_num)
             self.tabla_eli.setItem(row_num, 0, QTableWidgetItem(str(codigo)))
             # Imagen
-            img_item = QTableWidgetItem()
-            if imagen and os.path.exists(imagen):
-                pixmap = QPixmap(imagen).scaled(40, 40, Qt.KeepAspectRatio)
-                img_item.setData(Qt.DecorationRole, pixmap)
-            else:
-                img_item.setText("[img]")
-            self.tabla_eli.setItem(row_num, 1, img_item)
+            self.tabla_eli.setItem(row_num, 1, self.crear_item_imagen(imagen))
             self.tabla_eli.setItem(row_num, 2, QTableWidgetItem(nombre))
             self.tabla_eli.setItem(row_num, 3, QTableWidgetItem(f"{precio:.2f}"))
             self.tabla_eli.setItem(row_num, 4, QTableWidgetItem(str(stock)))
@@ -209,12 +205,8 @@ class ReporteProductos(QWidget):
         QMessageBox.information(self, "Imprimir", "Funcionalidad de impresión pendiente de implementar.")
 
     def ver_historial(self, codigo, eliminado=False):
-        script_path = os.path.join(os.path.dirname(__file__), "historial_prod.py")
-        if not os.path.exists(script_path):
-            QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-            return
         # Llama a historial_prod.py pasando el código del producto como argumento
-        subprocess.Popen([sys.executable, script_path, str(codigo)])
+        abrir_pantalla("historial_prod.py", [str(codigo)])
 
     def ordenar_disponibles(self, col):
         self.orden_col = col
@@ -231,15 +223,8 @@ class ReporteProductos(QWidget):
 
     def ir_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
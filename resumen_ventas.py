@@ -0,0 +1,107 @@
+"""
+Resumen diario de movimientos (tabla ventas_diarias).
+
+La tabla guarda, por día, producto y tipo de movimiento, la cantidad total,
+el valor y el número de movimientos. Los triggers creados en las migraciones
+4 y 9 la mantienen al día con cada INSERT/UPDATE/DELETE de
+movimientos_inventario; este módulo sirve para reconstruirla a partir del
+historial existente.
+
+El valor de cada movimiento es cantidad * precio_unitario, el precio que
+tenía el producto cuando se registró el movimiento (migración 9). Los
+movimientos sin precio_unitario, o las bases anteriores a esa migración,
+usan el precio actual del producto.
+
+Uso:
+    python resumen_ventas.py                    # reconstruye todo el historial
+    python resumen_ventas.py --desde 2025-01-01 # solo desde esa fecha
+    python resumen_ventas.py --db otra.db
+"""
+import time
+import logging
+import argparse
+from datetime import datetime
+
+# Día (texto y segundos del reloj local, como fecha_epoch) de un movimiento
+SQL_DIA = "date({col})"
+SQL_DIA_EPOCH = "CAST(strftime('%s', date({col})) AS INTEGER)"
+# codigo no es UNIQUE en productos: se toma siempre el de menor id_producto
+SQL_PRECIO = "COALESCE((SELECT precio FROM productos WHERE codigo = {col} ORDER BY id_producto LIMIT 1), 0)"
+# Precio de un movimiento (alias {mov}): el guardado en la fila o, si no tiene, el actual
+SQL_PRECIO_MOVIMIENTO = "COALESCE({mov}.precio_unitario, " + SQL_PRECIO.format(col="{mov}.codigo_producto") + ")"
+
+def tiene_precio_movimiento(cursor):
+    """True si movimientos_inventario ya tiene la columna precio_unitario."""
+    return any(fila[1] == "precio_unitario"
+               for fila in cursor.execute("PRAGMA table_info(movimientos_inventario)").fetchall())
+
+def _precio(prefijo, guardado):
+    if guardado:
+        return SQL_PRECIO_MOVIMIENTO.format(mov=prefijo)
+    return SQL_PRECIO.format(col=prefijo + ".codigo_producto")
+
+def reconstruir(cursor, desde=None):
+    """
+    Recalcula ventas_diarias sin manejar la transacción. Devuelve el número
+    de filas escritas.
+    """
+    from periodos import a_epoch
+
+    condicion = "WHERE mi.fecha_movimiento IS NOT NULL"
+    params = []
+    if desde is None:
+        cursor.execute("DELETE FROM ventas_diarias")
+    else:
+        cursor.execute("DELETE FROM ventas_diarias WHERE dia_epoch >= ?", (a_epoch(desde),))
+        condicion += " AND mi.fecha_epoch >= ?"
+        params.append(a_epoch(desde))
+
+    cursor.execute(f"""
+        INSERT INTO ventas_diarias
+            (dia_epoch, dia, codigo_producto, tipo_movimiento, cantidad, valor, movimientos)
+        SELECT
+            {SQL_DIA_EPOCH.format(col='mi.fecha_movimiento')},
+            {SQL_DIA.format(col='mi.fecha_movimiento')},
+            mi.codigo_producto,
+            mi.tipo_movimiento,
+            SUM(mi.cantidad),
+            SUM(mi.cantidad * {_precio('mi', tiene_precio_movimiento(cursor))}),
+            COUNT(*)
+        FROM movimientos_inventario mi
+        {condicion}
+        GROUP BY 1, 3, 4
+    """, params)
+    return cursor.rowcount
+
+def reconstruir_ventas_diarias(conn, desde=None):
+    """
+    Vuelve a calcular ventas_diarias desde movimientos_inventario.
+    'desde' es un date opcional; solo se reconstruyen los días a partir de él.
+    Se ejecuta en una transacción: si falla, el resumen queda como estaba.
+    """
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        filas = reconstruir(cursor, desde)
+        conn.commit()
+        return filas
+    except Exception:
+        conn.rollback()
+        raise
+
+def main():
+    from conexion_db import obtener_db_path, obtener_conexion
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Reconstruye el resumen diario ventas_diarias")
+    parser.add_argument("--db", help="Ruta de la base de datos (por defecto pruebas.db)")
+    parser.add_argument("--desde", help="Reconstruir solo desde esta fecha (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    desde = datetime.strptime(args.desde, "%Y-%m-%d").date() if args.desde else None
+    db_path = args.db or obtener_db_path()
+    inicio = time.perf_counter()
+    filas = reconstruir_ventas_diarias(obtener_conexion(db_path), desde)
+    print(f"ventas_diarias: {filas} filas en {time.perf_counter() - inicio:.2f} s ({db_path})")
+
+if __name__ == "__main__":
+    main()
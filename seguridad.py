@@ -0,0 +1,110 @@
+"""
+Contraseñas de los empleados.
+
+El costo de bcrypt se configura con FARMACIA_BCRYPT_COSTO (por defecto 12).
+Cada punto más duplica lo que tarda verificar una contraseña, así que conviene
+medirlo en las computadoras de caja:
+
+    python seguridad.py             # tiempos de checkpw para cada costo
+    python seguridad.py 250         # recomienda el costo más alto bajo 250 ms
+
+Cuando alguien inicia sesión con un hash de otro costo (por ejemplo después
+de cambiar FARMACIA_BCRYPT_COSTO), su contraseña se vuelve a hashear con el
+costo actual.
+"""
+import os
+import sys
+import time
+import logging
+import sqlite3
+import bcrypt
+
+COSTO_BCRYPT = int(os.environ.get("FARMACIA_BCRYPT_COSTO", 12))
+# Costos que mide 'python seguridad.py'
+COSTOS_A_MEDIR = range(10, 15)
+
+class CredencialesInvalidasError(Exception):
+    """El usuario o la contraseña no son válidos."""
+
+class UsuarioNoEncontradoError(CredencialesInvalidasError):
+    def __init__(self, usuario):
+        super().__init__(f"El usuario '{usuario}' no existe")
+        self.usuario = usuario
+
+class ContrasenaIncorrectaError(CredencialesInvalidasError):
+    def __init__(self, usuario):
+        super().__init__(f"Contraseña incorrecta para '{usuario}'")
+        self.usuario = usuario
+
+def hashear_contrasena(contrasena, costo=None):
+    """Hash bcrypt de 'contrasena' con 'costo' (por defecto COSTO_BCRYPT)."""
+    salt = bcrypt.gensalt(rounds=costo or COSTO_BCRYPT)
+    return bcrypt.hashpw(contrasena.encode("utf-8"), salt).decode("utf-8")
+
+def costo_hash(hash_guardado):
+    """Costo de un hash bcrypt ('$2b$12$...' -> 12), o None si no se reconoce."""
+    partes = hash_guardado.split("$")
+    return int(partes[2]) if len(partes) > 3 and partes[2].isdigit() else None
+
+def verificar_credenciales(conn, usuario, contrasena):
+    """
+    Verifica usuario y contraseña y devuelve (id_empleado, rol). Lanza
+    UsuarioNoEncontradoError o ContrasenaIncorrectaError. Tarda lo que tarde
+    bcrypt: no llamarla desde el hilo de la interfaz.
+    """
+    usuario = usuario.strip()
+    fila = conn.execute(
+        "SELECT id_empleado, contrasena_hash, rol FROM empleado WHERE usuario = ?", (usuario,)
+    ).fetchone()
+    if fila is None:
+        raise UsuarioNoEncontradoError(usuario)
+    id_empleado, hash_guardado, rol = fila
+
+    inicio = time.perf_counter()
+    valida = bcrypt.checkpw(contrasena.encode("utf-8"), hash_guardado.encode("utf-8"))
+    costo = costo_hash(hash_guardado)
+    logging.info(f"checkpw (costo {costo}) en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    if not valida:
+        raise ContrasenaIncorrectaError(usuario)
+
+    if costo != COSTO_BCRYPT:
+        try:
+            conn.execute("UPDATE empleado SET contrasena_hash = ? WHERE id_empleado = ?",
+                         (hashear_contrasena(contrasena), id_empleado))
+            conn.commit()
+            logging.info(f"Contraseña de '{usuario}' rehasheada de costo {costo} a {COSTO_BCRYPT}")
+        except sqlite3.Error as e:
+            # La sesión se inicia igual; se vuelve a intentar en el próximo login
+            conn.rollback()
+            logging.warning(f"No se pudo rehashear la contraseña de '{usuario}': {e}")
+    return id_empleado, rol
+
+def medir_costos(costos=COSTOS_A_MEDIR, repeticiones=3):
+    """Milisegundos que tarda checkpw con cada costo (mejor de 'repeticiones')."""
+    tiempos = {}
+    for costo in costos:
+        hash_prueba = hashear_contrasena("contraseña de prueba", costo).encode("utf-8")
+        mejor = None
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            bcrypt.checkpw("contraseña de prueba".encode("utf-8"), hash_prueba)
+            duracion = (time.perf_counter() - inicio) * 1000
+            mejor = duracion if mejor is None else min(mejor, duracion)
+        tiempos[costo] = mejor
+    return tiempos
+
+def main():
+    objetivo = float(sys.argv[1]) if len(sys.argv) > 1 else 250
+    tiempos = medir_costos()
+    print(f"{'costo':>6}{'checkpw (ms)':>15}")
+    for costo, ms in tiempos.items():
+        actual = "  <-- actual" if costo == COSTO_BCRYPT else ""
+        print(f"{costo:>6}{ms:>15.0f}{actual}")
+    aceptables = [costo for costo, ms in tiempos.items() if ms <= objetivo]
+    if aceptables:
+        print(f"\nCosto recomendado para {objetivo:.0f} ms: FARMACIA_BCRYPT_COSTO={max(aceptables)}")
+    else:
+        print(f"\nNingún costo medido tarda menos de {objetivo:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Tabla de productos y registro de la venta, comunes a ventas.py y
+ventas_admin.py.
+
+Las dos pantallas de caja solo se distinguen por sus botones de
+navegación; TablaVentasMixin tiene la carga, búsqueda y actualización por
+filas de la tabla de productos y el procesamiento del carrito. La ventana
+que lo usa debe tener tabla, input_busqueda, spin_cantidad, tabla_carrito,
+label_total, conexion, carrito, celdas_producto, id_empleado y
+nombre_empleado.
+"""
+import sqlite3
+import bisect
+from PyQt5.QtWidgets import QTableWidgetItem, QMessageBox
+from motor_ventas import registrar_venta, StockInsuficienteError
+from busqueda_productos import buscar_productos
+from catalogo import obtener_catalogo
+
+# Columnas de la tabla principal, en orden
+COLUMNAS_PRODUCTO = ("id_producto", "nombre", "codigo", "precio", "stock")
+
+class TablaVentasMixin:
+    def cargar_todos_productos(self):
+        """Carga todos los productos con stock disponible en la tabla principal."""
+        resultados = obtener_catalogo().filas(COLUMNAS_PRODUCTO, filtro=lambda p: p["stock"] > 0)
+        self.mostrar_productos(resultados)
+        self.spin_cantidad.setMaximum(1)
+
+    def buscar_producto(self):
+        """Busca productos por nombre o código según el texto ingresado en el buscador."""
+        texto = self.input_busqueda.text().strip()
+        if not texto:
+            self.cargar_todos_productos()
+            return
+        resultados = buscar_productos(self.conexion, texto, COLUMNAS_PRODUCTO, condicion="p.stock > 0")
+        self.mostrar_productos(resultados)
+
+    def mostrar_productos(self, resultados):
+        """Muestra los productos en la tabla principal."""
+        self.tabla.setRowCount(0)
+        self.celdas_producto = {}
+        for row_num, row_data in enumerate(resultados):
+            self.tabla.insertRow(row_num)
+            for col_num, data in enumerate(row_data):
+                item = QTableWidgetItem(str(data))
+                self.tabla.setItem(row_num, col_num, item)
+            self.celdas_producto[row_data[0]] = self.tabla.item(row_num, 0)
+        self.tabla.resizeColumnsToContents()
+        self.spin_cantidad.setMaximum(1)
+
+    def actualizar_filas_productos(self, ids_producto):
+        """
+        Actualiza en la tabla principal solo las filas de 'ids_producto' y de
+        los productos que cambiaron en el catálogo; quita las que quedaron sin
+        stock y agrega las de productos que volvieron a tener stock o son
+        nuevos. La selección y el desplazamiento de la tabla se mantienen.
+        """
+        catalogo = obtener_catalogo()
+        cambiados = catalogo.actualizar()
+        if cambiados is None:
+            self.buscar_producto()
+            return
+        disponibles = sorted(
+            id_producto for id_producto in cambiados - self.celdas_producto.keys()
+            if id_producto in catalogo.productos and catalogo.productos[id_producto]["stock"] > 0
+        )
+        if disponibles and self.input_busqueda.text().strip():
+            # Con una búsqueda escrita, solo el índice sabe si coinciden
+            self.buscar_producto()
+            return
+        ids = (set(ids_producto) | cambiados) & self.celdas_producto.keys()
+        self.tabla.setUpdatesEnabled(False)
+        try:
+            for id_producto in ids:
+                fila = self.tabla.row(self.celdas_producto[id_producto])
+                producto = catalogo.productos.get(id_producto)
+                if producto is None or producto["stock"] <= 0:
+                    self.tabla.removeRow(fila)
+                    del self.celdas_producto[id_producto]
+                    continue
+                for col_num, columna in enumerate(COLUMNAS_PRODUCTO):
+                    texto = str(producto[columna])
+                    celda = self.tabla.item(fila, col_num)
+                    if celda.text() != texto:
+                        celda.setText(texto)
+            # Sin búsqueda la tabla está ordenada por id_producto, como en
+            # cargar_todos_productos
+            mostrados = sorted(self.celdas_producto)
+            for id_producto in disponibles:
+                fila = bisect.bisect_left(mostrados, id_producto)
+                mostrados.insert(fila, id_producto)
+                producto = catalogo.productos[id_producto]
+                self.tabla.insertRow(fila)
+                for col_num, columna in enumerate(COLUMNAS_PRODUCTO):
+                    self.tabla.setItem(fila, col_num, QTableWidgetItem(str(producto[columna])))
+                self.celdas_producto[id_producto] = self.tabla.item(fila, 0)
+        finally:
+            self.tabla.setUpdatesEnabled(True)
+        self.actualizar_spinbox()
+
+    def actualizar_spinbox(self):
+        """Actualiza el máximo del spinbox de cantidad según el stock del producto seleccionado."""
+        selected = self.tabla.currentRow()
+        if selected == -1:
+            self.spin_cantidad.setMaximum(1)
+            return
+        try:
+            stock = int(self.tabla.item(selected, 4).text())
+        except Exception:
+            stock = 1
+        self.spin_cantidad.setMaximum(max(1, stock))
+
+    def vender_todo(self):
+        """Procesa la venta de todos los productos en el carrito en una sola transacción."""
+        if not self.carrito:
+            QMessageBox.warning(self, "Carrito Vacío", "Agregue productos al carrito antes de procesar la venta.")
+            return
+        try:
+            id_venta, total = registrar_venta(
+                self.conexion, self.carrito, self.id_empleado,
+                usuario=self.nombre_empleado,
+                observaciones="Venta realizada desde sistema admin"
+            )
+        except StockInsuficienteError as e:
+            faltantes = "\n".join(
+                f"- {nombre}: pedido {pedido}, disponible {disponible}"
+                for _, nombre, pedido, disponible in e.faltantes
+            )
+            QMessageBox.warning(self, "Stock Insuficiente",
+                                f"No se registró la venta. Stock insuficiente en:\n{faltantes}")
+            self.actualizar_filas_productos(id_producto for id_producto, _, _, _ in e.faltantes)
+            return
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Error", f"No se pudo registrar la venta:\n{e}")
+            return
+        vendidos = [item["id"] for item in self.carrito]
+        self.carrito = []
+        self.tabla_carrito.setRowCount(0)
+        self.label_total.setText("Total: 0.00 Bs.")
+        # Solo cambian las filas de lo vendido: no se reconstruye toda la tabla
+        self.actualizar_filas_productos(vendidos)
+        QMessageBox.information(self, "Venta procesada", f"Venta #{id_venta} realizada correctamente.\nTotal: {total:.2f} Bs.")
@@ -0,0 +1,140 @@
+"""
+Consultas a la base de datos fuera del hilo de la interfaz.
+
+CargadorEnSegundoPlano ejecuta una función en el QThreadPool con su propia
+conexión (las conexiones de conexion_db son por hilo y no se comparten con
+el hilo de la interfaz). Cada carga nueva reemplaza a la anterior: la
+conexión de la carga anterior se interrumpe con interrupt(), lo que corta
+la consulta de SQLite que esté corriendo, y su resultado se descarta.
+
+La función recibe (conn, progreso) y devuelve el resultado; progreso(valor)
+informa el avance de 0 a 100. Los resultados y errores llegan al hilo de la
+interfaz por señales.
+"""
+import sqlite3
+import logging
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from conexion_db import crear_conexion
+
+class _SenalesTarea(QObject):
+    terminado = pyqtSignal(int, object)
+    fallo = pyqtSignal(int, object)
+    progreso = pyqtSignal(int, int)
+    finalizada = pyqtSignal(int)
+
+class _Tarea(QRunnable):
+    def __init__(self, generacion, funcion, db_path, senales):
+        super().__init__()
+        self.generacion = generacion
+        self.funcion = funcion
+        self.db_path = db_path
+        self.senales = senales
+        self.cancelada = False
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def cancelar(self):
+        """Pide cortar la tarea; se puede llamar desde cualquier hilo."""
+        with self._lock:
+            self.cancelada = True
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    def _progreso(self, valor):
+        if not self.cancelada:
+            self.senales.progreso.emit(self.generacion, int(valor))
+
+    def run(self):
+        try:
+            with self._lock:
+                if self.cancelada:
+                    return
+                self._conn = crear_conexion(self.db_path)
+            resultado = self.funcion(self._conn, self._progreso)
+            if not self.cancelada:
+                self.senales.terminado.emit(self.generacion, resultado)
+        except sqlite3.OperationalError as e:
+            # "interrupted": la reemplazó una carga más nueva
+            if not self.cancelada:
+                logging.error(f"Error en consulta en segundo plano: {e}")
+                self.senales.fallo.emit(self.generacion, e)
+        except Exception as e:
+            if not self.cancelada:
+                logging.error(f"Error en tarea en segundo plano: {e}")
+                self.senales.fallo.emit(self.generacion, e)
+        finally:
+            with self._lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+            try:
+                self.senales.finalizada.emit(self.generacion)
+            except RuntimeError:
+                # El cargador ya se destruyó (se cerró la aplicación con la tarea corriendo)
+                pass
+
+class CargadorEnSegundoPlano(QObject):
+    """
+    Lanza cargas en segundo plano donde solo vale la última.
+
+    Señales (en el hilo de la interfaz):
+      iniciado()             empezó una carga
+      terminado(resultado)   la última carga terminó
+      fallo(excepcion)       la última carga falló
+      progreso(valor)        avance de la última carga, de 0 a 100
+    """
+    iniciado = pyqtSignal()
+    terminado = pyqtSignal(object)
+    fallo = pyqtSignal(object)
+    progreso = pyqtSignal(int)
+
+    def __init__(self, db_path=None, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.generacion = 0
+        self._tarea = None
+        # Tareas lanzadas (también las canceladas) hasta que terminan de correr
+        self._en_curso = {}
+        self._senales = _SenalesTarea()
+        self._senales.terminado.connect(self._al_terminar)
+        self._senales.fallo.connect(self._al_fallar)
+        self._senales.progreso.connect(self._al_progresar)
+        self._senales.finalizada.connect(lambda generacion: self._en_curso.pop(generacion, None))
+
+    @property
+    def ocupado(self):
+        return self._tarea is not None
+
+    def cargar(self, funcion):
+        """Cancela la carga en curso, si hay, y lanza 'funcion(conn, progreso)'."""
+        self.cancelar()
+        self.generacion += 1
+        self._tarea = _Tarea(self.generacion, funcion, self.db_path, self._senales)
+        # El pool no debe borrar la tarea: se sigue usando para cancelarla
+        self._tarea.setAutoDelete(False)
+        self._en_curso[self.generacion] = self._tarea
+        QThreadPool.globalInstance().start(self._tarea)
+        self.iniciado.emit()
+
+    def cancelar(self):
+        if self._tarea is not None:
+            self._tarea.cancelar()
+            self._tarea = None
+
+    def _es_actual(self, generacion):
+        return generacion == self.generacion and self._tarea is not None
+
+    def _al_terminar(self, generacion, resultado):
+        if self._es_actual(generacion):
+            self._tarea = None
+            self.terminado.emit(resultado)
+
+    def _al_fallar(self, generacion, error):
+        if self._es_actual(generacion):
+            self._tarea = None
+            self.fallo.emit(error)
+
+    def _al_progresar(self, generacion, valor):
+        if self._es_actual(generacion):
+            self.progreso.emit(valor)
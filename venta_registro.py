@@ -2,16 +2,22 @@ import subprocess
 import sys
 import sqlite3
 import os
-import pandas as pd
+import threading
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QLabel, QPushButton,
-    QHBoxLayout, QLineEdit, QFileDialog, QMessageBox, QHeaderView, QAbstractItemView
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QTableView, QLabel, QPushButton,
+    QHBoxLayout, QLineEdit, QFileDialog, QMessageBox, QHeaderView, QAbstractItemView,
+    QProgressDialog
 )
 from PyQt5.QtPrintSupport import QPrintDialog, QPrinter
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QFont, QPainter
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla, abrir_en_aplicacion, abrir_con_lanzador
+from periodos import FILTRO_RANGO, rango_periodo, rango_desde_texto
+from tareas_fondo import CargadorEnSegundoPlano
+from exportacion_movimientos import exportar_consulta
 
 # Configurar logging para debug
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -27,71 +33,204 @@ DIAS_ES = {
     "Sunday": "Domingo"
 }
 
-def obtener_db_path():
-    """Obtiene la ruta de la base de datos de forma más robusta"""
-    try:
-        if getattr(sys, 'frozen', False):
-            # Carpeta donde está el ejecutable
-            exe_dir = os.path.dirname(sys.executable)
-            db_path = os.path.join(exe_dir, "pruebas.db")
-            if os.path.exists(db_path):
-                return db_path
-            # Si no está, busca en la carpeta temporal de PyInstaller
-            if hasattr(sys, '_MEIPASS'):
-                base_path = sys._MEIPASS
-                return os.path.join(base_path, "pruebas.db")
-        else:
-            # En desarrollo, busca en la carpeta original
-            return os.path.abspath(os.path.join(os.path.dirname(__file__), "pruebas.db"))
-    except Exception as e:
-        logging.error(f"Error obteniendo ruta de DB: {e}")
-        return "pruebas.db"  # Fallback
+# Movimientos que se leen de la base por cada página del libro diario
+TAMANIO_PAGINA = 200
+
+class ModeloMovimientos(QAbstractTableModel):
+    """
+    Movimientos de inventario para la tabla del libro diario.
+
+    Las filas se leen por páginas a medida que se baja en la tabla
+    (canFetchMore/fetchMore), con paginación por clave: cada página pide los
+    movimientos con id_movimiento menor al último ya cargado, así que abrir
+    el libro no depende de cuántos movimientos haya. Las fechas se formatean
+    recién al mostrarse, en data().
+    """
+    COLUMNAS = ["ID", "Código", "Producto", "Tipo", "Cantidad", "Fecha", "Observaciones", "Usuario"]
+
+    # codigo no es UNIQUE en productos: se toma el de menor id_producto para
+    # no repetir movimientos (la paginación necesita un id por fila)
+    SQL_PRODUCTO = """
+        LEFT JOIN productos p ON p.id_producto = (
+            SELECT MIN(id_producto) FROM productos WHERE codigo = mi.codigo_producto
+        )
+    """
+    SQL_COLUMNAS = """
+        SELECT 
+            mi.id_movimiento, 
+            mi.codigo_producto, 
+            COALESCE(p.nombre, 'Sin nombre'), 
+            mi.tipo_movimiento, 
+            mi.cantidad, 
+            mi."fecha_movimiento", 
+            COALESCE(mi.observaciones, ''), 
+            COALESCE(mi.usuario, '')
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.filas = []
+        self.total = 0
+        self.filtro_sql = None
+        self.params = []
+        # El filtro usa columnas de productos (alias p) y necesita el JOIN
+        self.usa_producto = False
+        self._hay_mas = False
+
+    def _join_filtro(self):
+        """JOIN con productos para el filtro, solo si quien lo armó dijo que lo usa."""
+        return self.SQL_PRODUCTO if self.filtro_sql and self.usa_producto else ""
+
+    def _consulta(self, limite=None):
+        """
+        Consulta filtrada, ordenada del movimiento más nuevo al más viejo.
+        Primero se eligen los movimientos de la página y después se les busca
+        el nombre del producto, para no hacer el JOIN con todo el rango filtrado.
+        """
+        condiciones = [f"({self.filtro_sql})"] if self.filtro_sql else []
+        params = list(self.params)
+        if self.filas:
+            condiciones.append("mi.id_movimiento < ?")
+            params.append(self.filas[-1][0])
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        sql_limite = f"LIMIT {int(limite)}" if limite else ""
+        sql = f"""
+            {self.SQL_COLUMNAS}
+            FROM (
+                SELECT mi.* FROM movimientos_inventario mi {self._join_filtro()}
+                {where}
+                ORDER BY mi.id_movimiento DESC
+                {sql_limite}
+            ) mi
+            {self.SQL_PRODUCTO}
+            ORDER BY mi.id_movimiento DESC
+        """
+        return sql, params
+
+    def cargar(self, filtro_sql=None, params=None, usa_producto=False):
+        """
+        Cambia el filtro y vuelve a empezar desde la primera página.
+        usa_producto indica que filtro_sql usa columnas de productos (alias p).
+        """
+        self.beginResetModel()
+        self.filas = []
+        self.filtro_sql = filtro_sql
+        self.params = list(params or [])
+        self.usa_producto = usa_producto
+        self._hay_mas = True
+        try:
+            self.total = self._contar()
+            self.filas = self._leer_pagina()
+        finally:
+            self.endResetModel()
+
+    def _contar(self):
+        """Total de movimientos del filtro; el JOIN solo si el filtro usa el nombre del producto."""
+        where = f"WHERE {self.filtro_sql}" if self.filtro_sql else ""
+        return obtener_conexion().execute(
+            f"SELECT COUNT(*) FROM movimientos_inventario mi {self._join_filtro()} {where}", self.params
+        ).fetchone()[0]
+
+    def limpiar(self):
+        self.beginResetModel()
+        self.filas = []
+        self.total = 0
+        self._hay_mas = False
+        self.endResetModel()
+
+    def _leer_pagina(self):
+        sql, params = self._consulta(TAMANIO_PAGINA)
+        pagina = obtener_conexion().execute(sql, params).fetchall()
+        self._hay_mas = len(pagina) == TAMANIO_PAGINA
+        return pagina
+
+    def consulta_completa(self):
+        """(sql, params) de todos los movimientos del filtro actual, no solo las páginas cargadas."""
+        filas_cargadas, self.filas = self.filas, []
+        try:
+            return self._consulta()
+        finally:
+            self.filas = filas_cargadas
 
-def crear_tablas_si_no_existen():
-    """Crea las tablas necesarias si no existen"""
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._hay_mas
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        try:
+            pagina = self._leer_pagina()
+        except sqlite3.Error as e:
+            logging.error(f"Error leyendo movimientos: {e}")
+            self._hay_mas = False
+            return
+        if not pagina:
+            return
+        inicio = len(self.filas)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(pagina) - 1)
+        self.filas.extend(pagina)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.filas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNAS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        col_num = index.column()
+        if role == Qt.DisplayRole:
+            data = self.filas[index.row()][col_num]
+            if col_num == 5:
+                return formatear_fecha(data)
+            return str(data) if data is not None else ""
+        if role == Qt.TextAlignmentRole:
+            # Alineación según el tipo de dato
+            if col_num in [0, 4]:  # ID y cantidad
+                return int(Qt.AlignRight | Qt.AlignVCenter)
+            if col_num == 5:  # Fecha
+                return int(Qt.AlignCenter)
+            return int(Qt.AlignLeft | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNAS[section]
+        return super().headerData(section, orientation, role)
+
+def formatear_fecha(valor):
+    """'YYYY-mm-dd HH:MM:SS' -> 'dd/mm/YYYY HH:MM'; otros valores se muestran tal cual."""
+    if not valor:
+        return ""
+    valor = str(valor)
     try:
-        conn = sqlite3.connect(obtener_db_path())
-        cursor = conn.cursor()
-        
-        # Crear tabla movimientos_inventario si no existe
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS movimientos_inventario (
-                id_movimiento INTEGER PRIMARY KEY AUTOINCREMENT,
-                codigo_producto TEXT NOT NULL,
-                tipo_movimiento TEXT NOT NULL,
-                cantidad REAL NOT NULL,
-                "fecha_movimiento" DATETIME NOT NULL,
-                observaciones TEXT,
-                usuario TEXT
-            )
-        ''')
-        
-        # Crear tabla productos si no existe
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS productos (
-                codigo TEXT PRIMARY KEY,
-                nombre TEXT NOT NULL,
-                presentacion TEXT,
-                linea TEXT,
-                precio REAL
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        logging.info("Tablas verificadas/creadas correctamente")
-    except Exception as e:
-        logging.error(f"Error creando tablas: {e}")
+        dt = datetime.strptime(valor.split('.')[0], "%Y-%m-%d %H:%M:%S")
+        return dt.strftime("%d/%m/%Y %H:%M")
+    except ValueError:
+        return valor
+
+def formatear_fila(fila):
+    """Fila del libro diario como se exporta: la fecha en 'dd/mm/YYYY HH:MM'."""
+    fila = list(fila)
+    if fila[5]:
+        fila[5] = formatear_fecha(fila[5])
+    return fila
 
 class LibroDiarioVentas(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.movimientos = []
         self.orden_col = 0
         self.orden_asc = True
-        
-        # Crear tablas si no existen
-        crear_tablas_si_no_existen()
+        # Exportación a Excel/CSV en segundo plano (exportacion_movimientos.py)
+        self.exportador = CargadorEnSegundoPlano(obtener_db_path(), self)
+        self.exportador.progreso.connect(self._progreso_exportar)
+        self.exportador.terminado.connect(self._exportacion_terminada)
+        self.exportador.fallo.connect(self._exportacion_fallida)
+        self.cancelar_exportacion = None
+        self.progreso_exportacion = None
+        self.ruta_exportacion = None
         
         self.init_ui()
         self.cargar_movimientos()
@@ -191,6 +330,9 @@ class LibroDiarioVentas(QMainWindow):
     def abrir_estadisticas(self):
         """Abre la ventana de estadísticas (estadistica.py) en el mismo proceso"""
         print("[DEBUG] Botón Ver Estadísticas presionado. Se intentará abrir la ventana de estadísticas.")
+        if abrir_en_aplicacion("estadistica.py"):
+            self.close()
+            return
         try:
             from estadistica import EstadisticasVentas
             self.ventana_estadisticas = EstadisticasVentas()
@@ -203,11 +345,9 @@ class LibroDiarioVentas(QMainWindow):
 
     def crear_tabla(self):
         """Crea y configura la tabla"""
-        self.tabla = QTableWidget()
-        self.tabla.setColumnCount(8)
-        self.tabla.setHorizontalHeaderLabels([
-            "ID", "Código", "Producto", "Tipo", "Cantidad", "Fecha", "Observaciones", "Usuario"
-        ])
+        self.tabla = QTableView()
+        self.modelo = ModeloMovimientos(self)
+        self.tabla.setModel(self.modelo)
         
         # Configuración de la tabla
         self.tabla.horizontalHeader().setStretchLastSection(True)
@@ -230,11 +370,11 @@ class LibroDiarioVentas(QMainWindow):
         
         # Estilo de la tabla
         self.tabla.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #bdc3c7;
                 border-radius: 5px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3498db;
                 color: white;
             }
@@ -252,74 +392,12 @@ class LibroDiarioVentas(QMainWindow):
         self.input_busqueda.clear()
         self.cargar_movimientos()
 
-    def cargar_movimientos(self, filtro_sql=None, params=None):
-        """Carga los movimientos desde la base de datos"""
-        self.tabla.setRowCount(0)
-        conn = None
-        
+    def cargar_movimientos(self, filtro_sql=None, params=None, usa_producto=False):
+        """Carga los movimientos desde la base de datos (la primera página)"""
         try:
-            conn = sqlite3.connect(obtener_db_path())
-            cursor = conn.cursor()
-            
-            base_query = """
-                SELECT 
-                    mi.id_movimiento, 
-                    mi.codigo_producto, 
-                    COALESCE(p.nombre, 'Sin nombre'), 
-                    mi.tipo_movimiento, 
-                    mi.cantidad, 
-                    mi."fecha_movimiento", 
-                    COALESCE(mi.observaciones, ''), 
-                    COALESCE(mi.usuario, '')
-                FROM movimientos_inventario mi
-                LEFT JOIN productos p ON mi.codigo_producto = p.codigo
-            """
-            
-            if filtro_sql:
-                # Reemplazar mi."fecha movimiento" por "fecha movimiento" en el filtro
-                filtro_sql = filtro_sql.replace('mi."fecha_movimiento"', '"fecha_movimiento"')
-                filtro_sql = filtro_sql.replace('mi.codigo_producto', 'codigo_producto')
-                filtro_sql = filtro_sql.replace('mi.tipo_movimiento', 'tipo_movimiento')
-                filtro_sql = filtro_sql.replace('mi.usuario', 'usuario')
-                filtro_sql = filtro_sql.replace('mi.observaciones', 'observaciones')
-                query = f"{base_query} WHERE {filtro_sql} ORDER BY mi.id_movimiento DESC"
-                cursor.execute(query, params or [])
-            else:
-                query = f"{base_query} ORDER BY mi.id_movimiento DESC"
-                cursor.execute(query)
-            
-            movimientos = cursor.fetchall()
-            self.movimientos = movimientos
-
-            # Poblar la tabla
-            for row_num, row_data in enumerate(movimientos):
-                self.tabla.insertRow(row_num)
-                for col_num, data in enumerate(row_data):
-                    valor = str(data) if data is not None else ""
-                    
-                    # Formatear fecha si es necesario
-                    if col_num == 5 and valor:  # Columna de fecha
-                        try:
-                            # Intentar parsear y formatear la fecha
-                            dt = datetime.strptime(valor.split('.')[0], "%Y-%m-%d %H:%M:%S")
-                            valor = dt.strftime("%d/%m/%Y %H:%M")
-                        except:
-                            pass  # Mantener el valor original si no se puede parsear
-                    
-                    item = QTableWidgetItem(valor)
-                    
-                    # Alineación según el tipo de dato
-                    if col_num in [0, 4]:  # ID y cantidad
-                        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                    elif col_num == 5:  # Fecha
-                        item.setTextAlignment(Qt.AlignCenter)
-                    else:
-                        item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                    
-                    self.tabla.setItem(row_num, col_num, item)
-            
+            self.modelo.cargar(filtro_sql, params, usa_producto)
             # Mostrar información del resultado
-            self.setWindowTitle(f"Libro Diario de Ventas - {len(movimientos)} registros")
+            self.setWindowTitle(f"Libro Diario de Ventas - {self.modelo.total} registros")
             
         except sqlite3.Error as e:
             logging.error(f"Error de base de datos: {e}")
@@ -327,16 +405,12 @@ class LibroDiarioVentas(QMainWindow):
         except Exception as e:
             logging.error(f"Error inesperado al cargar movimientos: {e}")
             self.mostrar_error_tabla(f"Error al cargar movimientos: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     def mostrar_error_tabla(self, mensaje):
-        """Muestra un mensaje de error en la tabla"""
-        self.tabla.setRowCount(1)
-        self.tabla.setColumnCount(1)
-        self.tabla.setHorizontalHeaderLabels(["Error"])
-        self.tabla.setItem(0, 0, QTableWidgetItem(mensaje))
+        """Muestra un mensaje de error en lugar de los movimientos"""
+        self.modelo.limpiar()
+        self.setWindowTitle("Libro Diario de Ventas")
+        QMessageBox.critical(self, "Error", mensaje)
 
     def buscar_movimientos(self):
         """Busca movimientos según el texto ingresado"""
@@ -347,28 +421,14 @@ class LibroDiarioVentas(QMainWindow):
 
         filtro_sql = None
         params = []
+        usa_producto = False
         
         try:
-            # Buscar por rango de fechas (formato: YYYY-MM-DD a YYYY-MM-DD)
-            if ' a ' in texto.lower():
-                partes = texto.lower().split(' a ')
-                if len(partes) == 2:
-                    fecha_ini = partes[0].strip()
-                    fecha_fin = partes[1].strip()
-                    filtro_sql = 'date("fecha_movimiento") BETWEEN ? AND ?'
-                    params = [fecha_ini, fecha_fin]
-            # Buscar por fecha exacta (YYYY-MM-DD)
-            elif len(texto) == 10 and texto.count('-') == 2:
-                filtro_sql = 'date("fecha_movimiento") = ?'
-                params = [texto]
-            # Buscar por mes (YYYY-MM)
-            elif len(texto) == 7 and texto.count('-') == 1:
-                filtro_sql = 'strftime("%Y-%m", "fecha_movimiento") = ?'
-                params = [texto]
-            # Buscar por año (YYYY)
-            elif len(texto) == 4 and texto.isdigit():
-                filtro_sql = 'strftime("%Y", "fecha_movimiento") = ?'
-                params = [texto]
+            # Fecha (YYYY-MM-DD), mes (YYYY-MM), año (YYYY) o rango (YYYY-MM-DD a YYYY-MM-DD)
+            rango = rango_desde_texto(texto)
+            if rango:
+                filtro_sql = FILTRO_RANGO
+                params = list(rango)
             # Buscar por código de producto, nombre, tipo de movimiento o usuario
             else:
                 filtro_sql = '''(codigo_producto LIKE ? 
@@ -378,74 +438,36 @@ class LibroDiarioVentas(QMainWindow):
                                OR observaciones LIKE ?)'''
                 param_busqueda = f"%{texto}%"
                 params = [param_busqueda] * 5
+                usa_producto = True
                 
         except Exception as e:
             logging.error(f"Error en búsqueda: {e}")
             QMessageBox.warning(self, "Error de búsqueda", f"Error al procesar la búsqueda: {e}")
             return
             
-        self.cargar_movimientos(filtro_sql, params)
+        self.cargar_movimientos(filtro_sql, params, usa_producto)
 
     def filtrar_por_periodo(self, periodo):
         """Filtra los movimientos por período de tiempo"""
         try:
-            hoy = datetime.now().date()
-            
-            if periodo == 'dia':
-                fecha = hoy.strftime('%Y-%m-%d')
-                filtro_sql = 'date("fecha_movimiento") = ?'
-                params = [fecha]
-                
-            elif periodo == 'semana':
-                # Inicio de la semana (lunes)
-                inicio = hoy - timedelta(days=hoy.weekday())
-                fin = inicio + timedelta(days=6)
-                filtro_sql = 'date("fecha_movimiento") BETWEEN ? AND ?'
-                params = [inicio.strftime('%Y-%m-%d'), fin.strftime('%Y-%m-%d')]
-                
-            elif periodo == 'mes':
-                mes = hoy.strftime('%Y-%m')
-                filtro_sql = 'strftime("%Y-%m", "fecha_movimiento") = ?'
-                params = [mes]
-                
-            elif periodo == 'anio':
-                anio = hoy.strftime('%Y')
-                filtro_sql = 'strftime("%Y", "fecha_movimiento") = ?'
-                params = [anio]
-                
-            elif periodo == 'semana_pasada':
-                # Semana pasada (lunes a domingo)
-                inicio = hoy - timedelta(days=hoy.weekday() + 7)
-                fin = inicio + timedelta(days=6)
-                filtro_sql = 'date("fecha_movimiento") BETWEEN ? AND ?'
-                params = [inicio.strftime('%Y-%m-%d'), fin.strftime('%Y-%m-%d')]
-                
-            elif periodo == 'mes_pasado':
-                # Primer día del mes pasado
-                primer_dia_mes_actual = hoy.replace(day=1)
-                ultimo_dia_mes_pasado = primer_dia_mes_actual - timedelta(days=1)
-                mes_pasado = ultimo_dia_mes_pasado.strftime('%Y-%m')
-                filtro_sql = 'strftime("%Y-%m", "fecha_movimiento") = ?'
-                params = [mes_pasado]
-                
-            elif periodo == 'anio_pasado':
-                anio_pasado = str(hoy.year - 1)
-                filtro_sql = 'strftime("%Y", "fecha_movimiento") = ?'
-                params = [anio_pasado]
-            else:
+            # Rango semiabierto sobre fecha_epoch (día, semana, mes, año y los anteriores)
+            rango = rango_periodo(periodo)
+            if rango is None:
                 return
                 
-            self.cargar_movimientos(filtro_sql, params)
+            self.cargar_movimientos(FILTRO_RANGO, list(rango))
             
         except Exception as e:
             logging.error(f"Error al filtrar por período {periodo}: {e}")
             QMessageBox.warning(self, "Error", f"Error al filtrar por período: {e}")
 
     def exportar_excel(self):
-        """Exporta los movimientos actuales a Excel"""
-        if not self.movimientos:
+        """Exporta los movimientos del filtro actual a Excel o CSV, en segundo plano"""
+        if not self.modelo.total:
             QMessageBox.warning(self, "Sin datos", "No hay datos para exportar.")
             return
+        if self.exportador.ocupado:
+            return
             
         try:
             # Obtener ruta de guardado
@@ -455,57 +477,77 @@ class LibroDiarioVentas(QMainWindow):
                 self, 
                 "Guardar como Excel", 
                 nombre_archivo, 
-                "Archivos Excel (*.xlsx);;Todos los archivos (*)"
+                "Archivos Excel (*.xlsx);;Archivos CSV (*.csv);;Todos los archivos (*)"
             )
             
             if not path:
                 return
                 
-            # Preparar datos para DataFrame
             columnas = [
                 "ID Movimiento", "Código Producto", "Nombre Producto", 
                 "Tipo Movimiento", "Cantidad", "Fecha Movimiento", 
                 "Observaciones", "Usuario"
             ]
-            
-            # Procesar datos
-            datos = []
-            for row in self.movimientos:
-                fila_procesada = list(row)
-                # Formatear fecha si es necesario
-                if fila_procesada[5]:  # Fecha
-                    try:
-                        dt = datetime.strptime(str(fila_procesada[5]).split('.')[0], "%Y-%m-%d %H:%M:%S")
-                        fila_procesada[5] = dt.strftime("%d/%m/%Y %H:%M")
-                    except:
-                        pass
-                datos.append(fila_procesada)
-            
-            # Crear DataFrame y exportar
-            df = pd.DataFrame(datos, columns=columnas)
-            
-            with pd.ExcelWriter(path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Movimientos', index=False)
-                
-                # Formatear el archivo Excel
-                workbook = writer.book
-                worksheet = writer.sheets['Movimientos']
-                
-                # Ajustar ancho de columnas
-                for column_cells in worksheet.columns:
-                    length = max(len(str(cell.value or "")) for cell in column_cells)
-                    worksheet.column_dimensions[column_cells[0].column_letter].width = min(length + 2, 50)
-            
-            QMessageBox.information(self, "Exportado", f"Archivo guardado exitosamente en:\n{path}")
+            # Se exporta todo el filtro actual, no solo las páginas ya cargadas
+            sql, params = self.modelo.consulta_completa()
+            total = self.modelo.total
+            cancelar = threading.Event()
+
+            def exportar(conn, progreso):
+                return exportar_consulta(conn, sql, params, path, columnas, formatear_fila,
+                                         total=total, progreso=progreso, cancelar=cancelar)
+
+            self.cancelar_exportacion = cancelar
+            self.progreso_exportacion = QProgressDialog(
+                f"Exportando {total} movimientos...", "Cancelar", 0, 100, self)
+            self.progreso_exportacion.setWindowTitle("Exportar")
+            self.progreso_exportacion.setWindowModality(Qt.WindowModal)
+            self.progreso_exportacion.setMinimumDuration(0)
+            self.progreso_exportacion.canceled.connect(self.cancelar_exportar)
+            self.ruta_exportacion = path
+            self.exportador.cargar(exportar)
             
         except Exception as e:
             logging.error(f"Error al exportar a Excel: {e}")
             QMessageBox.critical(self, "Error", f"No se pudo exportar a Excel:\n{e}")
 
+    def cancelar_exportar(self):
+        """Corta la exportación en curso; no queda ningún archivo a medias"""
+        if self.cancelar_exportacion is not None:
+            self.cancelar_exportacion.set()
+        self.exportador.cancelar()
+        self._cerrar_progreso_exportacion()
+        logging.info("Exportación cancelada")
+
+    def _cerrar_progreso_exportacion(self):
+        if self.progreso_exportacion is not None:
+            self.progreso_exportacion.canceled.disconnect(self.cancelar_exportar)
+            self.progreso_exportacion.close()
+            self.progreso_exportacion = None
+
+    def _progreso_exportar(self, valor):
+        if self.progreso_exportacion is not None:
+            self.progreso_exportacion.setValue(valor)
+
+    def _exportacion_terminada(self, filas):
+        self._cerrar_progreso_exportacion()
+        QMessageBox.information(self, "Exportado",
+                                f"{filas} movimientos guardados exitosamente en:\n{self.ruta_exportacion}")
+
+    def _exportacion_fallida(self, error):
+        self._cerrar_progreso_exportacion()
+        logging.error(f"Error al exportar a Excel: {error}")
+        QMessageBox.critical(self, "Error", f"No se pudo exportar a Excel:\n{error}")
+
+    def closeEvent(self, event):
+        if self.exportador.ocupado:
+            self.cancelar_exportar()
+        event.accept()
+
     def imprimir_tabla(self):
         """Imprime la tabla actual"""
         try:
-            if not self.movimientos:
+            if not self.modelo.rowCount():
                 QMessageBox.warning(self, "Sin datos", "No hay datos para imprimir.")
                 return
                 
@@ -533,6 +575,9 @@ class LibroDiarioVentas(QMainWindow):
     def volver_a_ventas_admin(self):
         """Regresa al módulo de administración de ventas (flujo Qt)"""
         print("[DEBUG] Botón Volver presionado. Se mostrará VentasWindow y se cerrará esta ventana.")
+        if abrir_en_aplicacion("ventas_admin.py"):
+            self.close()
+            return
         try:
             from ventas_admin import VentasWindow
             self.ventana_admin = VentasWindow()
@@ -545,21 +590,16 @@ class LibroDiarioVentas(QMainWindow):
 
     def ir_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
 
 def abrir_aplicacion(nombre_py):
     """
     Abre el archivo .exe si existe, si no, ejecuta el .py en un nuevo proceso.
     Busca en múltiples ubicaciones posibles.
     """
+    if abrir_en_aplicacion(nombre_py) or abrir_con_lanzador(nombre_py):
+        return
     try:
         rutas_busqueda = []
         
@@ -1,36 +1,27 @@
 import sys
-import sqlite3
 import os
-import subprocess
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, 
     QMessageBox, QSpinBox, QHeaderView
 )
 from PyQt5.QtCore import Qt
-from datetime import datetime, timedelta
+from conexion_db import obtener_conexion
+from navegacion import abrir_pantalla
+from motor_ventas import obtener_empleado
+from tabla_ventas import TablaVentasMixin
 
-def obtener_db_path():
-    if getattr(sys, 'frozen', False):
-        exe_dir = os.path.dirname(sys.executable)
-        db_path = os.path.join(exe_dir, "pruebas.db")
-        if os.path.exists(db_path):
-            return db_path
-        base_path = sys._MEIPASS
-        return os.path.join(base_path, "pruebas.db")
-    else:
-        return os.path.abspath(os.path.join(os.path.dirname(__file__), "pruebas.db"))
-
-db_path = obtener_db_path()
-
-class VentasWindow(QMainWindow):
-    def __init__(self):
+class VentasWindow(TablaVentasMixin, QMainWindow):
+    def __init__(self, id_empleado=None):
         """Inicializa la ventana principal del sistema de ventas y configura la interfaz."""
         super().__init__()
         self.setWindowTitle("Sistema de Ventas")
-        self.conexion = sqlite3.connect(db_path)
+        self.conexion = obtener_conexion()
         self.cursor = self.conexion.cursor()
         self.carrito = []
+        # id_producto -> celda de la columna ID de su fila en la tabla principal
+        self.celdas_producto = {}
+        self.id_empleado, self.nombre_empleado = obtener_empleado(self.conexion, id_empleado)
 
         main_widget = QWidget()
         main_layout = QVBoxLayout()
@@ -132,54 +123,6 @@ class VentasWindow(QMainWindow):
         self.tabla.selectionModel().selectionChanged.connect(self.actualizar_spinbox)
         self.cargar_todos_productos()
 
-    def cargar_todos_productos(self):
-        """Carga todos los productos con stock disponible en la tabla principal."""
-        self.cursor.execute("SELECT id_producto, nombre, codigo, precio, stock FROM productos WHERE stock > 0")
-        resultados = self.cursor.fetchall()
-        self.mostrar_productos(resultados)
-        self.spin_cantidad.setMaximum(1)
-
-    def buscar_producto(self):
-        """Busca productos por nombre o código según el texto ingresado en el buscador."""
-        texto = self.input_busqueda.text().strip()
-        if not texto:
-            self.cargar_todos_productos()
-            return
-        sql = """
-            SELECT id_producto, nombre, codigo, precio, stock
-            FROM productos
-            WHERE stock > 0 AND (
-                nombre LIKE ? OR codigo LIKE ?
-            )
-        """
-        like = f"%{texto}%"
-        self.cursor.execute(sql, (like, like))
-        resultados = self.cursor.fetchall()
-        self.mostrar_productos(resultados)
-
-    def mostrar_productos(self, resultados):
-        """Muestra los productos en la tabla principal."""
-        self.tabla.setRowCount(0)
-        for row_num, row_data in enumerate(resultados):
-            self.tabla.insertRow(row_num)
-            for col_num, data in enumerate(row_data):
-                item = QTableWidgetItem(str(data))
-                self.tabla.setItem(row_num, col_num, item)
-        self.tabla.resizeColumnsToContents()
-        self.spin_cantidad.setMaximum(1)
-
-    def actualizar_spinbox(self):
-        """Actualiza el máximo del spinbox de cantidad según el stock del producto seleccionado."""
-        selected = self.tabla.currentRow()
-        if selected == -1:
-            self.spin_cantidad.setMaximum(1)
-            return
-        try:
-            stock = int(self.tabla.item(selected, 4).text())
-        except Exception:
-            stock = 1
-        self.spin_cantidad.setMaximum(max(1, stock))
-
     def agregar_al_carrito(self):
         """Agrega el producto seleccionado y la cantidad indicada al carrito de ventas."""
         selected = self.tabla.currentRow()
@@ -240,51 +183,19 @@ class VentasWindow(QMainWindow):
         self.label_total.setText("Total: 0.00 Bs.")
         QMessageBox.information(self, "Venta Cancelada", "La venta ha sido cancelada y el carrito vaciado.")
 
-    def vender_todo(self):
-        """Procesa la venta de todos los productos en el carrito, actualiza stock y registra el movimiento."""
-        if not self.carrito:
-            QMessageBox.warning(self, "Carrito Vacío", "Agregue productos al carrito antes de procesar la venta.")
-            return
-        fecha_mov = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        for item in self.carrito:
-            self.cursor.execute(
-                "UPDATE productos SET stock = stock - ? WHERE id_producto = ? AND stock >= ?",
-                (item["cantidad"], item["id"], item["cantidad"])
-            )
-            self.cursor.execute(
-                "INSERT INTO movimientos_inventario (codigo_producto, tipo_movimiento, cantidad, fecha_movimiento, observaciones, usuario) VALUES (?, ?, ?, ?, ?, ?)",
-                (item["codigo"], "venta", item["cantidad"], fecha_mov, "Venta realizada desde sistema admin", "admin")
-            )
-        self.conexion.commit()
-        self.carrito = []
-        self.tabla_carrito.setRowCount(0)
-        self.label_total.setText("Total: 0.00 Bs.")
-        QMessageBox.information(self, "Venta procesada", "Venta realizada correctamente.")
-        self.cargar_todos_productos()
-
     def abrir_script(self, script):
-        try:
-            if self.conexion:
-                self.conexion.close()
-        except Exception:
-            pass
-        subprocess.Popen([sys.executable, script])
-        QApplication.quit()
+        if abrir_pantalla(script):
+            self.close()
 
     def ir_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py", [str(self.id_empleado)]):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    ventana = VentasWindow()
+    # login.py y menu.py pasan el id del empleado que inició sesión
+    id_empleado = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else None
+    ventana = VentasWindow(id_empleado)
     ventana.showMaximized()
     sys.exit(app.exec_())
\ No newline at end of file
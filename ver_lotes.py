@@ -1,6 +1,8 @@
 import sys
 import os
 import sqlite3
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla, abrir_en_aplicacion, abrir_con_lanzador
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QLabel, 
     QWidget, QTableWidget, QTableWidgetItem, QHeaderView, QPushButton,
@@ -12,86 +14,14 @@ import subprocess
 
 # ----------------- Funciones de Utilidad -----------------
 
-def obtener_db_path():
-    """Retorna la ruta de la base de datos 'pruebas.db'."""
-    if getattr(sys, 'frozen', False):
-        exe_dir = os.path.dirname(sys.executable)
-        db_path = os.path.join(exe_dir, "pruebas.db")
-        if os.path.exists(db_path):
-            return db_path
-        base_path = sys._MEIPASS
-        return os.path.join(base_path, "pruebas.db")
-    else:
-        return os.path.abspath(os.path.join(os.path.dirname(__file__), "pruebas.db"))
-
 db_path = obtener_db_path()
 
-def crear_tablas_necesarias():
-    """Crea las tablas productos, lotes y proveedores si no existen."""
-    conn = None
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Estructura de la tabla 'productos' (según la información que proporcionaste)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS productos (
-                id_producto INTEGER PRIMARY KEY,
-                codigo TEXT NOT NULL UNIQUE,
-                imagen TEXT NOT NULL,
-                nombre TEXT NOT NULL,
-                precio REAL NOT NULL,
-                stock INTEGER NOT NULL,
-                "fecha_venc" INTEGER NOT NULL,
-                id_empleado INTEGER,
-                FOREIGN KEY(id_empleado) REFERENCES empleado(CI)
-            );
-        """)
-
-        # Estructura de la tabla 'proveedores'
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS proveedores (
-                id_proveedor INTEGER PRIMARY KEY,
-                nombre_proveedor TEXT NOT NULL UNIQUE,
-                "nit ruc" TEXT UNIQUE,
-                "nombre contacto" TEXT,
-                telefono TEXT NOT NULL,
-                correo TEXT NOT NULL,
-                direccion TEXT,
-                estado TEXT DEFAULT 'activo' CHECK(estado IN ('activo', 'inactivo')),
-                fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        
-        # Estructura de la tabla 'lotes'
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS lotes (
-                id_lote INTEGER PRIMARY KEY,
-                id_producto INTEGER NOT NULL,
-                codigo_lote TEXT NOT NULL UNIQUE,
-                cantidad INTEGER NOT NULL,
-                "fecha_entrada" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                "fecha_vencimiento" INTEGER NOT NULL,
-                precio_costo REAL,
-                id_proveedor INTEGER,
-                FOREIGN KEY(id_producto) REFERENCES productos(id_producto),
-                FOREIGN KEY(id_proveedor) REFERENCES proveedores(id_proveedor)
-            );
-        """)
-        
-        conn.commit()
-        print("Tablas verificadas/creadas correctamente.")
-        
-    except sqlite3.Error as e:
-        print(f"Error al crear tablas: {e}")
-    finally:
-        if conn:
-            conn.close()
-
 def abrir_aplicacion(nombre_py):
     """
     Abre el archivo .exe si existe, si no, ejecuta el .py en un nuevo proceso.
     """
+    if abrir_en_aplicacion(nombre_py) or abrir_con_lanzador(nombre_py):
+        return
     rutas = []
     if hasattr(sys, '_MEIPASS'):
         rutas.append(sys._MEIPASS)
@@ -204,6 +134,9 @@ class VerLotesWindow(QMainWindow):
         self.cargar_lotes()
 
     def abrir_insertar_lote(self):
+        if abrir_en_aplicacion("insertar_lotes.py"):
+            self.close()
+            return
         try:
             from insertar_lotes import InsertarLoteWindow
         except ImportError:
@@ -215,9 +148,8 @@ class VerLotesWindow(QMainWindow):
 
     def cargar_lotes(self):
         """Carga los datos de los lotes desde la base de datos."""
-        conn = None
+        conn = obtener_conexion()
         try:
-            conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id_lote, id_producto, codigo_lote, cantidad, fecha_entrada, fecha_vencimiento, precio_costo, id_proveedor
@@ -253,24 +185,13 @@ class VerLotesWindow(QMainWindow):
                     self.tabla_lotes.setItem(fila_index, col_index, QTableWidgetItem(valor_formateado))
         except sqlite3.Error as e:
             QMessageBox.critical(self, "Error de Base de Datos", f"No se pudo cargar la información de lotes: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     def ir_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
 
 if __name__ == "__main__":
-    crear_tablas_necesarias()
     app = QApplication(sys.argv)
     window = VerLotesWindow()
     window.showMaximized()
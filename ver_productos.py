@@ -4,49 +4,43 @@ import sqlite3
 import subprocess
 from functools import partial
 from datetime import datetime
-import pandas as pd
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QLineEdit,
     QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QWidget, 
     QMessageBox, QLabel, QFrame, QFileDialog, QGraphicsDropShadowEffect
 )
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QColor, QPixmap, QIcon
+from PyQt5.QtGui import QColor, QIcon
 import glob
 import locale
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla, abrir_en_aplicacion, abrir_con_lanzador
+from catalogo import obtener_catalogo
+from miniaturas import cargador_miniaturas, resolver_ruta, MINIATURA_PRODUCTOS
+from importacion_diferida import importar_diferido
 
-# Configuración de la base de datos
-DB_NAME = "pruebas.db"
+# Solo para exportar
+pd = importar_diferido("pandas")
 
 class DatabaseManager:
     """Clase para manejar operaciones de base de datos"""
     @staticmethod
     def get_db_path():
-        if getattr(sys, 'frozen', False):
-            exe_dir = os.path.dirname(sys.executable)
-            db_path = os.path.join(exe_dir, DB_NAME)
-            if os.path.exists(db_path):
-                return db_path
-            base_path = sys._MEIPASS
-            return os.path.join(base_path, DB_NAME)
-        else:
-            return os.path.abspath(os.path.join(os.path.dirname(__file__), DB_NAME))
+        return obtener_db_path()
 
     @staticmethod
     def get_products():
         """Obtiene todos los productos de la base de datos, incluyendo el nombre del empleado que lo modificó"""
         try:
-            conn = sqlite3.connect(DatabaseManager.get_db_path())
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT p.id_producto, p.codigo, p.imagen, p.nombre, p.precio, p.stock, p.fecha_venc,
-                       IFNULL(e.nombre, 'Sin asignar') as empleado
-                FROM productos p
-                LEFT JOIN empleado e ON p.id_empleado = e.id_empleado
-            """)
-            products = cursor.fetchall()
-            conn.close()
-            return products
+            # Los productos salen del catálogo en memoria; solo se consultan los empleados
+            conn = obtener_conexion()
+            empleados = dict(conn.execute("SELECT id_empleado, nombre FROM empleado").fetchall())
+            return [
+                fila[:-1] + (empleados.get(fila[-1]) or 'Sin asignar',)
+                for fila in obtener_catalogo().filas(
+                    ("id_producto", "codigo", "imagen", "nombre", "precio", "stock", "fecha_venc", "id_empleado")
+                )
+            ]
         except sqlite3.Error as e:
             QMessageBox.critical(None, "Error", f"No se pudo obtener los datos: {e}")
             return []
@@ -54,8 +48,8 @@ class DatabaseManager:
     @staticmethod
     def delete_product(product_id):
         """Elimina un producto y lo mueve a la tabla de eliminados"""
+        conn = obtener_conexion()
         try:
-            conn = sqlite3.connect(DatabaseManager.get_db_path())
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -78,11 +72,9 @@ class DatabaseManager:
                 return True
             return False
         except sqlite3.Error as e:
+            conn.rollback()
             QMessageBox.critical(None, "Error", f"Error al eliminar el producto: {e}")
             return False
-        finally:
-            if conn:
-                conn.close()
 
 class ModernButton(QPushButton):
     """Botón personalizado con efectos modernos"""
@@ -428,21 +420,18 @@ class ProductManagementWindow(QMainWindow):
                 # Mostrar miniatura de imagen (columna 2)
                 elif col_num == 2 and data:
                     item = QTableWidgetItem()
-                    # Si la ruta es relativa, hazla absoluta
-                    ruta_img = data
-                    if not os.path.isabs(ruta_img):
-                        ruta_img = os.path.join(os.path.dirname(__file__), ruta_img)
-                    if os.path.exists(ruta_img):
-                        pixmap = QPixmap(ruta_img)
-                        if not pixmap.isNull():
-                            # Cambia aquí el tamaño de la miniatura
-                            icon = QIcon(pixmap.scaled(120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-                            item.setIcon(icon)
-                            item.setText("")  # Opcional: no mostrar texto
-                        else:
-                            item.setText("Imagen inválida")
-                    else:
+                    # Miniatura desde la caché; si no está, llega cuando se termina de generar
+                    pixmap = cargador_miniaturas().pedir(
+                        data, MINIATURA_PRODUCTOS, partial(self._set_thumbnail, item)
+                    )
+                    if pixmap is None:
+                        item.setText("Cargando...")
+                    elif pixmap.isNull() and resolver_ruta(data) and os.path.exists(resolver_ruta(data)):
+                        item.setText("Imagen inválida")
+                    elif pixmap.isNull():
                         item.setText("No encontrada")
+                    else:
+                        item.setIcon(QIcon(pixmap))
                 # Mostrar nombre del empleado (columna 7)
                 elif col_num == 7:
                     item = QTableWidgetItem(str(data) if data is not None else "Sin asignar")
@@ -459,6 +448,13 @@ class ProductManagementWindow(QMainWindow):
                     self.table.selectRow(row)
                     break
 
+    def _set_thumbnail(self, item, pixmap):
+        if pixmap.isNull():
+            item.setText("Imagen inválida")
+        else:
+            item.setIcon(QIcon(pixmap))
+            item.setText("")
+
     def _add_action_buttons(self, row_num, product_id):
         action_widget = QWidget()
         action_layout = QHBoxLayout(action_widget)
@@ -570,15 +566,8 @@ class ProductManagementWindow(QMainWindow):
 
     def ir_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
 
 # Configura el locale para fechas en español
 try:
@@ -596,6 +585,8 @@ def abrir_aplicacion(nombre_py, argumentos=None):
     Si es .py, lo ejecuta con el intérprete de Python.
     Permite pasar argumentos.
     """
+    if abrir_en_aplicacion(nombre_py, argumentos) or abrir_con_lanzador(nombre_py, argumentos):
+        return
     # Si es ruta absoluta y existe, úsala directamente
     if os.path.isabs(nombre_py) and os.path.exists(nombre_py):
         if nombre_py.endswith('.py'):
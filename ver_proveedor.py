@@ -1,6 +1,8 @@
 import sys
 import os
 import sqlite3
+from conexion_db import obtener_db_path, obtener_conexion
+from navegacion import abrir_pantalla, abrir_en_aplicacion, abrir_con_lanzador
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QLabel, 
     QWidget, QTableWidget, QTableWidgetItem, QHeaderView, QPushButton,
@@ -10,50 +12,11 @@ from PyQt5.QtCore import Qt
 from datetime import datetime
 import subprocess
 
-def obtener_db_path():
-    """Retorna la ruta de la base de datos 'pruebas.db'."""
-    if getattr(sys, 'frozen', False):
-        exe_dir = os.path.dirname(sys.executable)
-        db_path = os.path.join(exe_dir, "pruebas.db")
-        if os.path.exists(db_path):
-            return db_path
-        base_path = sys._MEIPASS
-        return os.path.join(base_path, "pruebas.db")
-    else:
-        return os.path.abspath(os.path.join(os.path.dirname(__file__), "pruebas.db"))
-
 db_path = obtener_db_path()
 
-def crear_tabla_proveedores():
-    conn = None
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS proveedores (
-                id_proveedor INTEGER PRIMARY KEY,
-                nombre_proveedor TEXT NOT NULL UNIQUE,
-                nit_ruc TEXT UNIQUE,
-                nombre_contacto TEXT,
-                telefono TEXT NOT NULL,
-                correo TEXT NOT NULL,
-                direccion TEXT,
-                estado TEXT DEFAULT 'activo',
-                fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        
-        conn.commit()
-        print("Tabla 'proveedores' verificada/creada correctamente.")
-        
-    except sqlite3.Error as e:
-        print(f"Error al crear la tabla 'proveedores': {e}")
-    finally:
-        if conn:
-            conn.close()
-
 def abrir_aplicacion(nombre_py):
+    if abrir_en_aplicacion(nombre_py) or abrir_con_lanzador(nombre_py):
+        return
     rutas = []
     if hasattr(sys, '_MEIPASS'):
         rutas.append(sys._MEIPASS)
@@ -165,9 +128,8 @@ class VerProveedoresWindow(QMainWindow):
         self.cargar_proveedores()
 
     def cargar_proveedores(self):
-        conn = None
+        conn = obtener_conexion()
         try:
-            conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
             
             # Consulta para obtener todos los proveedores
@@ -201,24 +163,13 @@ class VerProveedoresWindow(QMainWindow):
             
         except sqlite3.Error as e:
             QMessageBox.critical(self, "Error de Base de Datos", f"No se pudo cargar la información de proveedores: {e}")
-        finally:
-            if conn:
-                conn.close()
                 
     def ir_menu_principal(self):
         """Ir a menu.py"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), "menu.py")
-            if not os.path.exists(script_path):
-                QMessageBox.critical(self, "Error", f"No se encontró el archivo: {script_path}")
-                return
+        if abrir_pantalla("menu.py"):
             self.close()
-            subprocess.Popen([sys.executable, script_path])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo abrir menu.py: {e}")
             
 if __name__ == "__main__":
-    crear_tabla_proveedores()
     app = QApplication(sys.argv)
     window = VerProveedoresWindow()
     window.showMaximized()